@@ -0,0 +1,119 @@
+import re
+import threading
+from bisect import bisect_left
+
+import numpy as np
+
+from .busca import normalizar_texto
+from .cache import versao_escolas
+from .models import Escola
+
+LIMITE_AUTOCOMPLETE = 10
+LIMITE_MAXIMO_AUTOCOMPLETE = 50
+
+def palavras(texto):
+    """
+    Retorna as palavras normalizadas (sem acentos, minúsculas) de um texto.
+    """
+    return re.findall(r'\w+', normalizar_texto(texto))
+
+class IndiceAutocomplete:
+    """
+    Índice em memória dos nomes das escolas, para sugerir escolas enquanto o usuário digita sem consultar o banco.
+
+    As escolas ficam em ordem alfabética do nome normalizado, e duas estruturas apontam para essa ordem:
+    - `nomes`: nomes normalizados, para achar por busca binária os nomes que começam com o texto digitado;
+    - `vocabulario` + `ocorrencias`: cada palavra distinta, em ordem, com as posições das escolas que a contêm
+      (as ocorrências de palavras vizinhas ficam contíguas, então um prefixo de palavra corresponde a uma fatia).
+    """
+
+    def __init__(self, versao):
+        self.versao = versao
+        linhas = list(
+            Escola.objects.order_by().values_list('id', 'nome', 'cidade_id', 'cidade__nome', 'cidade__estado__sigla')
+        )
+        normalizados = [' '.join(palavras(nome)) for _, nome, _, _, _ in linhas]
+        ordem = sorted(range(len(linhas)), key=normalizados.__getitem__)
+
+        self.nomes = [normalizados[i] for i in ordem]
+        self.escolas = [
+            {'id': linhas[i][0], 'nome': linhas[i][1], 'cidade': linhas[i][3], 'estado': linhas[i][4]} for i in ordem
+        ]
+        self.cidades = np.array([linhas[i][2] for i in ordem], dtype=np.int64)
+        siglas = sorted({linhas[i][4] for i in ordem})
+        self.codigos_estado = {sigla: codigo for codigo, sigla in enumerate(siglas)}
+        self.estados = np.array([self.codigos_estado[linhas[i][4]] for i in ordem], dtype=np.int16)
+
+        postagens = {}
+        for posicao, nome in enumerate(self.nomes):
+            for palavra in set(nome.split()):
+                postagens.setdefault(palavra, []).append(posicao)
+        self.vocabulario = sorted(postagens)
+        tamanhos = [len(postagens[palavra]) for palavra in self.vocabulario]
+        self.inicios = np.concatenate(([0], np.cumsum(tamanhos, dtype=np.int64)))
+        self.ocorrencias = np.fromiter(
+            (posicao for palavra in self.vocabulario for posicao in postagens[palavra]),
+            dtype=np.int64, count=int(self.inicios[-1])
+        )
+
+    def filtro_escopo(self, posicoes, estado=None, cidade=None):
+        if estado is not None:
+            posicoes = posicoes[self.estados[posicoes] == self.codigos_estado.get(estado.upper(), -1)]
+        if cidade is not None:
+            posicoes = posicoes[self.cidades[posicoes] == cidade]
+        return posicoes
+
+    def posicoes_prefixo_palavra(self, termo):
+        inicio = bisect_left(self.vocabulario, termo)
+        fim = bisect_left(self.vocabulario, termo + '\uffff')
+        return np.unique(self.ocorrencias[self.inicios[inicio]:self.inicios[fim]])
+
+    def sugerir(self, texto, limite=LIMITE_AUTOCOMPLETE, estado=None, cidade=None):
+        """
+        Sugere até `limite` escolas para o texto digitado, opcionalmente restritas a um estado (sigla) e/ou cidade (id).
+
+        Processo:
+        1. Primeiro, os nomes que começam com o texto digitado, em ordem alfabética (busca binária em `nomes`).
+        2. Se faltarem sugestões, os nomes em que cada palavra digitada é início de alguma palavra do nome
+           ("joao sao" encontra "SÃO JOÃO"), também em ordem alfabética.
+
+        Retorna:
+        - list: Dicionários com `id`, `nome`, `cidade` e `estado` de cada escola sugerida.
+        """
+        termos = palavras(texto)
+        if not termos:
+            return []
+        consulta = ' '.join(termos)
+
+        inicio = bisect_left(self.nomes, consulta)
+        fim = bisect_left(self.nomes, consulta + '\uffff')
+        escolhidas = self.filtro_escopo(np.arange(inicio, fim), estado, cidade)[:limite]
+
+        if len(escolhidas) < limite:
+            candidatas = None
+            for termo in sorted(set(termos), key=len, reverse=True):
+                posicoes = self.posicoes_prefixo_palavra(termo)
+                candidatas = posicoes if candidatas is None else np.intersect1d(candidatas, posicoes, assume_unique=True)
+                if not len(candidatas):
+                    break
+            candidatas = self.filtro_escopo(candidatas, estado, cidade)
+            candidatas = candidatas[~np.isin(candidatas, escolhidas)]
+            escolhidas = np.concatenate((escolhidas, candidatas[:limite - len(escolhidas)]))
+
+        return [self.escolas[posicao] for posicao in escolhidas.tolist()]
+
+_indice = None
+_trava = threading.Lock()
+
+def obter_indice():
+    """
+    Retorna o índice de autocomplete do processo, construindo-o no primeiro uso e reconstruindo-o quando
+    a versão dos dados das escolas muda (ao final de `import_censos`, ver `cache.invalidar_escolas`).
+    """
+    global _indice
+    versao = versao_escolas()
+    if _indice is None or _indice.versao != versao:
+        with _trava:
+            if _indice is None or _indice.versao != versao:
+                _indice = IndiceAutocomplete(versao)
+    return _indice
@@ -0,0 +1,124 @@
+import re
+import unicodedata
+
+from django.db import connection, transaction
+from django.db.models import Q
+
+# Criada pela migração 0006: tabela FTS5 no SQLite; tabela com um `tsvector` por escola e índice GIN no PostgreSQL.
+# Nos demais bancos ela não existe e `buscar_escolas` usa `icontains`.
+TABELA_BUSCA = 'api_rest_escola_busca'
+LIMITE_BUSCA = 1000
+TAMANHO_LOTE_BUSCA = 5000
+
+# Palavras presentes em quase todos os nomes de escola: não ajudam a ordenar os resultados e obrigam o banco a pontuar
+# o país inteiro. São ignoradas quando a busca tem outros termos.
+PALAVRAS_COMUNS = {'escola', 'estadual', 'municipal', 'de', 'da', 'do', 'das', 'dos', 'e'}
+
+def normalizar_texto(texto):
+    """
+    Normaliza um texto para a busca: remove acentos e converte para minúsculas ("SÃO JOÃO" -> "sao joao").
+
+    Parâmetros:
+    - texto (str): O texto original (pode ser None).
+
+    Retorna:
+    - str: O texto normalizado.
+    """
+    if not texto:
+        return ''
+    decomposto = unicodedata.normalize('NFKD', texto)
+    return ''.join(c for c in decomposto if not unicodedata.combining(c)).lower()
+
+def termos_busca(texto):
+    """
+    Separa o texto digitado pelo usuário em termos normalizados, descartando pontuação
+    e, se sobrar algum outro termo, as `PALAVRAS_COMUNS`.
+    """
+    termos = re.findall(r'\w+', normalizar_texto(texto))
+    relevantes = [termo for termo in termos if termo not in PALAVRAS_COMUNS]
+    return relevantes or termos
+
+def reconstruir_indice_busca(conexao=connection):
+    """
+    Reconstrói o índice de busca a partir das escolas e cidades gravadas no banco.
+    Chamado ao final de `import_censos`, que é quem altera nomes, bairros e cidades das escolas.
+    A limpeza e o novo preenchimento rodam em uma única transação: as buscas feitas durante a reconstrução
+    continuam vendo o índice anterior, e uma falha no meio do caminho o mantém intacto.
+
+    Retorna:
+    - int: O número de escolas indexadas.
+    """
+    if conexao.vendor not in ('sqlite', 'postgresql'):
+        return 0
+
+    if conexao.vendor == 'sqlite':
+        limpar = f"INSERT INTO {TABELA_BUSCA}({TABELA_BUSCA}) VALUES ('delete-all')"
+        inserir = f'INSERT INTO {TABELA_BUSCA} (rowid, nome, bairro, cidade) VALUES (%s, %s, %s, %s)'
+    else:
+        limpar = f'TRUNCATE {TABELA_BUSCA}'
+        inserir = (
+            f"INSERT INTO {TABELA_BUSCA} (escola_id, documento) VALUES (%s, "
+            f"setweight(to_tsvector('simple', %s), 'A') || setweight(to_tsvector('simple', %s), 'B') || "
+            f"setweight(to_tsvector('simple', %s), 'C'))"
+        )
+
+    total = 0
+    with transaction.atomic(using=conexao.alias), conexao.cursor() as leitura, conexao.cursor() as escrita:
+        escrita.execute(limpar)
+        leitura.execute(
+            'SELECT e.id, e.nome, e.bairro, c.nome FROM api_rest_escola e '
+            'JOIN api_rest_cidade c ON c.id = e.cidade_id'
+        )
+        while True:
+            linhas = leitura.fetchmany(TAMANHO_LOTE_BUSCA)
+            if not linhas:
+                break
+            escrita.executemany(inserir, [
+                (escola_id, normalizar_texto(nome), normalizar_texto(bairro), normalizar_texto(cidade))
+                for escola_id, nome, bairro, cidade in linhas
+            ])
+            total += len(linhas)
+    return total
+
+def buscar_escolas(texto, limite=LIMITE_BUSCA, conexao=connection):
+    """
+    Busca escolas pelo nome, bairro e cidade, sem diferenciar acentos nem maiúsculas.
+    Cada termo digitado é tratado como prefixo e todos precisam aparecer ("sao joao" encontra "SÃO JOÃO BATISTA").
+    Em bancos sem o índice de busca, cada termo é procurado com `icontains` no nome, no bairro ou na cidade,
+    diferenciando acentos e sem ordenar por relevância.
+
+    Parâmetros:
+    - texto (str): O texto digitado pelo usuário.
+    - limite (int): Número máximo de resultados. Padrão é `LIMITE_BUSCA`.
+
+    Retorna:
+    - list: Ids das escolas encontradas, da mais para a menos relevante (o nome pesa mais que o bairro e a cidade).
+    """
+    termos = termos_busca(texto)
+    if not termos:
+        return []
+
+    with conexao.cursor() as cursor:
+        if conexao.vendor == 'sqlite':
+            consulta = ' '.join(f'"{termo}"*' for termo in termos)
+            cursor.execute(
+                f'SELECT rowid FROM {TABELA_BUSCA} WHERE {TABELA_BUSCA} MATCH %s '
+                f'ORDER BY bm25({TABELA_BUSCA}, 10.0, 3.0, 1.0), rowid LIMIT %s',
+                [consulta, limite]
+            )
+        elif conexao.vendor == 'postgresql':
+            consulta = ' & '.join(f'{termo}:*' for termo in termos)
+            cursor.execute(
+                f"SELECT escola_id FROM {TABELA_BUSCA}, to_tsquery('simple', %s) consulta "
+                f"WHERE documento @@ consulta ORDER BY ts_rank(documento, consulta) DESC, escola_id LIMIT %s",
+                [consulta, limite]
+            )
+        else:
+            from .models import Escola
+            escolas = Escola.objects.all()
+            for termo in termos:
+                escolas = escolas.filter(
+                    Q(nome__icontains=termo) | Q(bairro__icontains=termo) | Q(cidade__nome__icontains=termo)
+                )
+            return list(escolas.order_by('id').values_list('id', flat=True)[:limite])
+        return [escola_id for (escola_id,) in cursor.fetchall()]
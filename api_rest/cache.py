@@ -0,0 +1,86 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+CHAVE_VERSAO_ESCOLAS = 'escolas:versao'
+# Formato do JSON dos detalhes da escola: incrementado quando os campos de `EscolaSerializer` mudam,
+# para que as respostas guardadas no formato antigo deixem de ser lidas
+FORMATO_ESCOLA = 2
+
+def versao_escolas():
+    """
+    Retorna a versão atual dos dados das escolas, usada nas chaves do cache.
+    Trocada por `invalidar_escolas` ao final de cada importação; vale também para as respostas de referência.
+    Cada versão é o instante em nanossegundos em que foi criada: se a chave sumir do cache, a nova versão
+    não coincide com nenhuma anterior, e as entradas antigas não voltam a ser lidas.
+
+    Retorna:
+    - int: A versão atual.
+    """
+    versao = cache.get(CHAVE_VERSAO_ESCOLAS)
+    if versao is None:
+        nova = time.time_ns()
+        cache.add(CHAVE_VERSAO_ESCOLAS, nova, timeout=None)
+        versao = cache.get(CHAVE_VERSAO_ESCOLAS, nova)
+    return versao
+
+def chave_escola(escola_id):
+    """
+    Monta a chave do cache dos detalhes de uma escola, na versão atual dos dados.
+
+    Parâmetros:
+    - escola_id (int): Identificador da escola.
+
+    Retorna:
+    - str: A chave do cache.
+    """
+    return f'escola:{FORMATO_ESCOLA}:{versao_escolas()}:{escola_id}'
+
+def obter_escola(escola_id):
+    """
+    Retorna os detalhes serializados da escola guardados no cache, ou None se não estiverem lá.
+    """
+    return cache.get(chave_escola(escola_id))
+
+def guardar_escola(escola_id, dados):
+    """
+    Guarda no cache os detalhes serializados da escola por `CACHE_TIMEOUT_ESCOLA` segundos.
+    """
+    cache.set(chave_escola(escola_id), dados, timeout=settings.CACHE_TIMEOUT_ESCOLA)
+
+def invalidar_escola(escola_id):
+    """
+    Remove do cache os detalhes de uma escola, ex.: depois de uma nova avaliação.
+    """
+    cache.delete(chave_escola(escola_id))
+
+def invalidar_escolas():
+    """
+    Invalida os detalhes de todas as escolas de uma vez, trocando a versão usada nas chaves.
+    As entradas antigas deixam de ser lidas e expiram sozinhas.
+    Com o cache padrão (tabela no banco) ou outro backend compartilhado, a invalidação vale para todos os processos;
+    com `LocMemCache`, apenas para o processo que a chamou.
+    """
+    cache.set(CHAVE_VERSAO_ESCOLAS, time.time_ns(), timeout=None)
+
+def obter_referencia(nome, gerar):
+    """
+    Retorna o corpo JSON já renderizado de um endpoint de referência (estados, cidades) e o seu ETag,
+    calculando-os com `gerar` apenas uma vez por versão dos dados.
+
+    Parâmetros:
+    - nome (str): Nome do endpoint, usado na chave do cache.
+    - gerar (callable): Função sem parâmetros que retorna o corpo JSON em bytes.
+
+    Retorna:
+    - tuple: (corpo, etag), com o ETag derivado do conteúdo.
+    """
+    chave = f'referencia:{versao_escolas()}:{nome}'
+    referencia = cache.get(chave)
+    if referencia is None:
+        corpo = gerar()
+        referencia = (corpo, '"%s"' % hashlib.sha1(corpo).hexdigest())
+        cache.set(chave, referencia, timeout=settings.CACHE_MAX_AGE_REFERENCIAS)
+    return referencia
@@ -1,49 +1,276 @@
+import base64
+import copy
+import re
 import smtplib
+import uuid
+from email.policy import compat32
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
+from email.utils import getaddresses
 
-def enviar_email_mailersend(smtp_host, smtp_port, usuario, senha, remetente, destinatario, assunto, corpo_html):
+def montar_mensagem(remetente, destinatario, assunto, corpo_html):
     """
-    Envia um email utilizando o servidor SMTP especificado.
+    Monta a mensagem multipart de um email com corpo HTML.
 
     Parâmetros:
-    - smtp_host (str): Endereço do servidor SMTP.
-    - smtp_port (int): Porta do servidor SMTP.
-    - usuario (str): Nome de usuário para autenticação no servidor SMTP.
-    - senha (str): Senha para autenticação no servidor SMTP.
     - remetente (str): Endereço de email do remetente.
     - destinatario (str): Endereço de email do destinatário.
     - assunto (str): Assunto do email.
     - corpo_html (str): Conteúdo do email em formato HTML.
 
-    Processo:
-    1. Cria uma mensagem multipart para suportar conteúdo HTML.
-    2. Define os campos 'From', 'To' e 'Subject' da mensagem.
-    3. Anexa o corpo do email em formato HTML.
-    4. Conecta-se ao servidor SMTP e inicia uma conexão com STARTTLS.
-    5. Realiza o login no servidor SMTP com as credenciais fornecidas.
-    6. Envia o email.
-    7. Encerra a conexão com o servidor SMTP.
-    8. Imprime uma mensagem de sucesso ou erro no console.
-
     Retorna:
-    - None
+    - MIMEMultipart: A mensagem com os campos 'From', 'To' e 'Subject' e o corpo HTML anexado.
     """
-    try:
-        mensagem = MIMEMultipart()
-        mensagem['From'] = remetente
-        mensagem['To'] = destinatario
-        mensagem['Subject'] = assunto
+    mensagem = MIMEMultipart()
+    mensagem['From'] = remetente
+    mensagem['To'] = destinatario
+    mensagem['Subject'] = assunto
+    mensagem.attach(MIMEText(corpo_html, 'html'))
+    return mensagem
+
+class MensagemPronta:
+    """
+    Mensagem já serializada para o SMTP (bytes com CRLF), montada por `EsqueletoMensagem`.
+    `ConexaoSMTP`, `enviar_em_lote` e a fila de emails a aceitam no lugar de uma `MIMEMultipart`.
+    """
+
+    __slots__ = ('remetente', 'destinatarios', 'dados')
+
+    def __init__(self, remetente, destinatarios, dados):
+        self.remetente = remetente
+        self.destinatarios = destinatarios
+        self.dados = dados
+
+class EsqueletoMensagem:
+    """
+    Partes fixas das mensagens de `montar_mensagem` com um mesmo remetente e assunto, serializadas uma única vez:
+    cabeçalhos, assunto codificado, fronteira multipart e cabeçalhos da parte HTML.
+    Cada mensagem só acrescenta o cabeçalho 'To' e o corpo em base64, sem passar pelo gerador do pacote `email`.
+
+    A fronteira é fixa por esqueleto, o que é seguro porque o corpo em base64 nunca contém uma linha iniciada por '--'.
+    O corpo é sempre codificado como utf-8 em base64, mesmo quando é só ASCII.
+    """
+
+    MARCADOR = 'destinatario@esqueleto.invalid'
+
+    def __init__(self, remetente, assunto):
+        self.remetente = remetente
+        self.politica = compat32.clone(linesep='\r\n')
+        self.fronteira = f'==============={uuid.uuid4().hex}=='
+        prototipo = MIMEMultipart(boundary=self.fronteira)
+        prototipo['From'] = remetente
+        prototipo['To'] = self.MARCADOR
+        prototipo['Subject'] = assunto
+        prototipo.attach(MIMEText('', 'html', 'utf-8'))
+        dados = prototipo.as_bytes(policy=self.politica)
+        self.fim = f'\r\n--{self.fronteira}--\r\n'.encode()
+        self.antes_destinatario, resto = dados[:-len(self.fim)].split(f'To: {self.MARCADOR}\r\n'.encode())
+        self.antes_corpo = resto
+
+    def mensagem(self, destinatario, corpo_html):
+        """
+        Monta a mensagem para `destinatario` com o corpo `corpo_html`.
+
+        Retorna:
+        - MensagemPronta: Equivalente à de `montar_mensagem` com o mesmo remetente e assunto.
+        """
+        dados = b''.join((
+            self.antes_destinatario,
+            self.politica.fold_binary('To', destinatario),
+            self.antes_corpo,
+            base64.encodebytes(corpo_html.encode()).replace(b'\n', b'\r\n'),
+            self.fim,
+        ))
+        return MensagemPronta(self.remetente, [destinatario], dados)
+
+def destinatarios_mensagem(mensagem):
+    """
+    Retorna os endereços dos destinatários de uma mensagem (cabeçalhos 'To', 'Cc' e 'Bcc'), na ordem em que aparecem.
+    """
+    if isinstance(mensagem, MensagemPronta):
+        return mensagem.destinatarios
+    campos = mensagem.get_all('To', []) + mensagem.get_all('Cc', []) + mensagem.get_all('Bcc', [])
+    return [endereco for _, endereco in getaddresses(campos)]
+
+def serializar_mensagem(mensagem):
+    """
+    Retorna os bytes da mensagem como enviados no DATA (com CRLF e sem o cabeçalho 'Bcc').
+    """
+    if isinstance(mensagem, MensagemPronta):
+        return mensagem.dados
+    if mensagem['Bcc'] is not None:
+        mensagem = copy.copy(mensagem)
+        del mensagem['Bcc']
+    return mensagem.as_bytes(policy=mensagem.policy.clone(linesep='\r\n'))
+
+class ConexaoSMTP:
+    """
+    Conexão SMTP autenticada e reutilizável: conecta, inicia o STARTTLS e faz o login no primeiro envio
+    e mantém a sessão aberta para os envios seguintes, até `fechar`.
+
+    Se o servidor tiver encerrado a sessão (ex.: por inatividade) ou recusar mais mensagens na mesma conexão
+    (código 421), reconecta uma vez e reenvia. Com `limite_mensagens`, a sessão é renovada antes de atingir o limite
+    de mensagens por conexão do servidor, sem esperar a recusa.
+    Quando o servidor anuncia PIPELINING (RFC 2920), os comandos MAIL, RCPT e DATA de cada mensagem são enviados
+    juntos, em uma só ida e volta.
+    """
+
+    def __init__(self, smtp_host, smtp_port, usuario, senha, timeout=30, starttls=True, pipelining=True,
+                 limite_mensagens=None):
+        self.smtp_host = smtp_host
+        self.smtp_port = smtp_port
+        self.usuario = usuario
+        self.senha = senha
+        self.timeout = timeout
+        self.starttls = starttls
+        self.pipelining = pipelining
+        self.limite_mensagens = limite_mensagens
+        self.servidor = None
+        self.enviadas = 0
+
+    def conectar(self):
+        servidor = smtplib.SMTP(self.smtp_host, self.smtp_port, timeout=self.timeout)
+        try:
+            if self.starttls:
+                servidor.starttls()
+            if self.usuario:
+                servidor.login(self.usuario, self.senha)
+            servidor.ehlo_or_helo_if_needed()
+        except Exception:
+            servidor.close()
+            raise
+        self.servidor = servidor
+        self.enviadas = 0
 
-        mensagem.attach(MIMEText(corpo_html, 'html'))
+    def enviar(self, mensagem):
+        """
+        Envia uma mensagem montada por `montar_mensagem` (ou uma `MensagemPronta`) pela sessão aberta, abrindo-a se preciso.
 
-        servidor = smtplib.SMTP(smtp_host, smtp_port)
-        servidor.starttls()
-        servidor.login(usuario, senha)
+        Retorna:
+        - dict: Para cada destinatário, a tupla (código, resposta) do servidor: a resposta final da mensagem
+          para os aceitos e a recusa do RCPT para os demais. Sem PIPELINING, o `smtplib` não expõe a resposta final
+          e os aceitos recebem (250, b'OK').
 
-        servidor.sendmail(remetente, destinatario, mensagem.as_string())
-        servidor.quit()
+        Lança:
+        - smtplib.SMTPRecipientsRefused: Se todos os destinatários forem recusados.
+        - smtplib.SMTPException ou OSError: Se o envio falhar mesmo após reconectar.
+        """
+        if self.limite_mensagens and self.enviadas >= self.limite_mensagens:
+            self.fechar()
+        if self.servidor is None:
+            self.conectar()
+        try:
+            resultado = self.transmitir(mensagem)
+        except (smtplib.SMTPServerDisconnected, smtplib.SMTPResponseException) as e:
+            if isinstance(e, smtplib.SMTPResponseException) and e.smtp_code != 421:
+                raise
+            self.servidor.close()
+            self.conectar()
+            resultado = self.transmitir(mensagem)
+        self.enviadas += 1
+        return resultado
 
-        print("E-mail enviado com sucesso!")
-    except Exception as e:
-        print(f"Erro ao enviar o e-mail: {e}")
\ No newline at end of file
+    def transmitir(self, mensagem):
+        destinatarios = destinatarios_mensagem(mensagem)
+        if isinstance(mensagem, MensagemPronta):
+            remetente = mensagem.remetente
+        else:
+            remetente = getaddresses([mensagem['Sender'] or mensagem['From']])[0][1]
+        if not (self.pipelining and self.servidor.has_extn('pipelining')):
+            if isinstance(mensagem, MensagemPronta):
+                recusados = self.servidor.sendmail(remetente, destinatarios, mensagem.dados)
+            else:
+                recusados = self.servidor.send_message(mensagem)
+            return {destinatario: recusados.get(destinatario, (250, b'OK')) for destinatario in destinatarios}
+
+        servidor = self.servidor
+        dados = serializar_mensagem(mensagem)
+        comandos = [f'MAIL FROM:{smtplib.quoteaddr(remetente)}']
+        comandos += [f'RCPT TO:{smtplib.quoteaddr(destinatario)}' for destinatario in destinatarios]
+        comandos.append('DATA')
+        servidor.send(''.join(comando + '\r\n' for comando in comandos))
+
+        codigo, resposta = servidor.getreply()
+        if codigo == 421:
+            raise smtplib.SMTPSenderRefused(codigo, resposta, remetente)
+        respostas = {destinatario: servidor.getreply() for destinatario in destinatarios}
+        codigo_data, resposta_data = servidor.getreply()
+        aceitos = [destinatario for destinatario, (c, _) in respostas.items() if c in (250, 251)]
+        if codigo_data == 354 and (codigo != 250 or not aceitos):
+            # O servidor aceitou o DATA mesmo sem remetente ou destinatários válidos: encerra a mensagem vazia
+            servidor.send('.\r\n')
+            servidor.getreply()
+            codigo_data = 554
+        if codigo != 250:
+            servidor.rset()
+            raise smtplib.SMTPSenderRefused(codigo, resposta, remetente)
+        if not aceitos:
+            servidor.rset()
+            raise smtplib.SMTPRecipientsRefused(respostas)
+        if codigo_data != 354:
+            servidor.rset()
+            raise smtplib.SMTPDataError(codigo_data, resposta_data)
+
+        dados = re.sub(rb'(?m)^\.', b'..', dados)
+        if not dados.endswith(b'\r\n'):
+            dados += b'\r\n'
+        servidor.send(dados + b'.\r\n')
+        codigo_final, resposta_final = servidor.getreply()
+        if codigo_final != 250:
+            servidor.rset()
+            raise smtplib.SMTPDataError(codigo_final, resposta_final)
+        return {
+            destinatario: (codigo_final, resposta_final) if destinatario in aceitos else respostas[destinatario]
+            for destinatario in destinatarios
+        }
+
+    def fechar(self):
+        """
+        Encerra a sessão, se houver uma aberta, ignorando erros do servidor.
+        """
+        if self.servidor is None:
+            return
+        try:
+            self.servidor.quit()
+        except (smtplib.SMTPException, OSError):
+            self.servidor.close()
+        self.servidor = None
+
+def enviar_em_lote(smtp_host, smtp_port, usuario, senha, mensagens, **opcoes):
+    """
+    Envia várias mensagens por uma única sessão SMTP autenticada, em vez de uma conexão por mensagem.
+
+    Parâmetros:
+    - smtp_host (str): Endereço do servidor SMTP.
+    - smtp_port (int): Porta do servidor SMTP.
+    - usuario (str): Nome de usuário para autenticação no servidor SMTP.
+    - senha (str): Senha para autenticação no servidor SMTP.
+    - mensagens (iterable): Mensagens montadas por `montar_mensagem` ou `EsqueletoMensagem`.
+    - opcoes: Repassadas a `ConexaoSMTP` (ex.: `limite_mensagens`, `pipelining`, `starttls`).
+
+    Processo:
+    1. Abre a sessão no primeiro envio e a reutiliza para as mensagens seguintes.
+    2. Quando o servidor limita as mensagens por conexão (421 ou desconexão), reconecta e reenvia a mensagem.
+    3. Uma mensagem que falha não interrompe o lote: a sessão é reaberta para a próxima.
+    4. Encerra a sessão ao final.
+
+    Retorna:
+    - list: Para cada mensagem, na ordem recebida, um dicionário destinatário -> (código, resposta);
+      o código é None quando a falha não veio do servidor (ex.: erro de rede).
+    """
+    conexao = ConexaoSMTP(smtp_host, smtp_port, usuario, senha, **opcoes)
+    resultados = []
+    try:
+        for mensagem in mensagens:
+            try:
+                resultados.append(conexao.enviar(mensagem))
+            except smtplib.SMTPRecipientsRefused as e:
+                resultados.append(dict(e.recipients))
+            except smtplib.SMTPResponseException as e:
+                resultados.append({d: (e.smtp_code, e.smtp_error) for d in destinatarios_mensagem(mensagem)})
+            except (smtplib.SMTPException, OSError) as e:
+                conexao.fechar()
+                resultados.append({d: (None, str(e)) for d in destinatarios_mensagem(mensagem)})
+    finally:
+        conexao.fechar()
+    return resultados
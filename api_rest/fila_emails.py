@@ -0,0 +1,122 @@
+import atexit
+import logging
+import queue
+import smtplib
+import threading
+import time
+
+from django.conf import settings
+
+from .email_service import ConexaoSMTP, destinatarios_mensagem
+
+logger = logging.getLogger(__name__)
+
+def descrever(mensagem):
+    return ', '.join(destinatarios_mensagem(mensagem))
+
+class FilaEmails:
+    """
+    Fila de envio de emails em segundo plano, para que as requisições não esperem as idas e voltas do SMTP.
+
+    Cada thread de envio mantém a sua própria `ConexaoSMTP` autenticada e a reutiliza entre as mensagens;
+    a conexão é fechada depois de `ocioso` segundos sem mensagens. Um envio que falha é repetido até `tentativas`
+    vezes, com espera exponencial (`espera_inicial`, o dobro, ...) sem ocupar a thread durante a espera;
+    recusas definitivas do servidor (códigos 5xx) não são repetidas.
+    As mensagens ficam na memória do processo: as que estiverem na fila quando o processo terminar são perdidas,
+    exceto as que couberem na espera final de `encerrar`.
+    """
+
+    def __init__(self, workers, tentativas, espera_inicial, ocioso):
+        self.tentativas = tentativas
+        self.espera_inicial = espera_inicial
+        self.ocioso = ocioso
+        self.fila = queue.Queue()
+        self.threads = [
+            threading.Thread(target=self.processar, name=f'fila-emails-{numero}', daemon=True)
+            for numero in range(workers)
+        ]
+        for thread in self.threads:
+            thread.start()
+
+    def enfileirar(self, mensagem, tentativa=1):
+        self.fila.put((mensagem, tentativa))
+
+    def processar(self):
+        conexao = ConexaoSMTP(settings.SMTP_HOST, settings.SMTP_PORT, settings.SMTP_USER, settings.SMTP_PASSWORD)
+        while True:
+            try:
+                item = self.fila.get(timeout=self.ocioso)
+            except queue.Empty:
+                conexao.fechar()
+                continue
+            if item is None:
+                conexao.fechar()
+                self.fila.task_done()
+                return
+            mensagem, tentativa = item
+            try:
+                conexao.enviar(mensagem)
+            except Exception as e:
+                conexao.fechar()
+                self.reagendar(mensagem, tentativa, e)
+            finally:
+                self.fila.task_done()
+
+    def reagendar(self, mensagem, tentativa, erro):
+        definitivo = isinstance(erro, smtplib.SMTPRecipientsRefused) or (
+            isinstance(erro, smtplib.SMTPResponseException) and erro.smtp_code >= 500
+        )
+        if definitivo or tentativa >= self.tentativas:
+            logger.error('Email para %s descartado após %d tentativas: %s', descrever(mensagem), tentativa, erro)
+            return
+        espera = self.espera_inicial * 2 ** (tentativa - 1)
+        logger.warning('Falha ao enviar email para %s (tentativa %d): %s; nova tentativa em %.0f s',
+                       descrever(mensagem), tentativa, erro, espera)
+        temporizador = threading.Timer(espera, self.enfileirar, args=(mensagem, tentativa + 1))
+        temporizador.daemon = True
+        temporizador.start()
+
+    def encerrar(self, espera=10):
+        """
+        Espera até `espera` segundos que as threads esvaziem a fila e as encerra, fechando as conexões.
+        """
+        for _ in self.threads:
+            self.fila.put(None)
+        limite = time.monotonic() + espera
+        for thread in self.threads:
+            thread.join(max(limite - time.monotonic(), 0))
+
+_fila = None
+_trava = threading.Lock()
+
+def obter_fila():
+    """
+    Retorna a fila de emails do processo, iniciando as threads de envio no primeiro uso
+    (`EMAIL_WORKERS`, `EMAIL_TENTATIVAS`, `EMAIL_ESPERA_INICIAL` e `EMAIL_CONEXAO_OCIOSA` nas configurações).
+    """
+    global _fila
+    if _fila is None:
+        with _trava:
+            if _fila is None:
+                _fila = FilaEmails(
+                    settings.EMAIL_WORKERS, settings.EMAIL_TENTATIVAS,
+                    settings.EMAIL_ESPERA_INICIAL, settings.EMAIL_CONEXAO_OCIOSA
+                )
+                atexit.register(_fila.encerrar)
+    return _fila
+
+def enfileirar_mensagem(mensagem):
+    """
+    Coloca uma mensagem já montada (`montar_mensagem` ou `modelos_email`) na fila de envio em segundo plano.
+    Com `EMAIL_ASSINCRONO` desligado, envia na hora, em uma conexão aberta só para ela (útil em desenvolvimento e testes).
+    """
+    if settings.EMAIL_ASSINCRONO:
+        obter_fila().enfileirar(mensagem)
+        return
+    conexao = ConexaoSMTP(settings.SMTP_HOST, settings.SMTP_PORT, settings.SMTP_USER, settings.SMTP_PASSWORD)
+    try:
+        conexao.enviar(mensagem)
+    except Exception as e:
+        logger.error('Falha ao enviar email para %s: %s', descrever(mensagem), e)
+    finally:
+        conexao.fechar()
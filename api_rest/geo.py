@@ -0,0 +1,91 @@
+import math
+import re
+
+import pandas as pd
+
+# Tamanho, em graus, das células da grade usada como índice espacial (~2,2 km de latitude).
+# As células de uma mesma linha da grade têm números consecutivos, então cada linha vira um intervalo no índice.
+TAMANHO_CELULA = 0.02
+COLUNAS_GRADE = int(360 / TAMANHO_CELULA)
+RAIO_TERRA_KM = 6371.0
+KM_POR_GRAU = 111.32
+
+def normalizar_cep(cep):
+    """
+    Mantém apenas os dígitos do CEP e completa os zeros à esquerda perdidos quando o CSV o lê como número.
+
+    Retorna:
+    - str: O CEP com 8 dígitos, ou '' se não houver dígitos.
+    """
+    digitos = re.sub(r'\D', '', str(cep or '').split('.')[0])
+    return digitos.zfill(8) if digitos else ''
+
+def celula_geo(latitude, longitude):
+    """
+    Retorna o número da célula da grade que contém o ponto, ou None se o ponto não tiver coordenadas.
+    """
+    if latitude is None or longitude is None:
+        return None
+    linha = math.floor((latitude + 90) / TAMANHO_CELULA)
+    coluna = math.floor((longitude + 180) / TAMANHO_CELULA) % COLUNAS_GRADE
+    return linha * COLUNAS_GRADE + coluna
+
+def celulas_no_raio(latitude, longitude, raio_km):
+    """
+    Retorna as células da grade que cobrem o retângulo envolvente do círculo de `raio_km` em torno do ponto,
+    como um intervalo (primeira, última) por linha da grade, junto com os limites do retângulo.
+    Perto do antimeridiano uma linha pode dar a volta e virar dois intervalos.
+
+    Retorna:
+    - tuple: (intervalos, (lat_min, lat_max, lon_min, lon_max)).
+    """
+    delta_lat = raio_km / KM_POR_GRAU
+    delta_lon = raio_km / (KM_POR_GRAU * max(math.cos(math.radians(latitude)), 0.01))
+    lat_min, lat_max = max(latitude - delta_lat, -90.0), min(latitude + delta_lat, 90.0)
+    lon_min, lon_max = longitude - delta_lon, longitude + delta_lon
+
+    linhas = range(math.floor((lat_min + 90) / TAMANHO_CELULA), math.floor((lat_max + 90) / TAMANHO_CELULA) + 1)
+    coluna_min = math.floor((lon_min + 180) / TAMANHO_CELULA)
+    coluna_max = math.floor((lon_max + 180) / TAMANHO_CELULA)
+    if coluna_max - coluna_min + 1 >= COLUNAS_GRADE:
+        colunas = [(0, COLUNAS_GRADE - 1)]
+    elif coluna_min < 0:
+        colunas = [(coluna_min + COLUNAS_GRADE, COLUNAS_GRADE - 1), (0, coluna_max)]
+    elif coluna_max >= COLUNAS_GRADE:
+        colunas = [(coluna_min, COLUNAS_GRADE - 1), (0, coluna_max - COLUNAS_GRADE)]
+    else:
+        colunas = [(coluna_min, coluna_max)]
+    intervalos = [
+        (linha * COLUNAS_GRADE + inicio, linha * COLUNAS_GRADE + fim) for linha in linhas for inicio, fim in colunas
+    ]
+    return intervalos, (lat_min, lat_max, lon_min, lon_max)
+
+def distancia_km(lat1, lon1, lat2, lon2):
+    """
+    Distância em km entre dois pontos, pela fórmula de haversine.
+    """
+    dlat = math.radians(lat2 - lat1)
+    dlon = math.radians(lon2 - lon1)
+    a = math.sin(dlat / 2) ** 2 + math.cos(math.radians(lat1)) * math.cos(math.radians(lat2)) * math.sin(dlon / 2) ** 2
+    return 2 * RAIO_TERRA_KM * math.asin(math.sqrt(a))
+
+def carregar_ceps(caminho):
+    """
+    Carrega a tabela local de coordenadas por CEP (centroides), usada para geocodificar as escolas na importação.
+
+    O arquivo é um CSV separado por ';' com as colunas `cep`, `latitude` e `longitude` (decimais com '.' ou ',').
+    Além dos CEPs exatos, calcula o centroide de cada prefixo de 5 dígitos, usado quando o CEP da escola não está na tabela.
+
+    Retorna:
+    - tuple: (por_cep, por_prefixo), dicionários CEP -> (latitude, longitude).
+    """
+    ceps = pd.read_csv(caminho, sep=';', dtype=str, usecols=['cep', 'latitude', 'longitude'])
+    ceps['cep'] = ceps['cep'].map(normalizar_cep)
+    for coluna in ('latitude', 'longitude'):
+        ceps[coluna] = pd.to_numeric(ceps[coluna].str.replace(',', '.'), errors='coerce')
+    ceps = ceps[(ceps['cep'] != '') & ceps['latitude'].notna() & ceps['longitude'].notna()]
+
+    por_cep = dict(zip(ceps['cep'], zip(ceps['latitude'], ceps['longitude'])))
+    prefixos = ceps.groupby(ceps['cep'].str[:5])[['latitude', 'longitude']].mean()
+    por_prefixo = dict(zip(prefixos.index, zip(prefixos['latitude'], prefixos['longitude'])))
+    return por_cep, por_prefixo
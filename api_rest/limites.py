@@ -0,0 +1,103 @@
+import hashlib
+import math
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.throttling import BaseThrottle
+
+class BaldeFichas:
+    """
+    Limite de requisições por chave no modelo de balde de fichas (token bucket): cada chave tem até `capacidade` fichas,
+    cada requisição gasta uma e uma ficha volta a cada `intervalo` segundos.
+
+    Os contadores ficam no cache `limites` (por padrão, a tabela de cache no banco, compartilhada por todos os processos;
+    ou outro backend compartilhado, como Redis ou Memcached, via `LIMITES_CACHE_BACKEND`). Por chave é guardado
+    um único número: o instante em que o balde estará cheio de novo (as fichas disponíveis são
+    `capacidade - (cheio_em - agora) / intervalo`), que expira do cache junto com o próprio balde.
+    A leitura e a escrita são atômicas dentro do processo; entre processos, requisições simultâneas da mesma chave
+    podem gastar a mesma ficha, o que só deixa o limite um pouco mais folgado.
+    """
+
+    trava = threading.Lock()
+
+    def __init__(self, prefixo, capacidade, intervalo, cache=None):
+        self.prefixo = prefixo
+        self.capacidade = capacidade
+        self.intervalo = intervalo
+        self.cache = cache or caches['limites']
+
+    def chave_cache(self, chave):
+        return f'limite:{self.prefixo}:{hashlib.sha1(chave.encode()).hexdigest()}'
+
+    def consumir(self, chave):
+        """
+        Gasta uma ficha do balde de `chave`, se houver.
+
+        Retorna:
+        - float: 0 se a requisição foi aceita; senão, os segundos até haver uma ficha disponível.
+        """
+        return consumir_fichas([(self, chave)])
+
+def consumir_fichas(pedidos):
+    """
+    Gasta uma ficha de cada balde em `pedidos`, apenas se todos tiverem ficha: um balde vazio não faz os demais
+    perderem fichas pela requisição recusada.
+
+    Parâmetros:
+    - pedidos (list): Pares (BaldeFichas, chave).
+
+    Retorna:
+    - float: 0 se a requisição foi aceita; senão, os segundos até todos os baldes terem uma ficha disponível.
+    """
+    with BaldeFichas.trava:
+        agora = time.time()
+        cheios_em = []
+        espera = 0
+        for balde, chave in pedidos:
+            chave_cache = balde.chave_cache(chave)
+            cheio_em = max(balde.cache.get(chave_cache, agora), agora)
+            espera = max(espera, cheio_em - agora - (balde.capacidade - 1) * balde.intervalo)
+            cheios_em.append((balde, chave_cache, cheio_em + balde.intervalo))
+        if espera > 0:
+            return espera
+        for balde, chave_cache, cheio_em in cheios_em:
+            balde.cache.set(chave_cache, cheio_em, timeout=math.ceil(cheio_em - agora))
+    return 0
+
+class LimiteBaldesFichas(BaseThrottle):
+    """
+    Throttle do DRF sobre um ou mais `BaldeFichas`; as subclasses definem os baldes e as chaves da requisição.
+    A requisição só é aceita se todos os baldes tiverem ficha, e só então gasta uma ficha de cada um.
+    Como os throttles rodam antes da view, a requisição recusada recebe 429 com `Retry-After`
+    sem tocar nas tabelas da aplicação nem no SMTP.
+    """
+
+    def baldes(self, request):
+        """
+        Retorna os pares (BaldeFichas, chave) da requisição; chaves vazias não são limitadas.
+        """
+        raise NotImplementedError
+
+    def allow_request(self, request, view):
+        pedidos = [(balde, chave) for balde, chave in self.baldes(request) if chave]
+        self.espera = consumir_fichas(pedidos) if pedidos else 0
+        return self.espera == 0
+
+    def wait(self):
+        return self.espera
+
+class LimiteAutorizacao(LimiteBaldesFichas):
+    """
+    Limita os pedidos de código de confirmação por email (`LIMITE_AUTORIZACAO_EMAIL`) e por IP do cliente
+    (`LIMITE_AUTORIZACAO_IP`). O IP vem do `get_ident` do DRF, que considera `NUM_PROXIES` ao ler o X-Forwarded-For.
+    """
+
+    def baldes(self, request):
+        email = request.data.get('email')
+        return [
+            (BaldeFichas('autorizacao-email', *settings.LIMITE_AUTORIZACAO_EMAIL),
+             email.strip().lower() if isinstance(email, str) else None),
+            (BaldeFichas('autorizacao-ip', *settings.LIMITE_AUTORIZACAO_IP), self.get_ident(request)),
+        ]
@@ -0,0 +1,70 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, reset_queries
+from django.db.models import F, Q
+from api_rest.models import Escola
+from api_rest.views import CAMPOS_LISTAGEM_ESCOLAS
+
+
+def medir(consulta, repeticoes):
+    """
+    Executa `consulta` `repeticoes` vezes e retorna a mediana e o pior tempo, em milissegundos.
+    """
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        consulta()
+        tempos.append((time.perf_counter() - inicio) * 1000)
+        reset_queries()
+    return statistics.median(tempos), max(tempos)
+
+
+class Command(BaseCommand):
+    help = (
+        'Mede a latência e mostra o plano de execução das consultas de listagem de escolas. '
+        'Para comparar antes e depois dos índices, rode com o banco completo em `migrate api_rest 0002` e depois de `migrate`.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeticoes', type=int, default=5, help='Execuções de cada consulta (padrão: 5).')
+        parser.add_argument('--estado', default='SP', help='Valor do filtro `estado` (padrão: SP).')
+        parser.add_argument('--cidade', default='São Paulo', help='Valor do filtro `cidade` (padrão: São Paulo).')
+        parser.add_argument('--nome', default='ESCOLA MUNICIPAL', help='Valor do filtro `nome`.')
+        parser.add_argument('--bairro', default='CENTRO', help='Valor do filtro `bairro` (padrão: CENTRO).')
+        parser.add_argument('--sem-plano', action='store_true', help='Não mostra os planos de execução.')
+
+    def handle(self, *args, **options):
+        # Mesmo queryset das listagens: escola, cidade e estado em uma consulta, com a média das avaliações gravada na escola
+        escolas = Escola.objects.select_related('cidade__estado').only(*CAMPOS_LISTAGEM_ESCOLAS)
+        codigo_ibge = Escola.objects.order_by('-pk').values_list('codigo_ibge', flat=True).first() or ''
+
+        consultas = {
+            'estado (nome ou sigla, iexact)': escolas.filter(
+                Q(cidade__estado__nome__iexact=options['estado']) |
+                Q(cidade__estado__sigla__iexact=options['estado'])
+            ),
+            'cidade (icontains)': escolas.filter(cidade__nome__icontains=options['cidade']),
+            'nome (icontains)': escolas.filter(nome__icontains=options['nome']),
+            'bairro (icontains)': escolas.filter(bairro__icontains=options['bairro']),
+            'todas, ordenadas por estado': escolas.order_by('cidade__estado__nome'),
+            'todas, ordenadas por avaliação': escolas.order_by(F('avaliacoes_media').desc(nulls_last=True), 'id'),
+            'codigo_ibge (importação)': Escola.objects.filter(codigo_ibge=codigo_ibge),
+        }
+
+        self.stdout.write(f"Banco: {connection.vendor} - {Escola.objects.count()} escolas")
+        for descricao, queryset in consultas.items():
+            pagina = queryset[:30]
+            mediana_pagina, pior_pagina = medir(lambda: list(pagina.all()), options['repeticoes'])
+            mediana_total, pior_total = medir(queryset.count, options['repeticoes'])
+
+            self.stdout.write(self.style.MIGRATE_HEADING(f"\n{descricao}"))
+            self.stdout.write(
+                f"  primeira página: mediana {mediana_pagina:.1f} ms, pior {pior_pagina:.1f} ms\n"
+                f"  contagem:        mediana {mediana_total:.1f} ms, pior {pior_total:.1f} ms"
+            )
+            if not options['sem_plano']:
+                self.stdout.write('  plano:')
+                for linha in pagina.explain().splitlines():
+                    self.stdout.write(f'    {linha}')
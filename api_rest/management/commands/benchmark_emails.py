@@ -0,0 +1,72 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from api_rest.email_service import ConexaoSMTP, enviar_em_lote, montar_mensagem
+
+
+class Command(BaseCommand):
+    help = (
+        'Mede a vazão (mensagens por segundo) do envio de emails com uma conexão por mensagem e em lote '
+        '(`email_service.enviar_em_lote`), com e sem PIPELINING. '
+        'Use contra um servidor SMTP local de testes (ex.: `python -m aiosmtpd -n -l 127.0.0.1:8025`), '
+        'nunca contra o servidor de produção: as mensagens são realmente enviadas.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--host', default='127.0.0.1', help='Servidor SMTP de testes (padrão: 127.0.0.1).')
+        parser.add_argument('--porta', type=int, default=8025, help='Porta do servidor SMTP (padrão: 8025).')
+        parser.add_argument('--usuario', default='', help='Usuário SMTP; sem usuário, não faz login.')
+        parser.add_argument('--senha', default='', help='Senha SMTP.')
+        parser.add_argument('--sem-tls', action='store_true', help='Não inicia o STARTTLS.')
+        parser.add_argument('--mensagens', type=int, default=200, help='Mensagens enviadas em cada modo (padrão: 200).')
+        parser.add_argument(
+            '--limite', type=int, default=None,
+            help='Mensagens por conexão antes de renovar a sessão no envio em lote (padrão: só quando o servidor recusar).'
+        )
+
+    def handle(self, *args, **options):
+        servidor = (options['host'], options['porta'], options['usuario'], options['senha'])
+        opcoes = {'starttls': not options['sem_tls'], 'limite_mensagens': options['limite']}
+        mensagens = [
+            montar_mensagem(
+                settings.EMAIL_FROM, f'teste{numero}@example.com', 'Teste de vazão',
+                f'<p>Mensagem de teste número {numero}.</p>'
+            )
+            for numero in range(options['mensagens'])
+        ]
+
+        def uma_conexao_por_mensagem():
+            resultados = []
+            for mensagem in mensagens:
+                resultados += enviar_em_lote(*servidor, [mensagem], **opcoes)
+            return resultados
+
+        modos = {
+            'uma conexão por mensagem': uma_conexao_por_mensagem,
+            'lote sem PIPELINING': lambda: enviar_em_lote(*servidor, mensagens, pipelining=False, **opcoes),
+            'lote com PIPELINING': lambda: enviar_em_lote(*servidor, mensagens, **opcoes),
+        }
+        conexao = ConexaoSMTP(*servidor, starttls=opcoes['starttls'])
+        conexao.conectar()
+        anuncia = conexao.servidor.has_extn('pipelining')
+        conexao.fechar()
+        self.stdout.write(
+            f"{len(mensagens)} mensagens por modo em {options['host']}:{options['porta']} "
+            f"(PIPELINING {'anunciado' if anuncia else 'não anunciado'} pelo servidor)"
+        )
+
+        vazoes = {}
+        for descricao, modo in modos.items():
+            inicio = time.perf_counter()
+            resultados = modo()
+            duracao = time.perf_counter() - inicio
+            falhas = sum(
+                1 for resultado in resultados for codigo, _ in resultado.values() if codigo is None or codigo >= 400
+            )
+            vazoes[descricao] = len(mensagens) / max(duracao, 1e-9)
+            self.stdout.write(
+                f"  {descricao:26} {duracao:.2f} s, {vazoes[descricao]:.0f} mensagens/s, {falhas} destinatários com falha"
+            )
+        ganho = vazoes['lote com PIPELINING'] / max(vazoes['uma conexão por mensagem'], 1e-9)
+        self.stdout.write(self.style.SUCCESS(f"Envio em lote {ganho:.1f}x mais rápido que uma conexão por mensagem."))
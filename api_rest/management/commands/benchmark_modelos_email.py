@@ -0,0 +1,65 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.template.loader import render_to_string
+from api_rest.email_service import montar_mensagem, serializar_mensagem
+from api_rest.management.commands.benchmark_consultas import medir
+from api_rest.models import Escola
+from api_rest.modelos_email import EMAIL_CONFIRMACAO, EMAIL_CONFIRMACAO_AVALIACAO
+
+
+class Command(BaseCommand):
+    help = (
+        'Compara a montagem dos emails de confirmação com `render_to_string` + `montar_mensagem` e com os modelos '
+        'pré-compilados (`modelos_email`), conferindo que o HTML é idêntico e que a mensagem serializada é igual byte a byte.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--emails', type=int, default=2000, help='Emails montados em cada execução (padrão: 2000).')
+        parser.add_argument('--repeticoes', type=int, default=5, help='Execuções de cada etapa (padrão: 5).')
+
+    def handle(self, *args, **options):
+        escola = Escola.objects.order_by('id').first() or Escola(nome='Escola <Teste> & "Cia"')
+        casos = [
+            ('confirmação', EMAIL_CONFIRMACAO, {'codigo': '042137'}),
+            ('avaliação', EMAIL_CONFIRMACAO_AVALIACAO, {'escola': escola}),
+        ]
+        destinatario = 'usuario@example.com'
+        total = options['emails']
+
+        for descricao, modelo, contexto in casos:
+            html = render_to_string(modelo.nome_template, contexto)
+            if modelo.renderizar(contexto) != html:
+                self.stderr.write(self.style.ERROR(f'O HTML pré-compilado do email de {descricao} difere de render_to_string.'))
+                return
+            referencia = montar_mensagem(settings.EMAIL_FROM, destinatario, modelo.assunto, html)
+            referencia.set_boundary(modelo.obter_compilado()[-1].fronteira)
+            if serializar_mensagem(referencia) != modelo.mensagem(destinatario, contexto).dados:
+                self.stderr.write(self.style.ERROR(f'A mensagem pré-montada do email de {descricao} difere de montar_mensagem.'))
+                return
+
+            def render_to_string_montar_mensagem():
+                for _ in range(total):
+                    serializar_mensagem(montar_mensagem(
+                        settings.EMAIL_FROM, destinatario, modelo.assunto, render_to_string(modelo.nome_template, contexto)
+                    ))
+
+            def modelo_pre_compilado():
+                for _ in range(total):
+                    modelo.mensagem(destinatario, contexto)
+
+            etapas = {
+                'render_to_string': lambda: [render_to_string(modelo.nome_template, contexto) for _ in range(total)],
+                'renderizar (pré-compilado)': lambda: [modelo.renderizar(contexto) for _ in range(total)],
+                'render_to_string + MIME': render_to_string_montar_mensagem,
+                'modelo pré-compilado + MIME': modelo_pre_compilado,
+            }
+            self.stdout.write(f"Email de {descricao} ({total} emails) - HTML e mensagem idênticos")
+            medianas = {}
+            for etapa, funcao in etapas.items():
+                mediana, pior = medir(funcao, options['repeticoes'])
+                medianas[etapa] = mediana
+                self.stdout.write(
+                    f"  {etapa:28} mediana {mediana:.1f} ms ({mediana * 1000 / total:.1f} µs por email), pior {pior:.1f} ms"
+                )
+            ganho = medianas['render_to_string + MIME'] / max(medianas['modelo pré-compilado + MIME'], 1e-9)
+            self.stdout.write(self.style.SUCCESS(f"  Montagem do email {ganho:.1f}x mais rápida com o modelo pré-compilado."))
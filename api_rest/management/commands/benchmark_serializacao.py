@@ -0,0 +1,59 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Prefetch
+from rest_framework.renderers import JSONRenderer
+from api_rest.management.commands.benchmark_consultas import medir
+from api_rest.models import Escola, CensoEscolar
+from api_rest.recorte import relacoes_escola
+from api_rest.serializacao import plano_escola
+from api_rest.serializers import EscolaSerializer
+
+
+class Command(BaseCommand):
+    help = (
+        'Compara a serialização dos detalhes das escolas com `EscolaSerializer` e com o plano pré-compilado '
+        '(`serializacao.plano_escola`), conferindo que o JSON gerado é idêntico byte a byte.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--escolas', type=int, default=200, help='Número de escolas serializadas (padrão: 200).')
+        parser.add_argument('--repeticoes', type=int, default=5, help='Execuções de cada etapa (padrão: 5).')
+
+    def handle(self, *args, **options):
+        ids = list(Escola.objects.order_by('id').values_list('id', flat=True)[:options['escolas']])
+        escolas = Escola.objects.filter(pk__in=ids).order_by('id')
+        relacoes = relacoes_escola()
+
+        instancias = escolas.select_related('cidade__estado').prefetch_related(
+            Prefetch('censos', queryset=relacoes['censos'].select_related(
+                'infraestrutura__acessibilidade', 'infraestrutura__internet_aluno',
+                'infraestrutura__funcionarios', 'educacao__cotas'
+            )),
+            Prefetch('avaliacoes', queryset=relacoes['avaliacoes']),
+        )
+        carregadas = list(instancias)
+        plano = plano_escola()
+        linhas = plano.consultar(escolas, relacoes)
+
+        drf = EscolaSerializer(carregadas, many=True).data
+        rapido = plano.montar_linhas(*linhas)
+        renderer = JSONRenderer()
+        if renderer.render(drf) != renderer.render(rapido):
+            self.stderr.write(self.style.ERROR('O JSON do plano pré-compilado difere do gerado por EscolaSerializer.'))
+            return
+
+        etapas = {
+            'EscolaSerializer: consultas': lambda: list(instancias.all()),
+            'EscolaSerializer: serialização': lambda: EscolaSerializer(carregadas, many=True).data,
+            'plano: consultas': lambda: plano.consultar(escolas, relacoes),
+            'plano: serialização': lambda: plano.montar_linhas(*linhas),
+        }
+        medianas = {}
+        self.stdout.write(f"{len(ids)} escolas, {CensoEscolar.objects.filter(escola_id__in=ids).count()} censos - JSON idêntico")
+        for descricao, etapa in etapas.items():
+            mediana, pior = medir(etapa, options['repeticoes'])
+            medianas[descricao] = mediana
+            self.stdout.write(
+                f"  {descricao:32} mediana {mediana:.1f} ms ({mediana * 1000 / max(len(ids), 1):.0f} µs por escola), pior {pior:.1f} ms"
+            )
+        ganho = medianas['EscolaSerializer: serialização'] / max(medianas['plano: serialização'], 1e-9)
+        self.stdout.write(self.style.SUCCESS(f"Serialização {ganho:.1f}x mais rápida com o plano pré-compilado."))
@@ -1,21 +1,193 @@
+import hashlib
+import io
 import os
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain, islice, repeat
 import pandas as pd
 import warnings
 from warnings import simplefilter
 simplefilter(action='ignore', category=FutureWarning)
 
-from django.core.management.base import BaseCommand
+import django
+from django.core.cache import cache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Max
 from api_rest.models import (
-    Estado, Cidade, Escola, CensoEscolar,
+    Estado, Cidade, Escola, CensoEscolar, ImportacaoCenso,
     Acessibilidade, Internet, Funcionarios,
     Infraestrutura, Cotas, Educacao
 )
 from django.conf import settings
+from api_rest.cache import invalidar_escolas
+from api_rest.busca import reconstruir_indice_busca
+from api_rest.geo import carregar_ceps, celula_geo, normalizar_cep
+from api_rest.recursos import RECURSOS
+from api_rest.services import atualizar_ultimos_censos
 from pandas.errors import PerformanceWarning
 from tqdm import tqdm
 
 warnings.simplefilter(action='ignore', category=PerformanceWarning)
 
+TAMANHO_LOTE = 5000
+
+CAMPOS_ESCOLA = [
+    'codigo_ibge', 'nome', 'tipo_dependencia', 'categoria_escola_privada', 'localizacao',
+    'endereco', 'numero', 'complemento', 'bairro', 'cep', 'ddd', 'telefone',
+    'inicio_ano_letivo', 'fim_ano_letivo', 'recursos'
+]
+
+# Preenchidos apenas quando existe a tabela de coordenadas por CEP (censos/ceps.csv)
+CAMPOS_GEO = ['latitude', 'longitude', 'celula_geo']
+
+CAMPOS_ACESSIBILIDADE = {
+    'corrimao': 'IN_ACESSIBILIDADE_CORRIMAO',
+    'elevador': 'IN_ACESSIBILIDADE_ELEVADOR',
+    'pisos_tateis': 'IN_ACESSIBILIDADE_PISOS_TATEIS',
+    'vao_livre': 'IN_ACESSIBILIDADE_VAO_LIVRE',
+    'rampas': 'IN_ACESSIBILIDADE_RAMPAS',
+    'sinal_sonoro': 'IN_ACESSIBILIDADE_SINAL_SONORO',
+    'sinal_tatil': 'IN_ACESSIBILIDADE_SINAL_TATIL',
+    'sinal_visual': 'IN_ACESSIBILIDADE_SINAL_VISUAL',
+}
+
+CAMPOS_INTERNET = {
+    'internet_aluno': 'IN_INTERNET_ALUNOS',
+    'internet_administrativo': 'IN_INTERNET_ADMINISTRATIVO',
+    'internet_aprendizagem': 'IN_INTERNET_APRENDIZAGEM',
+    'internet_comunidade': 'IN_INTERNET_COMUNIDADE',
+    'internet_computador_aluno': 'IN_ACESSO_INTERNET_COMPUTADOR',
+    'internet_computador_pessoal_aluno': 'IN_ACES_INTERNET_DISP_PESSOAIS',
+}
+
+CAMPOS_FUNCIONARIOS = {
+    'administrativos_quantidade': 'QT_PROF_ADMINISTRATIVOS',
+    'servico_geral_quantidade': 'QT_PROF_SERVICOS_GERAIS',
+    'bibliotecario_quantidade': 'QT_PROF_BIBLIOTECARIO',
+    'saude_quantidade': 'QT_PROF_SAUDE',
+    'coordenador_quantidade': 'QT_PROF_COORDENADOR',
+    'fonoaudiologo_quantidade': 'QT_PROF_FONOAUDIOLOGO',
+    'nutricionista_quantidade': 'QT_PROF_NUTRICIONISTA',
+    'psicologo_quantidade': 'QT_PROF_PSICOLOGO',
+    'alimentacao_quantidade': 'QT_PROF_ALIMENTACAO',
+    'pedagogia_quantidade': 'QT_PROF_PEDAGOGIA',
+    'secretario_quantidade': 'QT_PROF_SECRETARIO',
+    'seguranca_quantidade': 'QT_PROF_SEGURANCA',
+    'monitores_quantidade': 'QT_PROF_MONITORES',
+    'gestao_quantidade': 'QT_PROF_GESTAO',
+    'assistente_social_quantidade': 'QT_PROF_ASSIST_SOCIAL',
+}
+
+CAMPOS_COTAS = {
+    'ppi': 'N_RESERVA_PPI',
+    'renda': 'IN_RESERVA_RENDA',
+    'escola_publica': 'IN_RESERVA_PUBLICA',
+    'pcd': 'IN_RESERVA_PCD',
+    'outros': 'IN_RESERVA_OUTROS',
+}
+
+CAMPOS_INFRAESTRUTURA = {
+    'agua_potavel': 'IN_AGUA_POTAVEL',
+    'almoxarifado': 'IN_ALMOXARIFADO',
+    'area_verde': 'IN_AREA_VERDE',
+    'auditorio': 'IN_AUDITORIO',
+    'banheiro': 'IN_BANHEIRO',
+    'banheiro_infantil': 'IN_BANHEIRO_EI',
+    'banheiro_pne': 'IN_BANHEIRO_PNE',
+    'banheiro_funcionarios': 'IN_BANHEIRO_FUNCIONARIOS',
+    'banheiro_chuveiro': 'IN_BANHEIRO_CHUVEIRO',
+    'biblioteca': 'IN_BIBLIOTECA',
+    'cozinha': 'IN_COZINHA',
+    'dormitorio_aluno': 'IN_DORMITORIO_ALUNO',
+    'dormitorio_professor': 'IN_DORMITORIO_PROFESSOR',
+    'lab_ciencias': 'IN_LABORATORIO_CIENCIAS',
+    'lab_informatica': 'IN_LABORATORIO_INFORMATICA',
+    'patio_coberto': 'IN_PATIO_COBERTO',
+    'patio_descoberto': 'IN_PATIO_DESCOBERTO',
+    'parque_infantil': 'IN_PARQUE_INFANTIL',
+    'piscina': 'IN_PISCINA',
+    'quadra_esportes_coberta': 'IN_QUADRA_ESPORTES_COBERTA',
+    'quadra_esportes_descoberta': 'IN_QUADRA_ESPORTES_DESCOBERTA',
+    'sala_artes': 'IN_SALA_ATELIE_ARTES',
+    'sala_musica': 'IN_SALA_MUSICA_CORAL',
+    'sala_danca': 'IN_SALA_ESTUDIO_DANCA',
+    'sala_recreativa': 'IN_SALA_MULTIUSO',
+    'sala_diretoria': 'IN_SALA_DIRETORIA',
+    'sala_leitura': 'IN_SALA_LEITURA',
+    'sala_professor': 'IN_SALA_PROFESSOR',
+    'sala_repouso_aluno': 'IN_SALA_REPOUSO_ALUNO',
+    'sala_secretaria': 'IN_SECRETARIA',
+    'sala_atendimento_especial': 'IN_SALA_ATENDIMENTO_ESPECIAL',
+    'terreirao_recreativo': 'IN_TERREIRAO',
+    'salas_quantidade': 'QT_SALAS_UTILIZADAS',
+    'salas_quantidade_fora': 'QT_SALAS_UTILIZADAS_FORA',
+    'salas_quantidade_dentro': 'QT_SALAS_UTILIZADAS_DENTRO',
+    'salas_climatizadas': 'QT_SALAS_UTILIZA_CLIMATIZADAS',
+    'salas_acessibilidade': 'QT_SALAS_UTILIZADAS_ACESSIVEIS',
+    'dvd_quantidade': 'QT_EQUIP_DVD',
+    'som_quantidade': 'QT_EQUIP_SOM',
+    'tv_quantidade': 'QT_EQUIP_TV',
+    'lousa_digital_quantidade': 'QT_EQUIP_LOUSA_DIGITAL',
+    'projetor_quantidade': 'QT_EQUIP_MULTIMIDIA',
+    'computador_quantidade': 'QT_DESKTOP_ALUNO',
+    'notebook_quantidade': 'QT_COMP_PORTATIL_ALUNO',
+    'tablet_quantidade': 'QT_TABLET_ALUNO',
+    'alimentacao': 'IN_ALIMENTACAO',
+    'rede_social': 'IN_REDES_SOCIAIS',
+}
+
+CAMPOS_EDUCACAO = {
+    'educacao_indigena': 'IN_EDUCACAO_INDIGENA',
+    'exame_selecao': 'IN_EXAME_SELECAO',
+    'gremio': 'IN_ORGAO_GREMIO_ESTUDANTIL',
+    'ead': 'IN_EAD',
+    'ed_inf_matricula_quantidade': 'QT_MAT_INF',
+    'ed_inf_docentes_quantidade': 'QT_DOC_INF',
+    'ed_inf_creche_matricula_quantidade': 'QT_MAT_INF_CRE',
+    'ed_inf_creche_docentes_quantidade': 'QT_DOC_INF_CRE',
+    'ed_inf_pre_escola_matricula_quantidade': 'QT_MAT_INF_PRE',
+    'ed_inf_pre_escola_docentes_quantidade': 'QT_DOC_INF_PRE',
+    'ed_fund_matricula_quantidade': 'QT_MAT_FUND',
+    'ed_fund_docentes_quantidade': 'QT_DOC_FUND',
+    'ed_fund_anos_iniciais_matricula_quantidade': 'QT_MAT_FUND_AI',
+    'ed_fund_anos_iniciais_docentes_quantidade': 'QT_DOC_FUND_AI',
+    'ed_fund_anos_finais_matricula_quantidade': 'QT_MAT_FUND_AF',
+    'ed_fund_anos_finais_docentes_quantidade': 'QT_DOC_FUND_AF',
+    'medio_matricula_quantidade': 'QT_MAT_MED',
+    'medio_docentes_quantidade': 'QT_DOC_MED',
+    'medio_tecnico_matricula_quantidade': 'QT_MAT_MED_CT',
+    'medio_tecnico_docentes_quantidade': 'QT_DOC_MED_CT',
+    'ed_profissional_matricula_quantidade': 'QT_MAT_PROF',
+    'ed_profissional_docentes_quantidade': 'QT_DOC_PROF',
+    'ed_tecnica_matricula_quantidade': 'QT_MAT_PROF_TEC',
+    'ed_tecnica_docentes_quantidade': 'QT_DOC_PROF_TEC',
+    'eja_matricula_quantidade': 'QT_MAT_EJA',
+    'eja_docentes_quantidade': 'QT_DOC_EJA',
+    'eja_fund_matricula_quantidade': 'QT_MAT_EJA_FUND',
+    'eja_fund_docentes_quantidade': 'QT_DOC_EJA_FUND',
+    'eja_fund_inicial_matricula_quantidade': 'QT_MAT_EJA_FUND_AI',
+    'eja_fund_inicial_docentes_quantidade': 'QT_DOC_EJA_FUND_AI',
+    'eja_fund_final_matricula_quantidade': 'QT_MAT_EJA_FUND_AF',
+    'eja_fund_final_docentes_quantidade': 'QT_DOC_EJA_FUND_AF',
+    'eja_medio_matricula_quantidade': 'QT_MAT_EJA_MED',
+    'eja_medio_docentes_quantidade': 'QT_DOC_EJA_MED',
+    'ed_especial_matricula_quantidade': 'QT_MAT_ESP',
+    'ed_especial_docentes_quantidade': 'QT_DOC_ESP',
+}
+
+COLUNAS_CENSO = list(dict.fromkeys(chain(
+    CAMPOS_ACESSIBILIDADE.values(), CAMPOS_INTERNET.values(), CAMPOS_FUNCIONARIOS.values(),
+    CAMPOS_COTAS.values(), CAMPOS_INFRAESTRUTURA.values(), CAMPOS_EDUCACAO.values()
+)))
+
+# Coluna do censo de cada recurso de `Escola.recursos`, na ordem dos bits de `api_rest.recursos.RECURSOS`
+COLUNAS_RECURSOS = [
+    {**CAMPOS_INFRAESTRUTURA, **CAMPOS_ACESSIBILIDADE, **CAMPOS_INTERNET}[nome] for nome, _ in RECURSOS
+]
+
 
 def chunked_queryset_fetch(model, field_name, values, chunk_size=500):
     result = []
@@ -26,30 +198,302 @@ def chunked_queryset_fetch(model, field_name, values, chunk_size=500):
         result.extend(qs)
     return result
 
-def chunked_censos_fetch(escola_ids, ano, chunk_size=500):
-    result = []
-    escola_ids_list = list(escola_ids)
-    for i in range(0, len(escola_ids_list), chunk_size):
-        chunk = escola_ids_list[i:i+chunk_size]
-        qs = CensoEscolar.objects.filter(escola_id__in=chunk, ano=ano)
-        result.extend(qs)
-    return result
+def calcular_checksum(file_path, tamanho_bloco=1024 * 1024):
+    """
+    Calcula o SHA-256 de um arquivo de censo, lendo-o em blocos.
+    """
+    sha256 = hashlib.sha256()
+    with open(file_path, 'rb') as arquivo:
+        for bloco in iter(lambda: arquivo.read(tamanho_bloco), b''):
+            sha256.update(bloco)
+    return sha256.hexdigest()
+
+def calcular_hashes(df):
+    """
+    Calcula, de forma vetorizada, um hash por linha sobre as colunas do censo que são gravadas no banco
+    (Infraestrutura, Educacao e tabelas relacionadas). Os valores são comparados como texto, para que o hash
+    não dependa do tipo inferido pelo pandas em cada bloco lido.
+
+    Retorna:
+    - list: Hashes hexadecimais de 16 caracteres, alinhados com as linhas de `df`.
+    """
+    hashes = pd.util.hash_pandas_object(df.reindex(columns=COLUNAS_CENSO).astype(str), index=False)
+    return ['{:016x}'.format(h) for h in hashes.tolist()]
+
+def apagar_dados_censos(censo_ids, chunk_size=500):
+    """
+    Apaga os registros de Infraestrutura, Educacao, Acessibilidade, Internet, Funcionarios e Cotas
+    ligados aos censos informados, mantendo as linhas de CensoEscolar.
+    """
+    censo_ids = list(censo_ids)
+    for i in range(0, len(censo_ids), chunk_size):
+        chunk = censo_ids[i:i+chunk_size]
+        infra_ids = list(Infraestrutura.objects.filter(censo_id__in=chunk).values_list(
+            'acessibilidade_id', 'internet_aluno_id', 'funcionarios_id'
+        ))
+        cotas_ids = list(Educacao.objects.filter(censo_id__in=chunk).values_list('cotas_id', flat=True))
+        Infraestrutura.objects.filter(censo_id__in=chunk).delete()
+        Educacao.objects.filter(censo_id__in=chunk).delete()
+        Acessibilidade.objects.filter(id__in=[ids[0] for ids in infra_ids]).delete()
+        Internet.objects.filter(id__in=[ids[1] for ids in infra_ids]).delete()
+        Funcionarios.objects.filter(id__in=[ids[2] for ids in infra_ids]).delete()
+        Cotas.objects.filter(id__in=cotas_ids).delete()
+
+def valores_coluna(df, coluna):
+    """
+    Retorna os valores de uma coluna do DataFrame como lista de tipos nativos do Python.
+    Colunas ausentes no arquivo recebem o valor padrão do tipo (0 para quantidades, False para indicadores).
+    """
+    if coluna in df.columns:
+        return df[coluna].tolist()
+    padrao = 0 if coluna.startswith('QT_') else False
+    return [padrao] * len(df)
+
+def montar_objetos(model, df, campos, **relacoes):
+    """
+    Monta instâncias de `model` a partir das colunas do DataFrame, sem percorrer as linhas com `iterrows`.
+    Os valores são passados posicionalmente, na ordem de `_meta.concrete_fields`, o caminho mais barato do construtor do Django.
+
+    Parâmetros:
+    - model: Classe do modelo a ser instanciado.
+    - df (DataFrame): Linhas já limpas do censo.
+    - campos (dict): Mapeamento campo do modelo -> coluna do DataFrame.
+    - relacoes: Listas de instâncias relacionadas, alinhadas com as linhas do DataFrame.
+    Campos fora de `campos` e de `relacoes` (ex.: agregados de avaliações da Escola) recebem o valor padrão do modelo.
+    """
+    colunas = []
+    for field in model._meta.concrete_fields:
+        if field.primary_key:
+            colunas.append(repeat(None))
+        elif field.name in relacoes:
+            colunas.append([obj.pk for obj in relacoes[field.name]])
+        elif field.name not in campos:
+            colunas.append(repeat(field.get_default()))
+        else:
+            colunas.append(valores_coluna(df, campos[field.name]))
+    return [model(*valores) for valores in zip(*colunas)]
+
+def valor_copy(valor):
+    """
+    Converte um valor do Python para o formato texto do COPY do PostgreSQL,
+    escapando barras invertidas, tabulações e quebras de linha.
+    """
+    if valor is None:
+        return '\\N'
+    if valor is True:
+        return 't'
+    if valor is False:
+        return 'f'
+    return str(valor).replace('\\', '\\\\').replace('\t', '\\t').replace('\n', '\\n').replace('\r', '\\r')
+
+def copiar_objetos(model, objetos):
+    """
+    Grava as instâncias com COPY FROM STDIN, a partir de um buffer em memória.
+
+    Como o COPY não devolve as chaves primárias, elas são reservadas antes na sequência da tabela
+    e atribuídas às instâncias, que saem daqui prontas para os relacionamentos, como no `bulk_create`.
+    Funciona com psycopg2 (`copy_expert`) e psycopg 3 (`cursor.copy`).
+    """
+    if not objetos:
+        return
+    tabela = model._meta.db_table
+    pk = model._meta.pk
+    campos = model._meta.concrete_fields
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT nextval(pg_get_serial_sequence(%s, %s)) FROM generate_series(1, %s)',
+            [tabela, pk.column, len(objetos)]
+        )
+        for obj, (id_reservado,) in zip(objetos, cursor.fetchall()):
+            obj.pk = id_reservado
+
+        buffer = io.StringIO()
+        for obj in objetos:
+            buffer.write('\t'.join(valor_copy(getattr(obj, field.attname)) for field in campos))
+            buffer.write('\n')
+
+        colunas = ', '.join(connection.ops.quote_name(field.column) for field in campos)
+        sql = f'COPY {connection.ops.quote_name(tabela)} ({colunas}) FROM STDIN'
+        if hasattr(cursor, 'copy_expert'):
+            buffer.seek(0)
+            cursor.copy_expert(sql, buffer)
+        else:
+            with cursor.copy(sql) as copy:
+                copy.write(buffer.getvalue())
+    for obj in objetos:
+        obj._state.adding = False
+        obj._state.db = connection.alias
+
+def inserir_objetos(model, objetos, loader='orm'):
+    """
+    Grava as instâncias com `bulk_create` ou, com `loader='copy'`, com COPY (`copiar_objetos`).
+    """
+    if loader == 'copy':
+        copiar_objetos(model, objetos)
+    else:
+        model.objects.bulk_create(objetos, batch_size=TAMANHO_LOTE)
+
+def criar_em_lotes(model, df, campos, descricao, loader='orm', **relacoes):
+    """
+    Cria os registros de `model` no banco em lotes de `TAMANHO_LOTE` linhas,
+    montando as instâncias de cada lote apenas quando ele é gravado.
+
+    Retorna:
+    - list: As instâncias criadas, na mesma ordem das linhas do DataFrame, já com as chaves primárias
+      devolvidas pelo banco (RETURNING) ou reservadas na sequência (COPY), prontas para os relacionamentos.
+    """
+    criados = []
+    for inicio in tqdm(range(0, len(df), TAMANHO_LOTE), desc=descricao, unit='lotes'):
+        fim = inicio + TAMANHO_LOTE
+        objetos = montar_objetos(
+            model, df.iloc[inicio:fim], campos,
+            **{campo: valores[inicio:fim] for campo, valores in relacoes.items()}
+        )
+        inserir_objetos(model, objetos, loader)
+        criados.extend(objetos)
+    return criados
+
+class ErroLeituraCenso(Exception):
+    """
+    Falha ao ler ou limpar um arquivo de censo. No modo incremental, interrompe apenas a importação daquele arquivo;
+    no modo completo, desfaz a importação inteira.
+    """
+
+def ler_censo(file_path, chunksize=None):
+    """
+    Abre um arquivo de censo com as opções de leitura do INEP.
+    Com `chunksize`, retorna um iterador de DataFrames com no máximo `chunksize` linhas cada.
+    """
+    return pd.read_csv(
+        file_path,
+        encoding='latin1',
+        delimiter=';',
+        decimal=',',
+        low_memory=False,
+        na_filter=False,    
+        keep_default_na=False,
+        converters={'NU_TELEFONE': lambda x: str(int(float(x))) if x.strip() and x.strip() != '.' else ''},
+        dtype={
+            'TP_SITUACAO_FUNCIONAMENTO': 'str',
+            'TP_DEPENDENCIA': 'Int64',
+            'TP_CATEGORIA_ESCOLA_PRIVADA': 'Int64'
+        },
+        chunksize=chunksize
+    )
+
+def limpar_censo(df):
+    """
+    Limpa um DataFrame lido por `ler_censo`, sem acessar o banco de dados.
+
+    Retorna:
+    - tuple: (df, escolas_df) com o censo limpo e os campos de Estado, Cidade e Escola já preparados.
+    """
+    comando = Command()
+    df['NU_TELEFONE'] = df['NU_TELEFONE'].astype(str)
+    df = comando.limpar_dados(df)
+    return df, comando.preparar_escolas(df)
+
+def carregar_censo(file_path):
+    """
+    Lê e limpa um arquivo de censo inteiro. Roda nos processos do pool de `--workers`.
+    """
+    return limpar_censo(ler_censo(file_path))
+
+def carregar_partes(file_path, chunksize=None):
+    """
+    Lê e limpa um arquivo de censo no processo atual, em blocos de `chunksize` linhas
+    (ou de uma vez, sem `chunksize`), convertendo falhas de leitura em `ErroLeituraCenso`.
+
+    Retorna:
+    - generator: Tuplas (df, escolas_df), uma por bloco.
+    """
+    try:
+        blocos = ler_censo(file_path, chunksize) if chunksize else [ler_censo(file_path)]
+        for bloco in blocos:
+            yield limpar_censo(bloco)
+    except Exception as e:
+        raise ErroLeituraCenso(e) from e
+
+def resultado_futuro(futuro):
+    """
+    Devolve o resultado de `carregar_censo` executado no pool, no mesmo formato de `carregar_partes`.
+    """
+    try:
+        resultado = futuro.result()
+    except Exception as e:
+        raise ErroLeituraCenso(e) from e
+    yield resultado
+
+def pico_memoria_mb():
+    """
+    Retorna o pico de memória residente (RSS) do processo em MB, ou None se a plataforma não informar.
+    """
+    try:
+        import resource
+    except ImportError:
+        return None
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == 'darwin':
+        return pico / (1024 * 1024)
+    return pico / 1024
 
 class Command(BaseCommand):
     help = 'Importa dados dos censos escolares para o banco de dados a partir de arquivos CSV'
 
-    def handle(self, *args, **options):
-        self.stdout.write("Apagando dados existentes...")
-        Infraestrutura.objects.all().delete()
-        Acessibilidade.objects.all().delete()
-        Internet.objects.all().delete()
-        Funcionarios.objects.all().delete()
-        Cotas.objects.all().delete()
-        Educacao.objects.all().delete()
-        CensoEscolar.objects.all().delete()
-
-        self.stdout.write(self.style.WARNING("Dados antigos apagados com sucesso."))
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=1,
+            help='Número de processos usados para ler e limpar os arquivos de censo em paralelo (padrão: 1).'
+        )
+        parser.add_argument(
+            '--incremental',
+            action='store_true',
+            help=(
+                'Não apaga os dados existentes: pula arquivos que não mudaram desde a última importação '
+                'e, nos demais, grava apenas as escolas novas ou com linhas alteradas.'
+            )
+        )
+        parser.add_argument(
+            '--chunksize',
+            type=int,
+            default=None,
+            help=(
+                'Lê, limpa e grava cada arquivo em blocos com este número de linhas, '
+                'mantendo a memória estável independentemente do tamanho do arquivo.'
+            )
+        )
+        parser.add_argument(
+            '--memoria',
+            action='store_true',
+            help='Informa o pico de memória (RSS) do processo ao final de cada arquivo.'
+        )
+        parser.add_argument(
+            '--loader',
+            choices=['orm', 'copy'],
+            default='orm',
+            help=(
+                'Forma de gravar os registros dos censos: "orm" usa bulk_create; "copy" usa COPY FROM STDIN '
+                '(apenas PostgreSQL; em outros bancos volta para "orm").'
+            )
+        )
 
+    def handle(self, *args, **options):
+        self.loader = options['loader']
+        if self.loader == 'copy' and connection.vendor != 'postgresql':
+            self.stdout.write(self.style.WARNING(
+                f'--loader copy exige PostgreSQL; usando bulk_create no banco {connection.vendor}.'
+            ))
+            self.loader = 'orm'
+
+        if not connection.features.can_return_rows_from_bulk_insert:
+            raise CommandError(
+                'O banco de dados precisa devolver as chaves primárias no bulk_create '
+                '(PostgreSQL, SQLite 3.35+ ou MariaDB 10.5+).'
+            )
+
+        incremental = options['incremental']
         self.stdout.write("Iniciando nova importação de censos...")
 
         censos_path = os.path.join(settings.BASE_DIR, 'censos')
@@ -58,7 +502,7 @@ class Command(BaseCommand):
             self.stderr.write(self.style.ERROR(f'Diretório "censos" não encontrado em {censos_path}.'))
             return
 
-        censo_files = [f for f in os.listdir(censos_path) if f.startswith('censo_') and f.endswith('.csv')]
+        censo_files = sorted(f for f in os.listdir(censos_path) if f.startswith('censo_') and f.endswith('.csv'))
 
         if not censo_files:
             self.stdout.write(self.style.WARNING('Nenhum arquivo de censo encontrado na pasta "censos/".'))
@@ -67,497 +511,322 @@ class Command(BaseCommand):
         self.stdout.write("Carregando Estados, Cidades e Escolas existentes...")
 
         estados_existentes = Estado.objects.all()
-        estado_cache = {estado.sigla: estado for estado in estados_existentes}
+        self.estado_cache = {estado.sigla: estado for estado in estados_existentes}
 
         cidades_existentes = Cidade.objects.select_related('estado').all()
-        cidade_cache = {(cidade.nome, cidade.estado.sigla): cidade for cidade in cidades_existentes}
+        self.cidade_cache = {(cidade.nome, cidade.estado.sigla): cidade for cidade in cidades_existentes}
 
         escolas_existentes = Escola.objects.all()
-        escola_cache = {str(escola.codigo_ibge).strip(): escola for escola in escolas_existentes}
+        self.escola_cache = {str(escola.codigo_ibge).strip(): escola for escola in escolas_existentes}
 
+        ceps_path = os.path.join(censos_path, 'ceps.csv')
+        self.coordenadas_cep = None
+        if os.path.exists(ceps_path):
+            self.stdout.write("Carregando coordenadas por CEP...")
+            self.coordenadas_cep = carregar_ceps(ceps_path)
+            self.stdout.write(f"{len(self.coordenadas_cep[0])} CEPs com coordenadas carregados.")
+        self.campos_escola = CAMPOS_ESCOLA + (CAMPOS_GEO if self.coordenadas_cep else [])
+
+        checksums_importados = dict(ImportacaoCenso.objects.values_list('arquivo', 'checksum'))
+
+        arquivos = []
+        checksums = {}
         for censo_file in censo_files:
-            self.stdout.write(f'Importando {censo_file}...')
-            file_path = os.path.join(censos_path, censo_file)
             ano_censo = self.extract_year_from_filename(censo_file)
             if not ano_censo:
                 self.stderr.write(f'Não foi possível extrair o ano do arquivo {censo_file}. Pulando esse arquivo...')
                 continue
-
-            try:
-                df = pd.read_csv(
-                    file_path,
-                    encoding='latin1',
-                    delimiter=';',
-                    decimal=',',
-                    low_memory=False,
-                    na_filter=False,    
-                    keep_default_na=False,
-                    converters={'NU_TELEFONE': lambda x: str(int(float(x))) if x.strip() and x.strip() != '.' else ''},
-                    dtype={
-                        'TP_SITUACAO_FUNCIONAMENTO': 'str',
-                        'TP_DEPENDENCIA': 'Int64',
-                        'TP_CATEGORIA_ESCOLA_PRIVADA': 'Int64'
-                    }
-                )
-            except Exception as e:
-                self.stderr.write(f'Erro ao ler {censo_file}: {e}')
+            file_path = os.path.join(censos_path, censo_file)
+            checksums[censo_file] = calcular_checksum(file_path)
+            if incremental and checksums_importados.get(censo_file) == checksums[censo_file]:
+                self.stdout.write(f'{censo_file} não mudou desde a última importação. Pulando esse arquivo...')
                 continue
+            arquivos.append((censo_file, file_path, ano_censo))
+
+        workers = options['workers']
+        if options['chunksize'] and workers > 1:
+            self.stdout.write(self.style.WARNING('--workers é ignorado quando --chunksize é usado.'))
+            workers = 1
+
+        if incremental:
+            # Cada arquivo é gravado na sua própria transação; um arquivo com erro de leitura é pulado
+            # e mantém os dados da importação anterior
+            self.importar_arquivos(arquivos, checksums, workers, options)
+        else:
+            # Apagar e recarregar em uma única transação: se a importação falhar, os dados anteriores continuam no banco
+            with transaction.atomic():
+                self.apagar_censos()
+                self.importar_arquivos(arquivos, checksums, workers, options)
+        invalidar_escolas()
+        if isinstance(cache, LocMemCache):
+            self.stdout.write(self.style.WARNING(
+                'O cache padrão é a memória local de cada processo: os servidores em execução continuarão servindo '
+                f'os detalhes antigos das escolas por até {settings.CACHE_TIMEOUT_ESCOLA} segundos.'
+            ))
+        self.stdout.write(self.style.SUCCESS('Importação de censos concluída com sucesso!'))
+        self.stdout.write(f"Total de escolas no banco: {Escola.objects.count()}")
 
-            df['NU_TELEFONE'] = df['NU_TELEFONE'].astype(str)
-
-            df = self.limpar_dados(df)
-            total_rows = len(df)
-            self.stdout.write(f"Total de linhas após limpeza: {total_rows}")
-
-            dados_estados = []
-            dados_cidades = []
-            dados_escolas = []
-            dados_censos = []
-
-            def str_or_none(val):
-                if pd.isna(val) or val == '' or val == 'nan':
-                    return None
-                return str(val)
-
-            for index, row in tqdm(df.iterrows(), total=total_rows, desc=f'Importando {censo_file}', unit='linhas'):
-                estado_sigla = str(row.get('SG_UF', '')).strip()
-                estado_nome = str(row.get('NO_UF', '')).strip()
-                estado_regiao = row.get('NO_REGIAO', 'Desconhecida')
-                ddd = str_or_none(row.get('NU_DDD', ''))
-                telefone = str_or_none(row.get('NU_TELEFONE', ''))
-
-                if estado_sigla and estado_sigla not in estado_cache:
-                    dados_estados.append((estado_sigla, estado_nome, estado_regiao))
-
-                cidade_nome = str(row.get('NO_MUNICIPIO', '')).strip()
-                if cidade_nome and estado_sigla and (cidade_nome, estado_sigla) not in cidade_cache:
-                    dados_cidades.append((cidade_nome, estado_sigla))
+    def apagar_censos(self):
+        self.stdout.write("Apagando dados existentes...")
+        Infraestrutura.objects.all().delete()
+        Acessibilidade.objects.all().delete()
+        Internet.objects.all().delete()
+        Funcionarios.objects.all().delete()
+        Cotas.objects.all().delete()
+        Educacao.objects.all().delete()
+        CensoEscolar.objects.all().delete()
+        ImportacaoCenso.objects.all().delete()
 
-                escola_codigo_ibge = str(row.get('CO_ENTIDADE', '')).strip()
-                if not escola_codigo_ibge or escola_codigo_ibge.lower() == 'nan':
-                    continue
+        self.stdout.write(self.style.WARNING("Dados antigos apagados com sucesso."))
 
-                val_tp_cat_priv = row.get('TP_CATEGORIA_ESCOLA_PRIVADA', '')
-                if pd.isna(val_tp_cat_priv):
-                    categoria_escola_privada = None
-                else:
-                    cat_str = str(val_tp_cat_priv).strip()
-                    if cat_str == '' or cat_str.lower() == 'nan':
-                        categoria_escola_privada = None
-                    else:
-                        categoria_escola_privada = int(cat_str)
-
-                inicio_ano_letivo = row.get('DT_ANO_LETIVO_INICIO')
-                fim_ano_letivo = row.get('DT_ANO_LETIVO_TERMINO')
-                if inicio_ano_letivo == '' or inicio_ano_letivo == 'nan':
-                    inicio_ano_letivo = None
-                if fim_ano_letivo == '' or fim_ano_letivo == 'nan':
-                    fim_ano_letivo = None
-
-                def str_or_empty(val):
-                    if pd.isna(val):
-                        return ''
-                    return str(val)
-
-                endereco = str_or_empty(row.get('DS_ENDERECO', ''))
-                numero = str_or_empty(row.get('NU_ENDERECO', ''))
-                complemento = str_or_empty(row.get('DS_COMPLEMENTO', ''))
-                bairro = str_or_empty(row.get('NO_BAIRRO', ''))
-                cep = str_or_empty(row.get('CO_CEP', ''))
-                ddd = str_or_none(row.get('NU_DDD', ''))
-                telefone = str_or_none(row.get('NU_TELEFONE', ''))
-
-                nome_entidade = str_or_empty(row.get('NO_ENTIDADE', 'Sem Nome')) or 'Sem Nome'
-                tipo_dep = row.get('TP_DEPENDENCIA', 1)
-                if pd.isna(tipo_dep):
-                    tipo_dep = 1
-                else:
-                    tipo_dep = int(tipo_dep)
+    def importar_arquivos(self, arquivos, checksums, workers, options):
+        """
+        Grava os arquivos de censo já lidos, um por transação, registrando cada um em `ImportacaoCenso`,
+        e ao final atualiza o censo mais recente de cada escola e o índice de busca.
+        Sem `--incremental`, um arquivo com erro de leitura interrompe a importação (`CommandError`),
+        desfazendo a limpeza feita em `apagar_censos`.
+        """
+        for censo_file, ano_censo, partes in self.carregar_arquivos(arquivos, workers, options['chunksize']):
+            self.stdout.write(f'Importando {censo_file}...')
+            try:
+                with transaction.atomic():
+                    self.iniciar_arquivo(ano_censo)
+                    linhas = 0
+                    for df, escolas_df in partes:
+                        linhas += len(df)
+                        self.stdout.write(f"Total de linhas após limpeza: {len(df)}")
+                        self.importar_censo(ano_censo, df, escolas_df)
+                        del df, escolas_df
+                    self.finalizar_arquivo()
+                    ImportacaoCenso.objects.update_or_create(
+                        arquivo=censo_file,
+                        defaults={'ano': ano_censo, 'checksum': checksums[censo_file], 'linhas': linhas}
+                    )
+            except ErroLeituraCenso as e:
+                if not options['incremental']:
+                    raise CommandError(f'Erro ao ler {censo_file}: {e}. Nenhum dado foi alterado.') from e
+                self.stderr.write(f'Erro ao ler {censo_file}: {e}')
+                continue
 
-                loc = row.get('TP_LOCALIZACAO', 1)
-                if pd.isna(loc):
-                    loc = 1
+            if options['memoria']:
+                pico = pico_memoria_mb()
+                if pico is None:
+                    self.stdout.write('Pico de memória indisponível nesta plataforma.')
                 else:
-                    loc = int(loc)
-
-                dados_escolas.append({
-                    'codigo_ibge': escola_codigo_ibge,
-                    'nome': nome_entidade,
-                    'tipo_dependencia': tipo_dep,
-                    'categoria_escola_privada': categoria_escola_privada,
-                    'localizacao': loc,
-                    'cidade_nome': cidade_nome,
-                    'estado_sigla': estado_sigla,
-                    'endereco': endereco,
-                    'numero': numero,
-                    'complemento': complemento,
-                    'bairro': bairro,
-                    'cep': cep,
-                    'ddd': ddd,
-                    'telefone': telefone,
-                    'inicio_ano_letivo': inicio_ano_letivo,
-                    'fim_ano_letivo': fim_ano_letivo,
-                })
-
-                dados_censos.append((escola_codigo_ibge, ano_censo, row))
-
-            dados_estados = list(set(dados_estados))
-            dados_cidades = list(set(dados_cidades))
-
-            novos_estados = []
-            for (estado_sigla, estado_nome, estado_regiao) in dados_estados:
-                if estado_sigla not in estado_cache:
-                    est = Estado(sigla=estado_sigla, nome=estado_nome, regiao=estado_regiao)
-                    novos_estados.append(est)
-
-            if novos_estados:
-                self.stdout.write("Criando novos estados...")
-                Estado.objects.bulk_create(novos_estados, ignore_conflicts=True)
-                self.stdout.write("Buscando novos estados do banco...")
-                siglas_estados = [e.sigla for e in novos_estados]
-                est_db = chunked_queryset_fetch(Estado, 'sigla', siglas_estados, 500)
-                for est in est_db:
-                    estado_cache[est.sigla] = est
-                self.stdout.write(f'{len(novos_estados)} novos estados adicionados.')
-
-            novos_cids = []
-            for (cidade_nome, estado_sigla) in dados_cidades:
-                if (cidade_nome, estado_sigla) not in cidade_cache:
-                    estado = estado_cache.get(estado_sigla)
-                    if not estado:
-                        continue
-                    cid = Cidade(nome=cidade_nome, estado=estado)
-                    novos_cids.append(cid)
-
-            if novos_cids:
-                self.stdout.write("Criando novas cidades...")
-                Cidade.objects.bulk_create(novos_cids, ignore_conflicts=True)
-                self.stdout.write("Buscando novas cidades do banco...")
-                nomes_cidades = [c.nome for c in novos_cids]
-                cids_db = chunked_queryset_fetch(Cidade, 'nome', nomes_cidades, 500)
-                for cid in cids_db:
-                    cidade_cache[(cid.nome, cid.estado.sigla)] = cid
-                self.stdout.write(f'{len(novos_cids)} novas cidades adicionadas.')
-
-            novos_escolas = []
-            codigos_escolas_novas = []
-            escolas_para_atualizar = []
-            
-            self.stdout.write("Verificando escolas existentes/novas...")
-            for esc_data in dados_escolas:
-                codigo_ibge = esc_data['codigo_ibge']
-                cid = cidade_cache.get((esc_data['cidade_nome'], esc_data['estado_sigla']))
+                    self.stdout.write(f'Pico de memória após {censo_file}: {pico:.1f} MB')
+
+        if arquivos:
+            self.stdout.write("Atualizando o censo mais recente de cada escola...")
+            atualizar_ultimos_censos()
+            self.stdout.write("Reconstruindo o índice de busca de escolas...")
+            reconstruir_indice_busca()
+
+    def carregar_arquivos(self, arquivos, workers, chunksize=None):
+        """
+        Lê e limpa os arquivos de censo, devolvendo-os na ordem de `arquivos`.
+
+        Com `workers` > 1 a leitura e a limpeza rodam em um pool de processos, mantendo no máximo
+        `workers` arquivos em andamento; as gravações no banco continuam no processo principal,
+        que é o único a manter os caches de Estado, Cidade e Escola.
+        Com `chunksize`, cada arquivo é lido em blocos no processo principal, à medida que é gravado.
+
+        Retorna:
+        - generator: Tuplas (arquivo, ano, partes), onde partes é um iterável de (df, escolas_df)
+          que lança `ErroLeituraCenso` se a leitura falhar.
+        """
+        if workers <= 1:
+            for censo_file, file_path, ano_censo in arquivos:
+                yield censo_file, ano_censo, carregar_partes(file_path, chunksize)
+            return
 
-                if not cid:
+        self.stdout.write(f"Lendo arquivos de censo com {workers} processos...")
+        with ProcessPoolExecutor(max_workers=workers, initializer=django.setup) as executor:
+            pendentes = deque()
+            fila = iter(arquivos)
+            for censo_file, file_path, ano_censo in islice(fila, workers):
+                pendentes.append((censo_file, ano_censo, executor.submit(carregar_censo, file_path)))
+
+            while pendentes:
+                censo_file, ano_censo, futuro = pendentes.popleft()
+                for proximo_file, proximo_path, proximo_ano in islice(fila, 1):
+                    pendentes.append((proximo_file, proximo_ano, executor.submit(carregar_censo, proximo_path)))
+                yield censo_file, ano_censo, resultado_futuro(futuro)
+
+    def iniciar_arquivo(self, ano_censo):
+        """
+        Carrega o estado do banco usado por todos os blocos de um mesmo arquivo:
+        o último ano de censo de cada escola e os censos já existentes para `ano_censo`.
+        """
+        self.ultimo_ano_por_escola = dict(
+            CensoEscolar.objects.values_list('escola_id').annotate(max_ano=Max('ano'))
+        )
+        self.censos_existentes = {
+            escola_id: (censo_id, hash_conteudo)
+            for censo_id, escola_id, hash_conteudo in CensoEscolar.objects.filter(ano=ano_censo).values_list(
+                'id', 'escola_id', 'hash_conteudo'
+            )
+        }
+        self.escolas_no_arquivo = set()
+
+    def finalizar_arquivo(self):
+        """
+        Remove os censos do ano que existiam no banco mas não apareceram em nenhum bloco do arquivo.
+        """
+        censos_removidos = [
+            censo_id for escola_id, (censo_id, _) in self.censos_existentes.items()
+            if escola_id not in self.escolas_no_arquivo
+        ]
+        if censos_removidos:
+            self.stdout.write(f"{len(censos_removidos)} censos removidos desde a última importação.")
+            apagar_dados_censos(censos_removidos)
+            for i in range(0, len(censos_removidos), 500):
+                CensoEscolar.objects.filter(id__in=censos_removidos[i:i+500]).delete()
+
+    def importar_censo(self, ano_censo, df, escolas_df):
+        estados_df = escolas_df.loc[
+            escolas_df['estado_sigla'] != '', ['estado_sigla', 'estado_nome', 'estado_regiao']
+        ].drop_duplicates()
+
+        novos_estados = []
+        for (estado_sigla, estado_nome, estado_regiao) in estados_df.itertuples(index=False):
+            if estado_sigla not in self.estado_cache:
+                est = Estado(sigla=estado_sigla, nome=estado_nome, regiao=estado_regiao)
+                novos_estados.append(est)
+
+        if novos_estados:
+            self.stdout.write("Criando novos estados...")
+            Estado.objects.bulk_create(novos_estados, ignore_conflicts=True)
+            self.stdout.write("Buscando novos estados do banco...")
+            siglas_estados = [e.sigla for e in novos_estados]
+            est_db = chunked_queryset_fetch(Estado, 'sigla', siglas_estados, 500)
+            for est in est_db:
+                self.estado_cache[est.sigla] = est
+            self.stdout.write(f'{len(novos_estados)} novos estados adicionados.')
+
+        cidades_df = escolas_df.loc[
+            (escolas_df['cidade_nome'] != '') & (escolas_df['estado_sigla'] != ''),
+            ['cidade_nome', 'estado_sigla']
+        ].drop_duplicates()
+
+        novos_cids = []
+        for (cidade_nome, estado_sigla) in cidades_df.itertuples(index=False):
+            if (cidade_nome, estado_sigla) not in self.cidade_cache:
+                estado = self.estado_cache.get(estado_sigla)
+                if not estado:
                     continue
-
-                i_ano = esc_data['inicio_ano_letivo']
-                if i_ano == '' or i_ano == 'nan':
-                    i_ano = None
-                f_ano = esc_data['fim_ano_letivo']
-                if f_ano == '' or f_ano == 'nan':
-                    f_ano = None
-
-                if codigo_ibge not in escola_cache:
-                    esc = Escola(
-                        codigo_ibge=codigo_ibge,
-                        nome=esc_data['nome'],
-                        tipo_dependencia=esc_data['tipo_dependencia'],
-                        categoria_escola_privada=esc_data['categoria_escola_privada'],
-                        localizacao=esc_data['localizacao'],
-                        cidade=cid,
-                        endereco=esc_data['endereco'],
-                        numero=esc_data['numero'],
-                        complemento=esc_data['complemento'],
-                        bairro=esc_data['bairro'],
-                        cep=esc_data['cep'],
-                        ddd=esc_data['ddd'],
-                        telefone=esc_data['telefone'],
-                        inicio_ano_letivo=i_ano,
-                        fim_ano_letivo=f_ano
-                    )
-                    novos_escolas.append(esc)
-                    codigos_escolas_novas.append(codigo_ibge)
-                else:
-                    escola_existente = escola_cache[codigo_ibge]
-                    anos_existentes = CensoEscolar.objects.filter(escola=escola_existente).values_list('ano', flat=True)
-                    if anos_existentes:
-                        max_ano = max(anos_existentes)
-                    else:
-                        max_ano = 0
-                    if ano_censo > max_ano:
-                        escolas_para_atualizar.append((escola_existente, esc_data, i_ano, f_ano, cid))
-
-            if novos_escolas:
-                self.stdout.write("Criando novas escolas...")
-                Escola.objects.bulk_create(novos_escolas, ignore_conflicts=True)
-                self.stdout.write("Buscando novas escolas do banco...")
-                esc_db = chunked_queryset_fetch(Escola, 'codigo_ibge', codigos_escolas_novas, 500)
-                for e_db in esc_db:
-                    escola_cache[e_db.codigo_ibge] = e_db
-                self.stdout.write(f'{len(novos_escolas)} novas escolas adicionadas.')
+                cid = Cidade(nome=cidade_nome, estado=estado)
+                novos_cids.append(cid)
+
+        if novos_cids:
+            self.stdout.write("Criando novas cidades...")
+            Cidade.objects.bulk_create(novos_cids, ignore_conflicts=True)
+            self.stdout.write("Buscando novas cidades do banco...")
+            siglas_por_id = {est.pk: sigla for sigla, est in self.estado_cache.items()}
+            nomes_cidades = [c.nome for c in novos_cids]
+            cids_db = chunked_queryset_fetch(Cidade, 'nome', nomes_cidades, 500)
+            for cid in cids_db:
+                self.cidade_cache[(cid.nome, siglas_por_id[cid.estado_id])] = cid
+            self.stdout.write(f'{len(novos_cids)} novas cidades adicionadas.')
+
+        escolas_df = escolas_df[escolas_df['codigo_ibge_valido']]
+        if self.coordenadas_cep:
+            escolas_df = self.geocodificar(escolas_df)
+        escolas_df = escolas_df.assign(cidade=[
+            self.cidade_cache.get(chave)
+            for chave in zip(escolas_df['cidade_nome'], escolas_df['estado_sigla'])
+        ])
+        escolas_com_cidade = escolas_df[escolas_df['cidade'].notna()]
+
+        self.stdout.write("Verificando escolas existentes/novas...")
+        ja_existe = escolas_com_cidade['codigo_ibge'].isin(list(self.escola_cache))
+        escolas_novas_df = escolas_com_cidade[~ja_existe]
+        escolas_existentes_df = escolas_com_cidade[ja_existe]
+
+        if len(escolas_novas_df):
+            self.stdout.write("Criando novas escolas...")
+            novos_escolas = montar_objetos(
+                Escola, escolas_novas_df, {campo: campo for campo in self.campos_escola},
+                cidade=escolas_novas_df['cidade'].tolist()
+            )
+            Escola.objects.bulk_create(novos_escolas, batch_size=TAMANHO_LOTE, ignore_conflicts=True)
+            self.stdout.write("Buscando novas escolas do banco...")
+            esc_db = chunked_queryset_fetch(Escola, 'codigo_ibge', escolas_novas_df['codigo_ibge'], 500)
+            for e_db in esc_db:
+                self.escola_cache[e_db.codigo_ibge] = e_db
+            self.stdout.write(f'{len(novos_escolas)} novas escolas adicionadas.')
+
+        if len(escolas_existentes_df):
+            escolas_para_atualizar = []
+            for esc_data in escolas_existentes_df[self.campos_escola + ['cidade']].to_dict('records'):
+                e = self.escola_cache[esc_data['codigo_ibge']]
+                if ano_censo >= self.ultimo_ano_por_escola.get(e.pk, 0) and self.atualizar_escola(e, esc_data):
+                    escolas_para_atualizar.append(e)
 
             if escolas_para_atualizar:
                 self.stdout.write("Atualizando escolas com dados mais recentes (usando bulk_update)...")
-
-                escola_ids = [e.pk for (e, _, _, _, _) in escolas_para_atualizar]
-                escolas_dict = Escola.objects.in_bulk(escola_ids)
-
-                for (escola_existente, esc_data, i_ano, f_ano, cid) in escolas_para_atualizar:
-                    e = escolas_dict[escola_existente.pk]
-                    e.nome = esc_data['nome']
-                    e.tipo_dependencia = esc_data['tipo_dependencia']
-                    e.categoria_escola_privada = esc_data['categoria_escola_privada']
-                    e.localizacao = esc_data['localizacao']
-                    e.cidade = cid
-                    e.endereco = esc_data['endereco']
-                    e.numero = esc_data['numero']
-                    e.complemento = esc_data['complemento']
-                    e.bairro = esc_data['bairro']
-                    e.cep = esc_data['cep']
-                    e.ddd = esc_data['ddd']
-                    e.telefone = esc_data['telefone']
-                    e.inicio_ano_letivo = i_ano
-                    e.fim_ano_letivo = f_ano
-
-                campos = [
-                    'nome', 'tipo_dependencia', 'categoria_escola_privada', 'localizacao',
-                    'cidade', 'endereco', 'numero', 'complemento', 'bairro', 'cep', 'ddd', 'telefone',
-                    'inicio_ano_letivo', 'fim_ano_letivo'
-                ]
-
-                Escola.objects.bulk_update(list(escolas_dict.values()), campos)
+                campos = [campo for campo in self.campos_escola if campo != 'codigo_ibge'] + ['cidade']
+                Escola.objects.bulk_update(escolas_para_atualizar, campos, batch_size=TAMANHO_LOTE)
                 self.stdout.write(f"{len(escolas_para_atualizar)} escolas atualizadas com sucesso.")
 
-                for e in escolas_dict.values():
-                    escola_cache[e.codigo_ibge] = e
-
-            self.stdout.write("Criando censos...")
-            novos_censos = []
-            censos_temp = []
-            for (codigo_ibge, ano, row) in dados_censos:
-                esc = escola_cache.get(codigo_ibge)
-                if esc:
-                    censo = CensoEscolar(escola=esc, ano=ano)
-                    novos_censos.append(censo)
-                    censos_temp.append((censo, row))
-
-            if novos_censos:
-                CensoEscolar.objects.bulk_create(novos_censos, ignore_conflicts=True)
-                self.stdout.write(f'{len(novos_censos)} novos censos adicionados.')
-
-            escola_ids = {c.escola_id for c in novos_censos}
-            censos_db = chunked_censos_fetch(escola_ids, ano_censo, 500)
-            censo_map = {(c.escola_id, c.ano): c for c in censos_db}
-
-            self.stdout.write("Montando dados de Acessibilidade, Internet, Funcionarios, Cotas...")
-            novos_acessibilidades = []
-            novos_internets = []
-            novos_funcionarios = []
-            novos_cotas = []
-            infra_rel = []
-            edu_rel = []
-
-            for censo, row in censos_temp:
-                censo_db = censo_map.get((censo.escola_id, censo.ano))
-                if not censo_db:
-                    continue
-                aces = Acessibilidade(
-                    corrimao=row.get('IN_ACESSIBILIDADE_CORRIMAO', False),
-                    elevador=row.get('IN_ACESSIBILIDADE_ELEVADOR', False),
-                    pisos_tateis=row.get('IN_ACESSIBILIDADE_PISOS_TATEIS', False),
-                    vao_livre=row.get('IN_ACESSIBILIDADE_VAO_LIVRE', False),
-                    rampas=row.get('IN_ACESSIBILIDADE_RAMPAS', False),
-                    sinal_sonoro=row.get('IN_ACESSIBILIDADE_SINAL_SONORO', False),
-                    sinal_tatil=row.get('IN_ACESSIBILIDADE_SINAL_TATIL', False),
-                    sinal_visual=row.get('IN_ACESSIBILIDADE_SINAL_VISUAL', False),
-                )
-                novos_acessibilidades.append(aces)
-
-                inte = Internet(
-                    internet_aluno=row.get('IN_INTERNET_ALUNOS', False),
-                    internet_administrativo=row.get('IN_INTERNET_ADMINISTRATIVO', False),
-                    internet_aprendizagem=row.get('IN_INTERNET_APRENDIZAGEM', False),
-                    internet_comunidade=row.get('IN_INTERNET_COMUNIDADE', False),
-                    internet_computador_aluno=row.get('IN_ACESSO_INTERNET_COMPUTADOR', False),
-                    internet_computador_pessoal_aluno=row.get('IN_ACES_INTERNET_DISP_PESSOAIS', False),
-                )
-                novos_internets.append(inte)
-
-                func = Funcionarios(
-                    administrativos_quantidade=row.get('QT_PROF_ADMINISTRATIVOS', 0),
-                    servico_geral_quantidade=row.get('QT_PROF_SERVICOS_GERAIS', 0),
-                    bibliotecario_quantidade=row.get('QT_PROF_BIBLIOTECARIO', 0),
-                    saude_quantidade=row.get('QT_PROF_SAUDE', 0),
-                    coordenador_quantidade=row.get('QT_PROF_COORDENADOR', 0),
-                    fonoaudiologo_quantidade=row.get('QT_PROF_FONOAUDIOLOGO', 0),
-                    nutricionista_quantidade=row.get('QT_PROF_NUTRICIONISTA', 0),
-                    psicologo_quantidade=row.get('QT_PROF_PSICOLOGO', 0),
-                    alimentacao_quantidade=row.get('QT_PROF_ALIMENTACAO', 0),
-                    pedagogia_quantidade=row.get('QT_PROF_PEDAGOGIA', 0),
-                    secretario_quantidade=row.get('QT_PROF_SECRETARIO', 0),
-                    seguranca_quantidade=row.get('QT_PROF_SEGURANCA', 0),
-                    monitores_quantidade=row.get('QT_PROF_MONITORES', 0),
-                    gestao_quantidade=row.get('QT_PROF_GESTAO', 0),
-                    assistente_social_quantidade=row.get('QT_PROF_ASSIST_SOCIAL', 0),
-                )
-                novos_funcionarios.append(func)
-
-                co = Cotas(
-                    ppi=row.get('N_RESERVA_PPI', False),
-                    renda=row.get('IN_RESERVA_RENDA', False),
-                    escola_publica=row.get('IN_RESERVA_PUBLICA', False),
-                    pcd=row.get('IN_RESERVA_PCD', False),
-                    outros=row.get('IN_RESERVA_OUTROS', False),
-                )
-                novos_cotas.append(co)
-
-                infra_rel.append((censo_db, row))
-                edu_rel.append((censo_db, row))
-
-            self.stdout.write("Criando registros de Acessibilidade, Internet, Funcionarios e Cotas...")
-            if novos_acessibilidades:
-                Acessibilidade.objects.bulk_create(novos_acessibilidades)
-                self.stdout.write(f"Criado {len(novos_acessibilidades)} registros de Acessibilidade.")
-            if novos_internets:
-                Internet.objects.bulk_create(novos_internets)
-                self.stdout.write(f"Criado {len(novos_internets)} registros de Internet.")
-            if novos_funcionarios:
-                Funcionarios.objects.bulk_create(novos_funcionarios)
-                self.stdout.write(f"Criado {len(novos_funcionarios)} registros de Funcionarios.")
-            if novos_cotas:
-                Cotas.objects.bulk_create(novos_cotas)
-                self.stdout.write(f"Criado {len(novos_cotas)} registros de Cotas.")
-
-            def fetch_last_objects(model, count):
-                objs = list(model.objects.all().order_by('-id')[:count])
-                objs.reverse()
-                return objs
-
-            acess_db = fetch_last_objects(Acessibilidade, len(novos_acessibilidades)) if novos_acessibilidades else []
-            inte_db = fetch_last_objects(Internet, len(novos_internets)) if novos_internets else []
-            funcs_db = fetch_last_objects(Funcionarios, len(novos_funcionarios)) if novos_funcionarios else []
-            cotas_db = fetch_last_objects(Cotas, len(novos_cotas)) if novos_cotas else []
-
-            self.stdout.write("Criando Infraestrutura e Educacao...")
-            novas_infraestruturas = []
-            novas_educacoes = []
-            for i, (censo_db, row) in enumerate(infra_rel):
-                aces = acess_db[i]
-                inte_obj = inte_db[i]
-                func_obj = funcs_db[i]
-
-                infra = Infraestrutura(
-                    censo=censo_db,
-                    agua_potavel=row.get('IN_AGUA_POTAVEL', False),
-                    almoxarifado=row.get('IN_ALMOXARIFADO', False),
-                    area_verde=row.get('IN_AREA_VERDE', False),
-                    auditorio=row.get('IN_AUDITORIO', False),
-                    banheiro=row.get('IN_BANHEIRO', False),
-                    banheiro_infantil=row.get('IN_BANHEIRO_EI', False),
-                    banheiro_pne=row.get('IN_BANHEIRO_PNE', False),
-                    banheiro_funcionarios=row.get('IN_BANHEIRO_FUNCIONARIOS', False),
-                    banheiro_chuveiro=row.get('IN_BANHEIRO_CHUVEIRO', False),
-                    biblioteca=row.get('IN_BIBLIOTECA', False),
-                    cozinha=row.get('IN_COZINHA', False),
-                    dormitorio_aluno=row.get('IN_DORMITORIO_ALUNO', False),
-                    dormitorio_professor=row.get('IN_DORMITORIO_PROFESSOR', False),
-                    lab_ciencias=row.get('IN_LABORATORIO_CIENCIAS', False),
-                    lab_informatica=row.get('IN_LABORATORIO_INFORMATICA', False),
-                    patio_coberto=row.get('IN_PATIO_COBERTO', False),
-                    patio_descoberto=row.get('IN_PATIO_DESCOBERTO', False),
-                    parque_infantil=row.get('IN_PARQUE_INFANTIL', False),
-                    piscina=row.get('IN_PISCINA', False),
-                    quadra_esportes_coberta=row.get('IN_QUADRA_ESPORTES_COBERTA', False),
-                    quadra_esportes_descoberta=row.get('IN_QUADRA_ESPORTES_DESCOBERTA', False),
-                    sala_artes=row.get('IN_SALA_ATELIE_ARTES', False),
-                    sala_musica=row.get('IN_SALA_MUSICA_CORAL', False),
-                    sala_danca=row.get('IN_SALA_ESTUDIO_DANCA', False),
-                    sala_recreativa=row.get('IN_SALA_MULTIUSO', False),
-                    sala_diretoria=row.get('IN_SALA_DIRETORIA', False),
-                    sala_leitura=row.get('IN_SALA_LEITURA', False),
-                    sala_professor=row.get('IN_SALA_PROFESSOR', False),
-                    sala_repouso_aluno=row.get('IN_SALA_REPOUSO_ALUNO', False),
-                    sala_secretaria=row.get('IN_SECRETARIA', False),
-                    sala_atendimento_especial=row.get('IN_SALA_ATENDIMENTO_ESPECIAL', False),
-                    terreirao_recreativo=row.get('IN_TERREIRAO', False),
-                    acessibilidade=aces,
-                    salas_quantidade=row.get('QT_SALAS_UTILIZADAS', 0),
-                    salas_quantidade_fora=row.get('QT_SALAS_UTILIZADAS_FORA', 0),
-                    salas_quantidade_dentro=row.get('QT_SALAS_UTILIZADAS_DENTRO', 0),
-                    salas_climatizadas=row.get('QT_SALAS_UTILIZA_CLIMATIZADAS', 0),
-                    salas_acessibilidade=row.get('QT_SALAS_UTILIZADAS_ACESSIVEIS', 0),
-                    dvd_quantidade=row.get('QT_EQUIP_DVD', 0),
-                    som_quantidade=row.get('QT_EQUIP_SOM', 0),
-                    tv_quantidade=row.get('QT_EQUIP_TV', 0),
-                    lousa_digital_quantidade=row.get('QT_EQUIP_LOUSA_DIGITAL', 0),
-                    projetor_quantidade=row.get('QT_EQUIP_MULTIMIDIA', 0),
-                    computador_quantidade=row.get('QT_DESKTOP_ALUNO', 0),
-                    notebook_quantidade=row.get('QT_COMP_PORTATIL_ALUNO', 0),
-                    tablet_quantidade=row.get('QT_TABLET_ALUNO', 0),
-                    internet_aluno=inte_obj,
-                    funcionarios=func_obj,
-                    alimentacao=row.get('IN_ALIMENTACAO', False),
-                    rede_social=row.get('IN_REDES_SOCIAIS', False),
-                )
-                novas_infraestruturas.append(infra)
-
-            for i, (censo_db, row) in enumerate(edu_rel):
-                co = cotas_db[i]
-                edu = Educacao(
-                    censo=censo_db,
-                    educacao_indigena=row.get('IN_EDUCACAO_INDIGENA', False),
-                    exame_selecao=row.get('IN_EXAME_SELECAO', False),
-                    cotas=co,
-                    gremio=row.get('IN_ORGAO_GREMIO_ESTUDANTIL', False),
-                    ead=row.get('IN_EAD', False),
-                    ed_inf_matricula_quantidade=row.get('QT_MAT_INF', 0),
-                    ed_inf_docentes_quantidade=row.get('QT_DOC_INF', 0),
-                    ed_inf_creche_matricula_quantidade=row.get('QT_MAT_INF_CRE', 0),
-                    ed_inf_creche_docentes_quantidade=row.get('QT_DOC_INF_CRE', 0),
-                    ed_inf_pre_escola_matricula_quantidade=row.get('QT_MAT_INF_PRE', 0),
-                    ed_inf_pre_escola_docentes_quantidade=row.get('QT_DOC_INF_PRE', 0),
-                    ed_fund_matricula_quantidade=row.get('QT_MAT_FUND', 0),
-                    ed_fund_docentes_quantidade=row.get('QT_DOC_FUND', 0),
-                    ed_fund_anos_iniciais_matricula_quantidade=row.get('QT_MAT_FUND_AI', 0),
-                    ed_fund_anos_iniciais_docentes_quantidade=row.get('QT_DOC_FUND_AI', 0),
-                    ed_fund_anos_finais_matricula_quantidade=row.get('QT_MAT_FUND_AF', 0),
-                    ed_fund_anos_finais_docentes_quantidade=row.get('QT_DOC_FUND_AF', 0),
-                    medio_matricula_quantidade=row.get('QT_MAT_MED', 0),
-                    medio_docentes_quantidade=row.get('QT_DOC_MED', 0),
-                    medio_tecnico_matricula_quantidade=row.get('QT_MAT_MED_CT', 0),
-                    medio_tecnico_docentes_quantidade=row.get('QT_DOC_MED_CT', 0),
-                    ed_profissional_matricula_quantidade=row.get('QT_MAT_PROF', 0),
-                    ed_profissional_docentes_quantidade=row.get('QT_DOC_PROF', 0),
-                    ed_tecnica_matricula_quantidade=row.get('QT_MAT_PROF_TEC', 0),
-                    ed_tecnica_docentes_quantidade=row.get('QT_DOC_PROF_TEC', 0),
-                    eja_matricula_quantidade=row.get('QT_MAT_EJA', 0),
-                    eja_docentes_quantidade=row.get('QT_DOC_EJA', 0),
-                    eja_fund_matricula_quantidade=row.get('QT_MAT_EJA_FUND', 0),
-                    eja_fund_docentes_quantidade=row.get('QT_DOC_EJA_FUND', 0),
-                    eja_fund_inicial_matricula_quantidade=row.get('QT_MAT_EJA_FUND_AI', 0),
-                    eja_fund_inicial_docentes_quantidade=row.get('QT_DOC_EJA_FUND_AI', 0),
-                    eja_fund_final_matricula_quantidade=row.get('QT_MAT_EJA_FUND_AF', 0),
-                    eja_fund_final_docentes_quantidade=row.get('QT_DOC_EJA_FUND_AF', 0),
-                    eja_medio_matricula_quantidade=row.get('QT_MAT_EJA_MED', 0),
-                    eja_medio_docentes_quantidade=row.get('QT_DOC_EJA_MED', 0),
-                    ed_especial_matricula_quantidade=row.get('QT_MAT_ESP', 0),
-                    ed_especial_docentes_quantidade=row.get('QT_DOC_ESP', 0),
-                )
-                novas_educacoes.append(edu)
-
-            self.stdout.write("Inserindo Infraestrutura no banco...")
-            if novas_infraestruturas:
-                Infraestrutura.objects.bulk_create(novas_infraestruturas)
-                self.stdout.write(f'{len(novas_infraestruturas)} novas infraestruturas adicionadas.')
-
-            self.stdout.write("Inserindo Educacao no banco...")
-            if novas_educacoes:
-                Educacao.objects.bulk_create(novas_educacoes)
-                self.stdout.write(f'{len(novas_educacoes)} novas educações adicionadas.')
+        self.stdout.write("Criando censos...")
+        escolas_censo = [self.escola_cache.get(codigo) for codigo in escolas_df['codigo_ibge']]
+        hashes = calcular_hashes(df.loc[escolas_df.index])
 
-        self.stdout.write(self.style.SUCCESS('Importação de censos concluída com sucesso!'))
-        self.stdout.write(f"Total de escolas no banco: {Escola.objects.count()}")
+        novos_censos = []
+        censos_alterados = []
+        gravar_linha = []
+        for esc, hash_conteudo in zip(escolas_censo, hashes):
+            if not esc or esc.pk in self.escolas_no_arquivo:
+                gravar_linha.append(False)
+                continue
+            self.escolas_no_arquivo.add(esc.pk)
+            existente = self.censos_existentes.get(esc.pk)
+            if existente is None:
+                novos_censos.append(CensoEscolar(escola=esc, ano=ano_censo, hash_conteudo=hash_conteudo))
+            elif existente[1] != hash_conteudo:
+                censos_alterados.append(CensoEscolar(pk=existente[0], escola=esc, ano=ano_censo, hash_conteudo=hash_conteudo))
+            gravar_linha.append(existente is None or existente[1] != hash_conteudo)
+
+        if censos_alterados:
+            self.stdout.write(f"{len(censos_alterados)} censos alterados desde a última importação.")
+            apagar_dados_censos([c.pk for c in censos_alterados])
+            CensoEscolar.objects.bulk_update(censos_alterados, ['hash_conteudo'], batch_size=TAMANHO_LOTE)
+
+        if novos_censos:
+            inserir_objetos(CensoEscolar, novos_censos, self.loader)
+            self.stdout.write(f'{len(novos_censos)} novos censos adicionados.')
+
+        censo_map = {c.escola_id: c for c in chain(novos_censos, censos_alterados)}
+
+        censos_linhas = [
+            censo_map.get(esc.pk) if gravar else None for esc, gravar in zip(escolas_censo, gravar_linha)
+        ]
+        com_censo = [censo is not None for censo in censos_linhas]
+        df_censos = df.loc[escolas_df.index[com_censo]]
+        censos_linhas = [censo for censo in censos_linhas if censo is not None]
+
+        self.stdout.write("Criando registros de Acessibilidade, Internet, Funcionarios e Cotas...")
+        novos_acessibilidades = criar_em_lotes(Acessibilidade, df_censos, CAMPOS_ACESSIBILIDADE, 'Acessibilidade', self.loader)
+        novos_internets = criar_em_lotes(Internet, df_censos, CAMPOS_INTERNET, 'Internet', self.loader)
+        novos_funcionarios = criar_em_lotes(Funcionarios, df_censos, CAMPOS_FUNCIONARIOS, 'Funcionarios', self.loader)
+        novos_cotas = criar_em_lotes(Cotas, df_censos, CAMPOS_COTAS, 'Cotas', self.loader)
+
+        self.stdout.write("Inserindo Infraestrutura no banco...")
+        novas_infraestruturas = criar_em_lotes(
+            Infraestrutura, df_censos, CAMPOS_INFRAESTRUTURA, 'Infraestrutura', self.loader,
+            censo=censos_linhas, acessibilidade=novos_acessibilidades, internet_aluno=novos_internets,
+            funcionarios=novos_funcionarios
+        )
+        if novas_infraestruturas:
+            self.stdout.write(f'{len(novas_infraestruturas)} novas infraestruturas adicionadas.')
+
+        self.stdout.write("Inserindo Educacao no banco...")
+        novas_educacoes = criar_em_lotes(
+            Educacao, df_censos, CAMPOS_EDUCACAO, 'Educacao', self.loader,
+            censo=censos_linhas, cotas=novos_cotas
+        )
+        if novas_educacoes:
+            self.stdout.write(f'{len(novas_educacoes)} novas educações adicionadas.')
 
     def extract_year_from_filename(self, filename):
         try:
@@ -571,6 +840,96 @@ class Command(BaseCommand):
             return None
         return None
 
+    def atualizar_escola(self, escola, esc_data):
+        """
+        Aplica os dados do censo em uma escola já existente.
+        Retorna True apenas se algum campo mudou, evitando regravar escolas idênticas com `bulk_update`.
+        """
+        mudou = False
+        for campo, valor in esc_data.items():
+            if campo == 'cidade':
+                if escola.cidade_id != valor.pk:
+                    escola.cidade = valor
+                    mudou = True
+                continue
+            valor = Escola._meta.get_field(campo).to_python(valor)
+            if getattr(escola, campo) != valor:
+                setattr(escola, campo, valor)
+                mudou = True
+        return mudou
+
+    def geocodificar(self, escolas_df):
+        """
+        Adiciona latitude, longitude e célula da grade às escolas, a partir da tabela de coordenadas por CEP.
+        Usa o CEP exato ou, se ele não estiver na tabela, o centroide do prefixo de 5 dígitos.
+        """
+        por_cep, por_prefixo = self.coordenadas_cep
+        coordenadas = []
+        for cep in escolas_df['cep'].map(normalizar_cep):
+            coordenadas.append(por_cep.get(cep) or por_prefixo.get(cep[:5]) or (None, None))
+        latitudes = [latitude for latitude, _ in coordenadas]
+        longitudes = [longitude for _, longitude in coordenadas]
+        return escolas_df.assign(
+            latitude=pd.Series(latitudes, index=escolas_df.index, dtype=object),
+            longitude=pd.Series(longitudes, index=escolas_df.index, dtype=object),
+            celula_geo=pd.Series(
+                [celula_geo(latitude, longitude) for latitude, longitude in coordenadas],
+                index=escolas_df.index, dtype=object
+            ),
+        )
+
+    def preparar_escolas(self, df):
+        """
+        Converte, coluna a coluna, os dados de Estado, Cidade e Escola do censo limpo
+        em um DataFrame com os campos já no formato dos modelos.
+        Os indicadores de infraestrutura, acessibilidade e internet viram a máscara `recursos` (ver `api_rest.recursos`).
+        O índice do resultado é o mesmo de `df`, o que permite alinhar as linhas com os demais registros do censo.
+        """
+        def texto(coluna, padrao=''):
+            if coluna not in df.columns:
+                return pd.Series(padrao, index=df.index, dtype=object)
+            serie = df[coluna]
+            return serie.astype(object).where(serie.notna(), '').astype(str)
+
+        def texto_ou_nulo(coluna):
+            serie = texto(coluna)
+            return serie.where(~serie.isin(['', 'nan']), None)
+
+        def inteiro(coluna, padrao):
+            if coluna not in df.columns:
+                return pd.Series(padrao, index=df.index, dtype=int)
+            return pd.to_numeric(df[coluna], errors='coerce').fillna(padrao).astype(int)
+
+        codigo_ibge = texto('CO_ENTIDADE').str.strip()
+        recursos = pd.Series(0, index=df.index, dtype='int64')
+        for bit, coluna in enumerate(COLUNAS_RECURSOS):
+            if coluna in df.columns:
+                recursos |= df[coluna].astype(bool).astype('int64') * (1 << bit)
+        categoria = pd.to_numeric(texto('TP_CATEGORIA_ESCOLA_PRIVADA').str.strip(), errors='coerce').astype('Int64')
+
+        return pd.DataFrame({
+            'estado_sigla': texto('SG_UF').str.strip(),
+            'estado_nome': texto('NO_UF').str.strip(),
+            'estado_regiao': df['NO_REGIAO'] if 'NO_REGIAO' in df.columns else 'Desconhecida',
+            'cidade_nome': texto('NO_MUNICIPIO').str.strip(),
+            'codigo_ibge': codigo_ibge,
+            'codigo_ibge_valido': (codigo_ibge != '') & (codigo_ibge.str.lower() != 'nan'),
+            'nome': texto('NO_ENTIDADE', 'Sem Nome').replace('', 'Sem Nome'),
+            'tipo_dependencia': inteiro('TP_DEPENDENCIA', 1),
+            'categoria_escola_privada': categoria.astype(object).where(categoria.notna(), None),
+            'localizacao': inteiro('TP_LOCALIZACAO', 1),
+            'endereco': texto('DS_ENDERECO'),
+            'numero': texto('NU_ENDERECO'),
+            'complemento': texto('DS_COMPLEMENTO'),
+            'bairro': texto('NO_BAIRRO'),
+            'cep': texto('CO_CEP'),
+            'ddd': texto_ou_nulo('NU_DDD'),
+            'telefone': texto_ou_nulo('NU_TELEFONE'),
+            'inicio_ano_letivo': texto_ou_nulo('DT_ANO_LETIVO_INICIO'),
+            'fim_ano_letivo': texto_ou_nulo('DT_ANO_LETIVO_TERMINO'),
+            'recursos': recursos,
+        }, index=df.index)
+
     def limpar_dados(self, df):
         import locale
         df.replace(88888, '', inplace=True)
@@ -592,7 +951,7 @@ class Command(BaseCommand):
                 df[col] = ''
             else:
                 parsed = pd.to_datetime(df[col], format=date_format, errors='coerce')
-                df[col] = parsed.apply(lambda x: x.date().isoformat() if pd.notnull(x) else '')
+                df[col] = parsed.dt.strftime('%Y-%m-%d').fillna('')
 
         numeric_cols = df.select_dtypes(include=['float64', 'int64']).columns
         numeric_cols = numeric_cols.difference(['NU_TELEFONE', 'NU_DDD'])
@@ -669,16 +1028,18 @@ class Command(BaseCommand):
             'IN_TERREIRAO',
         ]
 
+        bool_map = {
+            '1': True, 'sim': True, 's': True, 'true': True,
+            '0': False, 'não': False, 'n': False, 'nao': False,
+            '': False
+        }
         for col in boolean_cols:
             if col not in df.columns:
-                df[col] = ''
-            df[col] = df[col].astype(str).str.strip().str.lower().replace('nan', '')
-            bool_map = {
-                '1': True, 'sim': True, 's': True, 'true': True,
-                '0': False, 'não': False, 'n': False, 'nao': False,
-                '': False
-            }
-            df[col] = df[col].map(bool_map).fillna(False).astype(bool)
+                df[col] = False
+            elif pd.api.types.is_integer_dtype(df[col]) or pd.api.types.is_bool_dtype(df[col]):
+                df[col] = (df[col] == 1).fillna(False).astype(bool)
+            else:
+                df[col] = df[col].astype(str).str.lower().map(bool_map).fillna(False).astype(bool)
 
         count_cols = [
             'QT_SALAS_UTILIZADAS',
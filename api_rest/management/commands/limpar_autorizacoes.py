@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+from api_rest.services import limpar_autorizacoes
+
+
+class Command(BaseCommand):
+    help = (
+        'Remove em lotes as autorizações com código expirado, já usado ou invalidado, para manter a tabela pequena. '
+        'Feito para rodar periodicamente (ex.: cron a cada hora).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lote', type=int, default=1000, help='Autorizações removidas por DELETE (padrão: 1000).')
+
+    def handle(self, *args, **options):
+        removidas = limpar_autorizacoes(options['lote'])
+        self.stdout.write(self.style.SUCCESS(f'{removidas} autorizações removidas.'))
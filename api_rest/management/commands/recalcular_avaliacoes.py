@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+from api_rest.services import recalcular_avaliacoes
+
+
+class Command(BaseCommand):
+    help = (
+        'Recalcula a quantidade, a soma e a média das avaliações gravadas em cada escola '
+        'a partir da tabela de avaliações, corrigindo apenas as escolas divergentes.'
+    )
+
+    def handle(self, *args, **options):
+        corrigidas = recalcular_avaliacoes()
+        if corrigidas:
+            self.stdout.write(self.style.WARNING(f'{corrigidas} escolas tinham agregados de avaliações divergentes e foram corrigidas.'))
+        else:
+            self.stdout.write(self.style.SUCCESS('Agregados de avaliações de todas as escolas estão corretos.'))
@@ -0,0 +1,29 @@
+# Generated by Django 5.1.4 on 2026-10-18 06:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api_rest', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImportacaoCenso',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('arquivo', models.CharField(max_length=255, unique=True)),
+                ('ano', models.IntegerField()),
+                ('checksum', models.CharField(max_length=64)),
+                ('linhas', models.IntegerField(default=0)),
+                ('data_importacao', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='censoescolar',
+            name='hash_conteudo',
+            field=models.CharField(blank=True, default='', max_length=16),
+        ),
+    ]
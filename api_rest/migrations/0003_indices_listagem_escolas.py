@@ -0,0 +1,50 @@
+# Generated by Django 5.1.4 on 2026-10-18 07:00
+
+from django.db import migrations, models, transaction
+
+# Índices de trigramas para os filtros `__icontains` (UPPER("coluna"::text) LIKE UPPER('%...%') no PostgreSQL).
+# Só existem no PostgreSQL com a extensão pg_trgm; nos demais bancos a migração não faz nada.
+INDICES_TRIGRAMAS = [
+    ('escola_nome_trgm_idx', 'api_rest_escola', 'nome'),
+    ('escola_bairro_trgm_idx', 'api_rest_escola', 'bairro'),
+    ('cidade_nome_trgm_idx', 'api_rest_cidade', 'nome'),
+]
+
+
+def criar_indices_trigramas(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor != 'postgresql':
+        return
+    try:
+        with transaction.atomic(using=connection.alias):
+            schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    except Exception:
+        # Sem permissão para criar a extensão: os filtros continuam funcionando, apenas sem o índice.
+        return
+    for nome, tabela, coluna in INDICES_TRIGRAMAS:
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS "{nome}" ON "{tabela}" USING gin (UPPER("{coluna}"::text) gin_trgm_ops)'
+        )
+
+
+def remover_indices_trigramas(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for nome, _, _ in INDICES_TRIGRAMAS:
+        schema_editor.execute(f'DROP INDEX IF EXISTS "{nome}"')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api_rest', '0002_importacaocenso_censoescolar_hash_conteudo'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='escola',
+            name='codigo_ibge',
+            field=models.CharField(db_index=True, max_length=10),
+        ),
+        migrations.RunPython(criar_indices_trigramas, remover_indices_trigramas),
+    ]
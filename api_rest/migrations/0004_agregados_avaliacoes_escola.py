@@ -0,0 +1,47 @@
+# Generated by Django 5.1.4 on 2026-10-18 07:01
+
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def preencher_agregados(apps, schema_editor):
+    Escola = apps.get_model('api_rest', 'Escola')
+    Avaliacao = apps.get_model('api_rest', 'Avaliacao')
+    agregados = Avaliacao.objects.values('escola_id').annotate(quantidade=Count('id'), soma=Sum('nota'))
+    escolas = []
+    for agregado in agregados:
+        escolas.append(Escola(
+            pk=agregado['escola_id'],
+            avaliacoes_quantidade=agregado['quantidade'],
+            avaliacoes_soma=agregado['soma'],
+            avaliacoes_media=agregado['soma'] / agregado['quantidade'],
+        ))
+    Escola.objects.bulk_update(
+        escolas, ['avaliacoes_quantidade', 'avaliacoes_soma', 'avaliacoes_media'], batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api_rest', '0003_indices_listagem_escolas'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='escola',
+            name='avaliacoes_media',
+            field=models.FloatField(blank=True, db_index=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='escola',
+            name='avaliacoes_quantidade',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='escola',
+            name='avaliacoes_soma',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.RunPython(preencher_agregados, migrations.RunPython.noop),
+    ]
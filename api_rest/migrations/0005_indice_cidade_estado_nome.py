@@ -0,0 +1,17 @@
+# Generated by Django 5.1.4 on 2026-10-18 07:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api_rest', '0004_agregados_avaliacoes_escola'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='cidade',
+            index=models.Index(fields=['estado', 'nome'], name='cidade_estado_nome_idx'),
+        ),
+    ]
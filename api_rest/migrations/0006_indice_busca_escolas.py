@@ -0,0 +1,67 @@
+import unicodedata
+
+from django.db import migrations
+
+# Cópia congelada da estrutura de api_rest/busca.py no momento desta migração: alterações futuras
+# no módulo não devem mudar o que esta migração cria.
+TABELA_BUSCA = 'api_rest_escola_busca'
+TAMANHO_LOTE_BUSCA = 5000
+
+
+def normalizar_texto(texto):
+    if not texto:
+        return ''
+    decomposto = unicodedata.normalize('NFKD', texto)
+    return ''.join(c for c in decomposto if not unicodedata.combining(c)).lower()
+
+
+def criar_e_preencher(apps, schema_editor):
+    conexao = schema_editor.connection
+    if conexao.vendor == 'sqlite':
+        criar = [
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {TABELA_BUSCA} USING fts5("
+            f"nome, bairro, cidade, content='', tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+        ]
+        inserir = f'INSERT INTO {TABELA_BUSCA} (rowid, nome, bairro, cidade) VALUES (%s, %s, %s, %s)'
+    elif conexao.vendor == 'postgresql':
+        criar = [
+            f'CREATE TABLE IF NOT EXISTS {TABELA_BUSCA} (escola_id bigint PRIMARY KEY, documento tsvector NOT NULL)',
+            f'CREATE INDEX IF NOT EXISTS {TABELA_BUSCA}_idx ON {TABELA_BUSCA} USING gin (documento)',
+        ]
+        inserir = (
+            f"INSERT INTO {TABELA_BUSCA} (escola_id, documento) VALUES (%s, "
+            f"setweight(to_tsvector('simple', %s), 'A') || setweight(to_tsvector('simple', %s), 'B') || "
+            f"setweight(to_tsvector('simple', %s), 'C'))"
+        )
+    else:
+        return
+
+    Escola = apps.get_model('api_rest', 'Escola')
+    escolas = Escola.objects.using(conexao.alias).values_list('id', 'nome', 'bairro', 'cidade__nome')
+    with conexao.cursor() as cursor:
+        for sql in criar:
+            cursor.execute(sql)
+        lote = []
+        for escola_id, nome, bairro, cidade in escolas.iterator(chunk_size=TAMANHO_LOTE_BUSCA):
+            lote.append((escola_id, normalizar_texto(nome), normalizar_texto(bairro), normalizar_texto(cidade)))
+            if len(lote) == TAMANHO_LOTE_BUSCA:
+                cursor.executemany(inserir, lote)
+                lote = []
+        if lote:
+            cursor.executemany(inserir, lote)
+
+
+def remover(apps, schema_editor):
+    if schema_editor.connection.vendor in ('sqlite', 'postgresql'):
+        schema_editor.execute(f'DROP TABLE IF EXISTS {TABELA_BUSCA}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api_rest', '0005_indice_cidade_estado_nome'),
+    ]
+
+    operations = [
+        migrations.RunPython(criar_e_preencher, remover),
+    ]
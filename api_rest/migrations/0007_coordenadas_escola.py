@@ -0,0 +1,32 @@
+# Generated by Django 5.1.4 on 2026-10-18 07:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api_rest', '0006_indice_busca_escolas'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='escola',
+            name='celula_geo',
+            field=models.IntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='escola',
+            name='latitude',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='escola',
+            name='longitude',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='escola',
+            index=models.Index(fields=['celula_geo', 'latitude', 'longitude'], name='escola_celula_geo_idx'),
+        ),
+    ]
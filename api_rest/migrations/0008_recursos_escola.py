@@ -0,0 +1,88 @@
+# Generated by Django 5.1.4 on 2026-10-18 07:30
+
+from django.db import migrations, models
+
+# Cópia congelada de api_rest.recursos.RECURSOS no momento desta migração: o caminho, a partir de Infraestrutura,
+# do campo de cada bit de `Escola.recursos`, na ordem dos bits.
+CAMINHOS_RECURSOS = [
+    'agua_potavel',
+    'almoxarifado',
+    'area_verde',
+    'auditorio',
+    'banheiro',
+    'banheiro_infantil',
+    'banheiro_pne',
+    'banheiro_funcionarios',
+    'banheiro_chuveiro',
+    'biblioteca',
+    'cozinha',
+    'dormitorio_aluno',
+    'dormitorio_professor',
+    'lab_ciencias',
+    'lab_informatica',
+    'patio_coberto',
+    'patio_descoberto',
+    'parque_infantil',
+    'piscina',
+    'quadra_esportes_coberta',
+    'quadra_esportes_descoberta',
+    'sala_artes',
+    'sala_musica',
+    'sala_danca',
+    'sala_recreativa',
+    'sala_diretoria',
+    'sala_leitura',
+    'sala_professor',
+    'sala_repouso_aluno',
+    'sala_secretaria',
+    'sala_atendimento_especial',
+    'terreirao_recreativo',
+    'alimentacao',
+    'rede_social',
+    'acessibilidade__corrimao',
+    'acessibilidade__elevador',
+    'acessibilidade__pisos_tateis',
+    'acessibilidade__vao_livre',
+    'acessibilidade__rampas',
+    'acessibilidade__sinal_sonoro',
+    'acessibilidade__sinal_tatil',
+    'acessibilidade__sinal_visual',
+    'internet_aluno__internet_aluno',
+    'internet_aluno__internet_administrativo',
+    'internet_aluno__internet_aprendizagem',
+    'internet_aluno__internet_comunidade',
+    'internet_aluno__internet_computador_aluno',
+    'internet_aluno__internet_computador_pessoal_aluno',
+]
+
+
+def calcular_recursos(valores):
+    return sum(1 << bit for bit, valor in enumerate(valores) if valor)
+
+
+def preencher_recursos(apps, schema_editor):
+    Escola = apps.get_model('api_rest', 'Escola')
+    Infraestrutura = apps.get_model('api_rest', 'Infraestrutura')
+    linhas = Infraestrutura.objects.order_by('censo__escola_id', 'censo__ano').values_list(
+        'censo__escola_id', *CAMINHOS_RECURSOS
+    )
+    # O último censo de cada escola vem por último na ordenação e sobrescreve os anteriores
+    recursos = {escola_id: calcular_recursos(valores) for escola_id, *valores in linhas.iterator(chunk_size=5000)}
+    escolas = [Escola(pk=escola_id, recursos=mascara) for escola_id, mascara in recursos.items() if mascara]
+    Escola.objects.bulk_update(escolas, ['recursos'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api_rest', '0007_coordenadas_escola'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='escola',
+            name='recursos',
+            field=models.BigIntegerField(default=0),
+        ),
+        migrations.RunPython(preencher_recursos, migrations.RunPython.noop),
+    ]
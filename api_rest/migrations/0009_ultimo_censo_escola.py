@@ -0,0 +1,30 @@
+# Generated by Django 5.1.4 on 2026-10-18 07:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def preencher_ultimo_censo(apps, schema_editor):
+    Escola = apps.get_model('api_rest', 'Escola')
+    CensoEscolar = apps.get_model('api_rest', 'CensoEscolar')
+    ultimos = dict(
+        CensoEscolar.objects.order_by('escola_id', 'ano').values_list('escola_id', 'id').iterator(chunk_size=5000)
+    )
+    escolas = [Escola(pk=escola_id, ultimo_censo_id=censo_id) for escola_id, censo_id in ultimos.items()]
+    Escola.objects.bulk_update(escolas, ['ultimo_censo'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api_rest', '0008_recursos_escola'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='escola',
+            name='ultimo_censo',
+            field=models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='api_rest.censoescolar'),
+        ),
+        migrations.RunPython(preencher_ultimo_censo, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.1.4 on 2026-10-18 07:55
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def remover_autorizacoes_duplicadas(apps, schema_editor):
+    # Antes da restrição única, mantém só a autorização mais recente de cada email
+    Autorizacao = apps.get_model('api_rest', 'Autorizacao')
+    duplicados = (
+        Autorizacao.objects.values('email').annotate(total=Count('id')).filter(total__gt=1).values_list('email', flat=True)
+    )
+    for email in list(duplicados):
+        autorizacoes = Autorizacao.objects.filter(email=email)
+        mais_recente = autorizacoes.order_by('-data_criacao', '-id').values_list('id', flat=True).first()
+        autorizacoes.exclude(id=mais_recente).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api_rest', '0009_ultimo_censo_escola'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='autorizacao',
+            index=models.Index(fields=['data_criacao'], name='autorizacao_criacao_idx'),
+        ),
+        migrations.RunPython(remover_autorizacoes_duplicadas, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='autorizacao',
+            constraint=models.UniqueConstraint(fields=('email',), name='unique_autorizacao_email'),
+        ),
+    ]
@@ -0,0 +1,79 @@
+import threading
+
+from django.conf import settings
+from django.template import Context
+from django.template.base import TextNode, VariableNode, VariableDoesNotExist, render_value_in_context
+from django.template.loader import get_template
+
+from .email_service import EsqueletoMensagem
+
+class ModeloEmail:
+    """
+    Template de email compilado uma única vez por processo, com o seu assunto.
+
+    Na primeira renderização, o template é carregado e, se contiver só texto e variáveis sem filtros
+    (como `{{ codigo }}` e `{{ escola.nome }}`), vira uma string de formatação pronta: as renderizações seguintes
+    apenas resolvem as variáveis, escapam os valores como o Django e chamam `str.format`, sem montar `Context`
+    nem percorrer os nós do template. Templates com tags ou filtros usam o `render` do template já carregado.
+    As partes MIME fixas (remetente, assunto e cabeçalhos) ficam em um `EsqueletoMensagem`.
+    """
+
+    def __init__(self, nome_template, assunto):
+        self.nome_template = nome_template
+        self.assunto = assunto
+        self.compilado = None
+        self.trava = threading.Lock()
+
+    def compilar(self):
+        template = get_template(self.nome_template)
+        motor = template.template.engine
+        nos = template.template.nodelist
+        formato, variaveis = None, None
+        if all(isinstance(no, TextNode) or (isinstance(no, VariableNode) and not no.filter_expression.filters) for no in nos):
+            partes, variaveis = [], []
+            for no in nos:
+                if isinstance(no, TextNode):
+                    partes.append(no.s.replace('{', '{{').replace('}', '}}'))
+                else:
+                    partes.append(f'{{{len(variaveis)}}}')
+                    variaveis.append(no.filter_expression.var)
+            formato = ''.join(partes)
+        contexto = Context(autoescape=motor.autoescape)
+        esqueleto = EsqueletoMensagem(settings.EMAIL_FROM, self.assunto)
+        return template, formato, variaveis, motor.string_if_invalid, contexto, esqueleto
+
+    def obter_compilado(self):
+        if self.compilado is None:
+            with self.trava:
+                if self.compilado is None:
+                    self.compilado = self.compilar()
+        return self.compilado
+
+    def renderizar(self, contexto):
+        """
+        Renderiza o template com `contexto` (dict), com o mesmo resultado de `render_to_string`.
+        """
+        template, formato, variaveis, invalido, contexto_render, _ = self.obter_compilado()
+        if formato is None:
+            return template.render(contexto)
+        valores = []
+        for variavel in variaveis:
+            try:
+                valor = variavel.resolve(contexto)
+            except VariableDoesNotExist:
+                valor = invalido
+            valores.append(render_value_in_context(valor, contexto_render))
+        return formato.format(*valores)
+
+    def mensagem(self, destinatario, contexto):
+        """
+        Renderiza o template e monta a mensagem para `destinatario`, a partir das partes MIME pré-montadas.
+
+        Retorna:
+        - MensagemPronta: A mensagem, pronta para a fila de emails ou para `ConexaoSMTP`.
+        """
+        esqueleto = self.obter_compilado()[-1]
+        return esqueleto.mensagem(destinatario, self.renderizar(contexto))
+
+EMAIL_CONFIRMACAO = ModeloEmail('email_confirmacao.html', 'Código de Confirmação')
+EMAIL_CONFIRMACAO_AVALIACAO = ModeloEmail('email_confirmacao_avaliacao.html', 'Avaliação Adicionada com Sucesso')
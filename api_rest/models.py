@@ -15,6 +15,12 @@ class Cidade(models.Model):
     nome = models.CharField(max_length=100) # NO_MUNICIPIO
     estado = models.ForeignKey(Estado, on_delete=models.CASCADE, related_name='cidades')
 
+    class Meta:
+        indexes = [
+            # Filtro por estado e prefixo do nome em listar_cidades, já na ordem alfabética
+            models.Index(fields=['estado', 'nome'], name='cidade_estado_nome_idx'),
+        ]
+
     def __str__(self): 
         return f"{self.nome} - {self.estado.sigla}"
 
@@ -36,7 +42,7 @@ class Escola(models.Model):
         RURAL = 2, 'Rural'
 
     nome = models.CharField(max_length=255) # NO_ENTIDADE
-    codigo_ibge = models.CharField(max_length=10) # CO_ENTIDADE
+    codigo_ibge = models.CharField(max_length=10, db_index=True) # CO_ENTIDADE
     tipo_dependencia = models.IntegerField(choices=TipoDependencia.choices) # TP_DEPENDENCIA
     categoria_escola_privada = models.IntegerField(choices=CategoriaEscolaPrivada.choices, blank=True, null=True) # TP_CATEGORIA_ESCOLA_PRIVADA
     localizacao = models.IntegerField(choices=Localizacao.choices) # TP_LOCALIZACAO
@@ -50,7 +56,23 @@ class Escola(models.Model):
     telefone = models.CharField(max_length=10, blank=True, null=True) # NU_TELEFONE
     inicio_ano_letivo = models.DateField(blank=True, null=True) # DT_ANO_LETIVO_INICIO
     fim_ano_letivo = models.DateField(blank=True, null=True) # DT_ANO_LETIVO_TERMINO
+    avaliacoes_quantidade = models.IntegerField(default=0) # Mantido por registrar_avaliacao / recalcular_avaliacoes
+    avaliacoes_soma = models.IntegerField(default=0)
+    avaliacoes_media = models.FloatField(blank=True, null=True, db_index=True)
+    latitude = models.FloatField(blank=True, null=True) # Centroide do CEP (censos/ceps.csv)
+    longitude = models.FloatField(blank=True, null=True)
+    celula_geo = models.IntegerField(blank=True, null=True) # Célula da grade de geo.celula_geo
+    recursos = models.BigIntegerField(default=0) # Bits de recursos.RECURSOS, do censo mais recente
+    ultimo_censo = models.OneToOneField( # Censo mais recente, mantido por services.atualizar_ultimos_censos
+        'CensoEscolar', on_delete=models.SET_NULL, blank=True, null=True, related_name='+'
+    )
     
+    class Meta:
+        indexes = [
+            # Busca por proximidade: cobre a consulta de candidatas (célula, coordenadas e id) sem ler a tabela
+            models.Index(fields=['celula_geo', 'latitude', 'longitude'], name='escola_celula_geo_idx'),
+        ]
+
     def clean(self):
         if self.tipo_dependencia != self.TipoDependencia.PRIVADA and self.categoria_escola_privada is not None:
             raise ValidationError("Categoria de escola privada só é aplicável para escolas do tipo 'Privada'.")
@@ -60,11 +82,22 @@ class Escola(models.Model):
 class CensoEscolar(models.Model):
     escola = models.ForeignKey(Escola, on_delete=models.CASCADE, related_name='censos')
     ano = models.IntegerField() #NU_ANO_CENSO
+    hash_conteudo = models.CharField(max_length=16, blank=True, default='') # Hash da linha do CSV usada na importação incremental
     class Meta: 
         constraints = [
             models.UniqueConstraint(fields=['escola', 'ano'], name='unique_escola_ano')
         ]
 
+class ImportacaoCenso(models.Model):
+    arquivo = models.CharField(max_length=255, unique=True)
+    ano = models.IntegerField()
+    checksum = models.CharField(max_length=64) # SHA-256 do arquivo importado
+    linhas = models.IntegerField(default=0)
+    data_importacao = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.arquivo} ({self.ano})"
+
 class Acessibilidade(models.Model):
     corrimao = models.BooleanField() # IN_ACESSIBILIDADE_CORRIMAO
     elevador = models.BooleanField() # IN_ACESSIBILIDADE_ELEVADOR
@@ -223,9 +256,23 @@ class Avaliacao(models.Model):
     comentario = models.TextField(blank=True, null=True)
     data_criacao = models.DateTimeField(auto_now_add=True)
 
+# Tempo de validade de um código de confirmação
+VALIDADE_AUTORIZACAO = timedelta(minutes=30)
+
 class Autorizacao(models.Model):
     email = models.EmailField()
     codigo = models.CharField(max_length=6)
     data_criacao = models.DateTimeField(auto_now_add=True)
     valido = models.BooleanField(default=True)
-    def validar_expiracao(self): return timezone.now() > self.data_criacao + timedelta(minutes=30)
\ No newline at end of file
+    def validar_expiracao(self): return timezone.now() > self.data_criacao + VALIDADE_AUTORIZACAO
+
+    class Meta:
+        constraints = [
+            # Uma autorização por email: o novo código sobrescreve o anterior em um único upsert, e o índice único
+            # atende às consultas por (email, codigo, valido) e (email, valido), que acham no máximo uma linha
+            models.UniqueConstraint(fields=['email'], name='unique_autorizacao_email')
+        ]
+        indexes = [
+            # Remoção dos códigos expirados em limpar_autorizacoes
+            models.Index(fields=['data_criacao'], name='autorizacao_criacao_idx'),
+        ]
\ No newline at end of file
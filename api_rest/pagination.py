@@ -1,4 +1,13 @@
-from rest_framework.pagination import PageNumberPagination
+import json
+import math
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+
+from django.core.exceptions import ValidationError
+from django.db.models import F, Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
 
 class StandardResultsSetPagination(PageNumberPagination):
     """
@@ -11,4 +20,131 @@ class StandardResultsSetPagination(PageNumberPagination):
     """
     page_size = 30
     page_size_query_param = 'page_size'
-    max_page_size = 100
\ No newline at end of file
+    max_page_size = 100
+
+class CursorResultsSetPagination(BasePagination):
+    """
+    Paginação por cursor (keyset) para listas longas, opcional nos endpoints de listagem (`?paginacao=cursor`).
+
+    Em vez de `OFFSET`, cada página filtra as linhas posteriores à última linha da página anterior,
+    comparando os campos de `ordenacao` (que deve terminar em um campo único, como `id`), e não executa `COUNT(*)`.
+    Assim o custo de uma página não cresce com a sua profundidade e a ordem é estável mesmo com valores repetidos.
+
+    Parâmetros:
+    - `ordenacao` (list): Pares (campo, descendente). Campos nulos ficam no fim, em qualquer direção.
+
+    A configuração padrão define:
+    - `page_size`: Número de itens por página (30).
+    - `page_size_query_param`: Parâmetro de query para especificar o número de itens por página.
+    - `max_page_size`: Número máximo de itens que podem ser solicitados por página (100).
+    - `cursor_query_param`: Parâmetro de query com a posição da próxima página.
+    """
+    page_size = 30
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    cursor_query_param = 'cursor'
+
+    def __init__(self, ordenacao):
+        self.ordenacao = ordenacao
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        tamanho = self.get_page_size(request)
+        queryset = queryset.order_by(*[
+            F(campo).desc(nulls_last=True) if descendente else F(campo).asc(nulls_last=True)
+            for campo, descendente in self.ordenacao
+        ])
+
+        cursor = request.query_params.get(self.cursor_query_param)
+        if cursor:
+            queryset = queryset.filter(self.filtro_posterior(queryset.model, self.decodificar_cursor(cursor)))
+
+        resultados = list(queryset[:tamanho + 1])
+        self.tem_proxima = len(resultados) > tamanho
+        resultados = resultados[:tamanho]
+        self.ultimo = resultados[-1] if resultados else None
+        return resultados
+
+    def get_page_size(self, request):
+        try:
+            tamanho = int(request.query_params.get(self.page_size_query_param, self.page_size))
+        except ValueError:
+            return self.page_size
+        return min(max(tamanho, 1), self.max_page_size)
+
+    def filtro_posterior(self, model, valores):
+        """
+        Monta o filtro das linhas que vêm depois de `valores` na ordenação:
+        (a > x) OU (a = x E b > y) OU ..., tratando os nulos como os maiores valores.
+        """
+        if len(valores) != len(self.ordenacao):
+            raise NotFound('Cursor inválido.')
+        filtro = Q(pk__in=[])
+        iguais = Q()
+        for (campo, descendente), valor in zip(self.ordenacao, valores):
+            campo_modelo = self.campo_modelo(model, campo)
+            anulavel = campo_modelo.null
+            if valor is not None:
+                valor = self.converter_valor(campo_modelo, valor)
+            if valor is None:
+                iguais &= Q(**{f'{campo}__isnull': True})
+                continue
+            posterior = Q(**{f'{campo}__{"lt" if descendente else "gt"}': valor})
+            if anulavel:
+                posterior |= Q(**{f'{campo}__isnull': True})
+            filtro |= iguais & posterior
+            iguais &= Q(**{campo: valor})
+        return filtro
+
+    def converter_valor(self, campo, valor):
+        """
+        Converte um valor do cursor para o tipo do campo da ordenação, recusando valores que o banco não aceitaria
+        (tipos errados, listas e objetos JSON, números não finitos ou fora da faixa da coluna).
+        """
+        if isinstance(valor, (dict, list)) or (isinstance(valor, float) and not math.isfinite(valor)):
+            raise NotFound('Cursor inválido.')
+        try:
+            valor = campo.to_python(valor)
+            campo.run_validators(valor)
+        except (TypeError, ValueError, ValidationError):
+            raise NotFound('Cursor inválido.')
+        return valor
+
+    def campo_modelo(self, model, caminho):
+        *relacoes, nome = caminho.split('__')
+        for relacao in relacoes:
+            model = model._meta.get_field(relacao).related_model
+        return model._meta.get_field(nome)
+
+    def valores_linha(self, obj):
+        valores = []
+        for campo, _ in self.ordenacao:
+            valor = obj
+            for parte in campo.split('__'):
+                valor = getattr(valor, parte)
+            valores.append(valor)
+        return valores
+
+    def codificar_cursor(self, valores):
+        return urlsafe_b64encode(json.dumps(valores, separators=(',', ':')).encode()).decode()
+
+    def decodificar_cursor(self, cursor):
+        try:
+            valores = json.loads(urlsafe_b64decode(cursor.encode()))
+        except (TypeError, ValueError):
+            raise NotFound('Cursor inválido.')
+        if not isinstance(valores, list):
+            raise NotFound('Cursor inválido.')
+        return valores
+
+    def get_next_link(self):
+        if not self.tem_proxima:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.codificar_cursor(self.valores_linha(self.ultimo)))
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'results': data,
+        })
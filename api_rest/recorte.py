@@ -0,0 +1,130 @@
+import re
+from functools import reduce
+from operator import or_
+
+from django.db.models import F, Q
+
+from .models import Avaliacao, CensoEscolar, Escola
+from .serializacao import plano_escola
+
+def interpretar_anos(texto):
+    """
+    Interpreta o parâmetro `anos` dos detalhes da escola: anos e intervalos separados por vírgula
+    ("2021,2023", "2019-2023") ou `ultimo`, para apenas o censo mais recente (`Escola.ultimo_censo`).
+
+    Retorna:
+    - tuple: (intervalos, ultimo), com a lista de pares (inicio, fim) e se o censo mais recente foi pedido.
+
+    Lança:
+    - ValueError: Se algum item não for um ano, um intervalo válido ou `ultimo`.
+    """
+    intervalos = []
+    ultimo = False
+    for item in filter(None, (parte.strip() for parte in texto.split(','))):
+        if item == 'ultimo':
+            ultimo = True
+            continue
+        encontrado = re.fullmatch(r'(\d{4})(?:-(\d{4}))?', item)
+        if not encontrado:
+            raise ValueError(item)
+        inicio = int(encontrado.group(1))
+        fim = int(encontrado.group(2) or inicio)
+        if fim < inicio:
+            raise ValueError(item)
+        intervalos.append((inicio, fim))
+    if not intervalos and not ultimo:
+        raise ValueError(texto)
+    return intervalos, ultimo
+
+def interpretar_campos(texto):
+    """
+    Interpreta o parâmetro `campos`: caminhos separados por vírgula, com os níveis separados por ponto
+    (ex.: "nome,cidade,censos.ano,censos.infraestrutura.biblioteca").
+
+    Retorna:
+    - dict: Árvore campo -> subcampos, em que None significa o campo inteiro.
+    """
+    arvore = {}
+    for caminho in filter(None, (parte.strip() for parte in texto.split(','))):
+        *niveis, ultimo = caminho.split('.')
+        no = arvore
+        for nivel in niveis:
+            if nivel in no and no[nivel] is None:
+                break
+            no = no.setdefault(nivel, {})
+        else:
+            no[ultimo] = None
+    return arvore
+
+def recortar_dados(dados, campos):
+    """
+    Mantém em dados já serializados apenas os campos da árvore `campos`, descendo em dicionários e listas.
+    Campos desconhecidos são ignorados.
+    """
+    if campos is None:
+        return dados
+    if isinstance(dados, list):
+        return [recortar_dados(item, campos) for item in dados]
+    if isinstance(dados, dict):
+        return {nome: recortar_dados(valor, campos[nome]) for nome, valor in dados.items() if nome in campos}
+    return dados
+
+def recortar_escola(dados, anos=None, campos=None, limite_avaliacoes=None):
+    """
+    Aplica o recorte dos detalhes (anos, campos e limite de avaliações) aos detalhes completos da escola,
+    ex.: os guardados no cache, sem consultar o banco.
+    """
+    dados = dict(dados)
+    if anos is not None:
+        intervalos, ultimo = anos
+        # Nos detalhes completos estão todos os censos: o mais recente (`Escola.ultimo_censo`) é o de maior ano
+        ano_ultimo = max((censo['ano'] for censo in dados['censos']), default=None) if ultimo else None
+        dados['censos'] = [
+            censo for censo in dados['censos']
+            if censo['ano'] == ano_ultimo or any(inicio <= censo['ano'] <= fim for inicio, fim in intervalos)
+        ]
+    if limite_avaliacoes is not None:
+        dados['avaliacoes'] = dados['avaliacoes'][:limite_avaliacoes]
+    return recortar_dados(dados, campos)
+
+def relacoes_escola(escola_id=None, anos=None, limite_avaliacoes=None):
+    """
+    Monta as consultas das listas dos detalhes da escola: os censos, em ordem de ano, filtrados pelos `anos`,
+    e as avaliações, da mais recente para a mais antiga, limitadas a `limite_avaliacoes` (que exige `escola_id`).
+
+    Retorna:
+    - dict: Queryset de `censos` e de `avaliacoes`, no formato de `PlanoSerializacao.serializar`.
+    """
+    censos = CensoEscolar.objects.order_by('ano')
+    if anos is not None:
+        intervalos, ultimo = anos
+        filtros = [Q(ano__range=intervalo) for intervalo in intervalos]
+        if ultimo:
+            filtros.append(Q(pk=F('escola__ultimo_censo')))
+        censos = censos.filter(reduce(or_, filtros))
+
+    avaliacoes = Avaliacao.objects.order_by('-data_criacao', '-id')
+    if limite_avaliacoes is not None:
+        # Fatia calculada em uma subconsulta, para o filtro por escola do plano ainda poder ser aplicado
+        recentes = avaliacoes.filter(escola_id=escola_id).values('pk')[:limite_avaliacoes]
+        avaliacoes = avaliacoes.filter(pk__in=recentes)
+
+    return {'censos': censos, 'avaliacoes': avaliacoes}
+
+def serializar_escola(escola_id, anos=None, campos=None, limite_avaliacoes=None):
+    """
+    Serializa os detalhes de uma escola, completos ou recortados, consultando apenas o que será retornado.
+
+    Processo:
+    1. Obtém o plano de serialização dos campos pedidos (`serializacao.plano_escola`), que monta o mesmo JSON
+       de `EscolaSerializer` a partir de `values_list`: a escola, a cidade e o estado vêm em uma consulta,
+       e cada censo vem com as suas relações pedidas (infraestrutura, acessibilidade, internet etc.) em outra.
+    2. Os censos e as avaliações vêm das consultas de `relacoes_escola`; relações fora de `campos` não são consultadas.
+
+    Retorna:
+    - dict: Os detalhes da escola, ou None se a escola não existir.
+    """
+    escolas = plano_escola(campos).serializar(
+        Escola.objects.filter(pk=escola_id), relacoes_escola(escola_id, anos, limite_avaliacoes)
+    )
+    return escolas[0] if escolas else None
@@ -0,0 +1,73 @@
+# Recursos do último censo de cada escola guardados como bits em `Escola.recursos`.
+# Cada par é (nome usado no filtro, caminho do campo booleano a partir de Infraestrutura).
+# A posição na lista é o número do bit: novos recursos devem ser sempre acrescentados ao final.
+RECURSOS = [
+    ('agua_potavel', 'agua_potavel'),
+    ('almoxarifado', 'almoxarifado'),
+    ('area_verde', 'area_verde'),
+    ('auditorio', 'auditorio'),
+    ('banheiro', 'banheiro'),
+    ('banheiro_infantil', 'banheiro_infantil'),
+    ('banheiro_pne', 'banheiro_pne'),
+    ('banheiro_funcionarios', 'banheiro_funcionarios'),
+    ('banheiro_chuveiro', 'banheiro_chuveiro'),
+    ('biblioteca', 'biblioteca'),
+    ('cozinha', 'cozinha'),
+    ('dormitorio_aluno', 'dormitorio_aluno'),
+    ('dormitorio_professor', 'dormitorio_professor'),
+    ('lab_ciencias', 'lab_ciencias'),
+    ('lab_informatica', 'lab_informatica'),
+    ('patio_coberto', 'patio_coberto'),
+    ('patio_descoberto', 'patio_descoberto'),
+    ('parque_infantil', 'parque_infantil'),
+    ('piscina', 'piscina'),
+    ('quadra_esportes_coberta', 'quadra_esportes_coberta'),
+    ('quadra_esportes_descoberta', 'quadra_esportes_descoberta'),
+    ('sala_artes', 'sala_artes'),
+    ('sala_musica', 'sala_musica'),
+    ('sala_danca', 'sala_danca'),
+    ('sala_recreativa', 'sala_recreativa'),
+    ('sala_diretoria', 'sala_diretoria'),
+    ('sala_leitura', 'sala_leitura'),
+    ('sala_professor', 'sala_professor'),
+    ('sala_repouso_aluno', 'sala_repouso_aluno'),
+    ('sala_secretaria', 'sala_secretaria'),
+    ('sala_atendimento_especial', 'sala_atendimento_especial'),
+    ('terreirao_recreativo', 'terreirao_recreativo'),
+    ('alimentacao', 'alimentacao'),
+    ('rede_social', 'rede_social'),
+    ('corrimao', 'acessibilidade__corrimao'),
+    ('elevador', 'acessibilidade__elevador'),
+    ('pisos_tateis', 'acessibilidade__pisos_tateis'),
+    ('vao_livre', 'acessibilidade__vao_livre'),
+    ('rampas', 'acessibilidade__rampas'),
+    ('sinal_sonoro', 'acessibilidade__sinal_sonoro'),
+    ('sinal_tatil', 'acessibilidade__sinal_tatil'),
+    ('sinal_visual', 'acessibilidade__sinal_visual'),
+    ('internet_aluno', 'internet_aluno__internet_aluno'),
+    ('internet_administrativo', 'internet_aluno__internet_administrativo'),
+    ('internet_aprendizagem', 'internet_aluno__internet_aprendizagem'),
+    ('internet_comunidade', 'internet_aluno__internet_comunidade'),
+    ('internet_computador_aluno', 'internet_aluno__internet_computador_aluno'),
+    ('internet_computador_pessoal_aluno', 'internet_aluno__internet_computador_pessoal_aluno'),
+]
+
+BITS_RECURSOS = {nome: bit for bit, (nome, _) in enumerate(RECURSOS)}
+
+def mascara_recursos(nomes):
+    """
+    Converte nomes de recursos na máscara de bits correspondente.
+
+    Parâmetros:
+    - nomes (iterable): Nomes de recursos (ver `RECURSOS`).
+
+    Retorna:
+    - int: A máscara com os bits dos recursos informados.
+
+    Lança:
+    - KeyError: Se algum nome não for um recurso conhecido.
+    """
+    mascara = 0
+    for nome in nomes:
+        mascara |= 1 << BITS_RECURSOS[nome]
+    return mascara
@@ -0,0 +1,142 @@
+from functools import lru_cache
+
+from rest_framework import serializers
+
+from .serializers import EscolaSerializer, restringir_campos
+
+# Campos cujo valor vindo do banco já é o valor serializado (exceto None, que continua None)
+CAMPOS_DIRETOS = (
+    serializers.BooleanField, serializers.IntegerField, serializers.FloatField, serializers.CharField,
+    serializers.ChoiceField, serializers.PrimaryKeyRelatedField,
+)
+
+VALOR, ANINHADO, LISTA = range(3)
+
+class PlanoSerializacao:
+    """
+    Plano pré-compilado a partir de um serializer DRF para montar o mesmo JSON a partir de tuplas de `values_list`,
+    sem instanciar modelos nem percorrer os campos do serializer a cada objeto.
+
+    A introspecção do serializer é feita uma vez, na construção:
+    - campos simples viram um índice na tupla da linha e, se preciso, o `to_representation` do próprio campo
+      (datas, datas e horas); os demais são copiados como vieram do banco;
+    - serializers aninhados de relações um-para-um e chave estrangeira viram colunas da mesma consulta (`relacao__campo`),
+      e a relação ausente (ex.: censo sem infraestrutura) vira None, como no DRF;
+    - serializers com `many=True` viram uma consulta por relação, feita para todas as linhas de uma vez.
+    """
+
+    def __init__(self, serializer, prefixo='', colunas=None):
+        self.modelo = serializer.Meta.model
+        self.colunas = [] if colunas is None else colunas
+        self.passos = []
+        self.listas = {}
+        for nome, campo in serializer.fields.items():
+            if isinstance(campo, serializers.ListSerializer):
+                relacao = self.modelo._meta.get_field(campo.source)
+                self.listas[nome] = (PlanoSerializacao(campo.child), relacao.field.name)
+                self.passos.append((nome, LISTA, None))
+            elif isinstance(campo, serializers.BaseSerializer):
+                caminho = f'{prefixo}{campo.source}__'
+                filho = PlanoSerializacao(campo, caminho, self.colunas)
+                indice_pk = self.indice(caminho + filho.modelo._meta.pk.name)
+                self.passos.append((nome, ANINHADO, (filho, indice_pk)))
+            else:
+                conversor = None if isinstance(campo, CAMPOS_DIRETOS) else campo.to_representation
+                self.passos.append((nome, VALOR, (self.indice(prefixo + campo.source), conversor)))
+        self.indice_pk = self.indice(self.modelo._meta.pk.name) if self.listas else None
+
+    def indice(self, coluna):
+        if coluna not in self.colunas:
+            self.colunas.append(coluna)
+        return self.colunas.index(coluna)
+
+    def montar(self, linha, listas=None):
+        """
+        Monta o dicionário de uma linha, na ordem dos campos do serializer.
+        `listas` traz os itens já montados de cada relação `many=True`.
+        """
+        dados = {}
+        for nome, tipo, passo in self.passos:
+            if tipo is VALOR:
+                indice, conversor = passo
+                valor = linha[indice]
+                dados[nome] = valor if conversor is None or valor is None else conversor(valor)
+            elif tipo is ANINHADO:
+                filho, indice_pk = passo
+                dados[nome] = None if linha[indice_pk] is None else filho.montar(linha)
+            else:
+                dados[nome] = listas[nome]
+        return dados
+
+    def consultar(self, consulta, listas=None):
+        """
+        Lê do banco as linhas de `consulta` (queryset do modelo do plano) e das relações `many=True`.
+
+        Parâmetros:
+        - consulta (QuerySet): As linhas a serializar.
+        - listas (dict): Queryset de cada relação `many=True` (ex.: já filtrado e ordenado); as relações ausentes
+          são lidas por ordem de chave primária.
+
+        Retorna:
+        - tuple: (linhas, relacionadas), com as tuplas da consulta e, por relação, as tuplas relacionadas
+          (terminadas pela chave da linha de origem).
+        """
+        listas = listas or {}
+        linhas = list(consulta.values_list(*self.colunas))
+        pks = [linha[self.indice_pk] for linha in linhas] if self.listas else []
+        relacionadas = {}
+        for nome, (filho, chave) in self.listas.items():
+            relacionados = listas.get(nome, filho.modelo._default_manager.order_by('pk'))
+            relacionadas[nome] = list(relacionados.filter(**{f'{chave}__in': pks}).values_list(*filho.colunas, chave))
+        return linhas, relacionadas
+
+    def montar_linhas(self, linhas, relacionadas):
+        """
+        Monta os dicionários das linhas lidas por `consultar`, na ordem das linhas.
+        """
+        itens = {}
+        for nome, (filho, _) in self.listas.items():
+            grupos = {linha[self.indice_pk]: [] for linha in linhas}
+            for linha in relacionadas[nome]:
+                grupos[linha[-1]].append(filho.montar(linha))
+            itens[nome] = grupos
+        return [
+            self.montar(linha, {nome: grupos[linha[self.indice_pk]] for nome, grupos in itens.items()})
+            for linha in linhas
+        ]
+
+    def serializar(self, consulta, listas=None):
+        """
+        Serializa as linhas de `consulta` (ver `consultar`), na ordem da consulta.
+
+        Retorna:
+        - list: Um dicionário por linha, igual ao `data` do serializer de origem.
+        """
+        return self.montar_linhas(*self.consultar(consulta, listas))
+
+def congelar_campos(campos):
+    """
+    Converte a árvore de campos de `recorte.interpretar_campos` em uma forma imutável, usada como chave de cache.
+    """
+    if campos is None:
+        return None
+    return tuple(sorted((nome, congelar_campos(subcampos)) for nome, subcampos in campos.items()))
+
+def descongelar_campos(campos):
+    if campos is None:
+        return None
+    return {nome: descongelar_campos(subcampos) for nome, subcampos in campos}
+
+@lru_cache(maxsize=256)
+def plano_escola_congelado(campos):
+    serializer = EscolaSerializer()
+    if campos is not None:
+        restringir_campos(serializer, descongelar_campos(campos))
+    return PlanoSerializacao(serializer)
+
+def plano_escola(campos=None):
+    """
+    Retorna o plano de serialização dos detalhes da escola (`EscolaSerializer`), opcionalmente restrito à árvore `campos`.
+    Os planos são compilados uma vez por processo para cada conjunto de campos.
+    """
+    return plano_escola_congelado(congelar_campos(campos))
@@ -5,6 +5,21 @@ from .models import (
     Cidade, Estado, Avaliacao
 )
 
+def restringir_campos(serializer, campos):
+    """
+    Remove do serializer (e dos serializers aninhados) os campos fora da árvore `campos`,
+    no formato de `recorte.interpretar_campos`. Campos removidos não são lidos nem serializados.
+    """
+    for nome in list(serializer.fields):
+        if nome not in campos:
+            serializer.fields.pop(nome)
+        elif campos[nome] is not None:
+            aninhado = serializer.fields[nome]
+            aninhado = getattr(aninhado, 'child', aninhado)
+            if isinstance(aninhado, serializers.BaseSerializer):
+                restringir_campos(aninhado, campos[nome])
+    return serializer
+
 class EstadoSerializer(serializers.ModelSerializer):
     class Meta:
         model = Estado
@@ -59,7 +74,7 @@ class CensoEscolarSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = CensoEscolar
-        fields = '__all__'
+        exclude = ['hash_conteudo']
 
 class AvaliacaoSerializer(serializers.ModelSerializer):
     class Meta:
@@ -68,7 +83,7 @@ class AvaliacaoSerializer(serializers.ModelSerializer):
 
 class EscolaListSerializer(serializers.ModelSerializer):
     cidade = CidadeSerializer(read_only=True)
-    average_avaliacoes = serializers.FloatField(read_only=True)
+    average_avaliacoes = serializers.FloatField(source='avaliacoes_media', read_only=True)
 
     class Meta:
         model = Escola
@@ -81,4 +96,6 @@ class EscolaSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Escola
-        fields = '__all__'
\ No newline at end of file
+        # Colunas de controle (agregados das avaliações, grade geográfica, bits de recursos e ponteiro do último censo)
+        # ficam fora da API; a média das avaliações continua pública
+        exclude = ['avaliacoes_soma', 'avaliacoes_quantidade', 'celula_geo', 'recursos', 'ultimo_censo']
\ No newline at end of file
@@ -1,11 +1,14 @@
 import random
 import string
+from django.db import transaction
+from django.db.models import Count, F, FloatField, OuterRef, Q, Subquery, Sum
+from django.db.models.functions import Cast
 from django.utils import timezone
-from .models import Autorizacao
-from .email_service import enviar_email_mailersend
-from django.template.loader import render_to_string
-from django.conf import settings
+from .models import VALIDADE_AUTORIZACAO, Autorizacao, Avaliacao, CensoEscolar, Escola
+from .fila_emails import enfileirar_mensagem
+from .modelos_email import EMAIL_CONFIRMACAO, EMAIL_CONFIRMACAO_AVALIACAO
 from .jwt_utils import gerar_jwt
+from .cache import invalidar_escola, invalidar_escolas
 
 def gerar_codigo_confirmacao(length=6):
     """    
@@ -28,22 +31,11 @@ def enviar_email_confirmacao(email, codigo):
     - codigo (str): O código de confirmação a ser enviado.
 
     Processo:
-    1. Define o assunto do email.
-    2. Renderiza o corpo do email utilizando um template HTML.
-    3. Envia o email utilizando a função 'enviar_email_mailersend' com as configurações SMTP.
-    """
-    assunto = "Código de Confirmação"
-    corpo_html = render_to_string('email_confirmacao.html', {'codigo': codigo})
-    enviar_email_mailersend(
-        smtp_host=settings.SMTP_HOST,
-        smtp_port=settings.SMTP_PORT,
-        usuario=settings.SMTP_USER,
-        senha=settings.SMTP_PASSWORD,
-        remetente=settings.EMAIL_FROM,
-        destinatario=email,
-        assunto=assunto,
-        corpo_html=corpo_html
-    )
+    1. Renderiza o corpo do email com o template pré-compilado ('EMAIL_CONFIRMACAO', com o assunto do email).
+    2. Monta a mensagem a partir das partes MIME já prontas do template.
+    3. Coloca o email na fila de envio em segundo plano ('enfileirar_mensagem'), sem esperar o servidor SMTP.
+    """
+    enfileirar_mensagem(EMAIL_CONFIRMACAO.mensagem(email, {'codigo': codigo}))
 
 def enviar_email_confirmacao_avaliacao(email, escola):
     """
@@ -54,22 +46,11 @@ def enviar_email_confirmacao_avaliacao(email, escola):
     - escola (Escola): A instância da escola que foi avaliada.
 
     Processo:
-    1. Define o assunto do email.
-    2. Renderiza o corpo do email utilizando um template HTML, passando os detalhes da escola.
-    3. Envia o email utilizando a função 'enviar_email_mailersend' com as configurações SMTP.
-    """
-    assunto = "Avaliação Adicionada com Sucesso"
-    corpo_html = render_to_string('email_confirmacao_avaliacao.html', {'escola': escola})
-    enviar_email_mailersend(
-        smtp_host=settings.SMTP_HOST,
-        smtp_port=settings.SMTP_PORT,
-        usuario=settings.SMTP_USER,
-        senha=settings.SMTP_PASSWORD,
-        remetente=settings.EMAIL_FROM,
-        destinatario=email,
-        assunto=assunto,
-        corpo_html=corpo_html
-    )
+    1. Renderiza o corpo do email com o template pré-compilado ('EMAIL_CONFIRMACAO_AVALIACAO'), passando a escola.
+    2. Monta a mensagem a partir das partes MIME já prontas do template.
+    3. Coloca o email na fila de envio em segundo plano ('enfileirar_mensagem'), sem esperar o servidor SMTP.
+    """
+    enfileirar_mensagem(EMAIL_CONFIRMACAO_AVALIACAO.mensagem(email, {'escola': escola}))
 
 def criar_ou_atualizar_autorizacao(email):
     """
@@ -80,17 +61,17 @@ def criar_ou_atualizar_autorizacao(email):
 
     Processo:
     1. Gera um novo código de confirmação utilizando 'gerar_codigo_confirmacao'.
-    2. Atualiza ou cria uma instância de 'Autorizacao' no banco de dados com o email, código gerado,
-       data de criação atual e marca como válida.
+    2. Cria a 'Autorizacao' do email ou sobrescreve a existente (email único) com o código gerado,
+       a data de criação atual e marcada como válida, em um único upsert (INSERT ... ON CONFLICT DO UPDATE).
     3. Retorna o código de confirmação gerado.
 
     Retorna:
     - str: O código de confirmação gerado.
     """
     codigo = gerar_codigo_confirmacao()
-    Autorizacao.objects.update_or_create(
-        email=email,
-        defaults={'codigo': codigo, 'data_criacao': timezone.now(), 'valido': True}
+    Autorizacao.objects.bulk_create(
+        [Autorizacao(email=email, codigo=codigo, data_criacao=timezone.now(), valido=True)],
+        update_conflicts=True, unique_fields=['email'], update_fields=['codigo', 'data_criacao', 'valido'],
     )
     return codigo
 
@@ -133,4 +114,109 @@ def gerar_token_para_email(email):
     1. Utiliza a função 'gerar_jwt' para criar um token contendo o email e outras informações necessárias.
     2. Retorna o token JWT.
     """
-    return gerar_jwt(email)
\ No newline at end of file
+    return gerar_jwt(email)
+
+def registrar_avaliacao(escola, email, nota, comentario):
+    """
+    Cria uma avaliação e atualiza, na mesma transação, os agregados de avaliações da escola.
+
+    Parâmetros:
+    - escola (Escola): A escola avaliada.
+    - email (str): O endereço de email de quem avaliou.
+    - nota (int): A nota da avaliação.
+    - comentario (str): O comentário da avaliação.
+
+    Processo:
+    1. Cria a instância de 'Avaliacao'.
+    2. Incrementa 'avaliacoes_quantidade' e 'avaliacoes_soma' e recalcula 'avaliacoes_media' com um único UPDATE
+       baseado em expressões F, para que avaliações simultâneas da mesma escola não se sobrescrevam.
+    3. Após o commit, remove os detalhes da escola do cache.
+
+    Retorna:
+    - Avaliacao: A avaliação criada.
+    """
+    with transaction.atomic():
+        avaliacao = Avaliacao.objects.create(escola=escola, email=email, nota=nota, comentario=comentario)
+        Escola.objects.filter(pk=escola.pk).update(
+            avaliacoes_quantidade=F('avaliacoes_quantidade') + 1,
+            avaliacoes_soma=F('avaliacoes_soma') + nota,
+            avaliacoes_media=Cast(F('avaliacoes_soma') + nota, FloatField()) / (F('avaliacoes_quantidade') + 1)
+        )
+        transaction.on_commit(lambda: invalidar_escola(escola.pk))
+    return avaliacao
+
+def recalcular_avaliacoes(tamanho_lote=1000):
+    """
+    Recalcula a partir da tabela 'Avaliacao' os agregados de avaliações gravados em 'Escola',
+    corrigindo apenas as escolas cujos valores divergem.
+
+    Parâmetros:
+    - tamanho_lote (int): Número de escolas gravadas por 'bulk_update'. Padrão é 1000.
+
+    Processo:
+    1. Agrupa as avaliações por escola, obtendo quantidade e soma das notas.
+    2. Compara com os valores gravados em cada escola; escolas sem avaliações devem ter quantidade e soma zero e média nula.
+    3. Grava as escolas divergentes com 'bulk_update' e, se houver alguma, invalida o cache dos detalhes das escolas.
+
+    Retorna:
+    - int: O número de escolas corrigidas.
+    """
+    agregados = {
+        escola_id: (quantidade, soma)
+        for escola_id, quantidade, soma in Avaliacao.objects.values('escola_id').annotate(
+            quantidade=Count('id'), soma=Sum('nota')
+        ).values_list('escola_id', 'quantidade', 'soma')
+    }
+    campos = ['avaliacoes_quantidade', 'avaliacoes_soma', 'avaliacoes_media']
+    divergentes = []
+    for escola_id, quantidade, soma, media in Escola.objects.values_list('id', *campos).iterator(chunk_size=tamanho_lote):
+        quantidade_real, soma_real = agregados.get(escola_id, (0, 0))
+        media_real = soma_real / quantidade_real if quantidade_real else None
+        if (quantidade, soma) != (quantidade_real, soma_real) or (media is None) != (media_real is None) or (
+            media is not None and abs(media - media_real) > 1e-9
+        ):
+            divergentes.append(Escola(
+                pk=escola_id, avaliacoes_quantidade=quantidade_real,
+                avaliacoes_soma=soma_real, avaliacoes_media=media_real
+            ))
+    Escola.objects.bulk_update(divergentes, campos, batch_size=tamanho_lote)
+    if divergentes:
+        invalidar_escolas()
+    return len(divergentes)
+
+def atualizar_ultimos_censos():
+    """
+    Aponta 'Escola.ultimo_censo' para o censo mais recente de cada escola (nulo para escolas sem censos),
+    em um único UPDATE com subconsulta, coberta pelo índice único (escola, ano) de 'CensoEscolar'.
+    Chamado por 'import_censos' uma vez, ao final da importação.
+
+    Retorna:
+    - int: O número de escolas gravadas.
+    """
+    mais_recente = CensoEscolar.objects.filter(escola=OuterRef('pk')).order_by('-ano').values('pk')[:1]
+    return Escola.objects.update(ultimo_censo=Subquery(mais_recente))
+
+def limpar_autorizacoes(tamanho_lote=1000):
+    """
+    Remove as autorizações que não servem mais: códigos expirados ('VALIDADE_AUTORIZACAO') e códigos já usados
+    ou invalidados. Chamado periodicamente pelo comando 'limpar_autorizacoes'.
+
+    Parâmetros:
+    - tamanho_lote (int): Número de autorizações removidas por DELETE. Padrão é 1000.
+
+    Processo:
+    1. Lê as chaves de um lote de autorizações expiradas (índice em 'data_criacao') ou inválidas.
+    2. Remove o lote, conferindo de novo a condição, para não apagar um código renovado nesse meio tempo.
+    3. Repete até não restarem autorizações a remover, sem travar a tabela inteira de uma vez.
+
+    Retorna:
+    - int: O número de autorizações removidas.
+    """
+    removidas = 0
+    for condicao in (Q(data_criacao__lt=timezone.now() - VALIDADE_AUTORIZACAO), Q(valido=False)):
+        while True:
+            lote = list(Autorizacao.objects.filter(condicao).values_list('pk', flat=True)[:tamanho_lote])
+            if not lote:
+                break
+            removidas += Autorizacao.objects.filter(condicao, pk__in=lote).delete()[0]
+    return removidas
@@ -0,0 +1,90 @@
+import io
+import os
+from itertools import chain
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from ..geo import celula_geo
+from ..management.commands.import_censos import (
+    CAMPOS_ACESSIBILIDADE, CAMPOS_COTAS, CAMPOS_EDUCACAO, CAMPOS_FUNCIONARIOS, CAMPOS_INFRAESTRUTURA, CAMPOS_INTERNET
+)
+from ..models import Cidade, Escola, Estado
+
+COLUNAS_ESCOLA_CSV = [
+    'NU_ANO_CENSO', 'NO_REGIAO', 'SG_UF', 'NO_UF', 'NO_MUNICIPIO', 'CO_ENTIDADE', 'NO_ENTIDADE', 'TP_DEPENDENCIA',
+    'TP_CATEGORIA_ESCOLA_PRIVADA', 'TP_LOCALIZACAO', 'DS_ENDERECO', 'NU_ENDERECO', 'DS_COMPLEMENTO', 'NO_BAIRRO',
+    'CO_CEP', 'NU_DDD', 'NU_TELEFONE', 'DT_ANO_LETIVO_INICIO', 'DT_ANO_LETIVO_TERMINO', 'TP_SITUACAO_FUNCIONAMENTO',
+]
+
+COLUNAS_CENSO_CSV = list(dict.fromkeys(chain(
+    CAMPOS_ACESSIBILIDADE.values(), CAMPOS_INTERNET.values(), CAMPOS_FUNCIONARIOS.values(),
+    CAMPOS_COTAS.values(), CAMPOS_INFRAESTRUTURA.values(), CAMPOS_EDUCACAO.values()
+)))
+
+ESCOLAS_CSV = [
+    # (CO_ENTIDADE, NO_ENTIDADE, SG_UF, NO_UF, NO_REGIAO, NO_MUNICIPIO, TP_DEPENDENCIA, TP_CATEGORIA_ESCOLA_PRIVADA)
+    ('35000001', 'ESCOLA MUNICIPAL SÃO JOÃO', 'SP', 'São Paulo', 'Sudeste', 'Campinas', '3', ''),
+    ('35000002', 'COLÉGIO\tTAB \\ BARRA', 'SP', 'São Paulo', 'Sudeste', 'Campinas', '4', '1'),
+    ('29000001', 'ESCOLA ESTADUAL MARIA QUITÉRIA', 'BA', 'Bahia', 'Nordeste', 'Salvador', '2', ''),
+]
+
+def valor_censo(numero, coluna, alterada=False):
+    """
+    Retorna o valor que `escrever_censo` grava na coluna do censo para a escola na posição `numero`:
+    0 ou 1 nas colunas de indicadores, um inteiro nas de quantidades.
+    """
+    base = numero + (1 if alterada else 0) + COLUNAS_CENSO_CSV.index(coluna)
+    return base % 2 if coluna.startswith(('IN_', 'N_')) else base
+
+def escrever_censo(diretorio, ano, escolas=ESCOLAS_CSV, alteradas=()):
+    """
+    Escreve `censos/censo_<ano>.csv` em `diretorio`, no formato do INEP, com uma linha por escola de `escolas`.
+    Os valores do censo dependem da posição da escola; as escolas com o código em `alteradas` recebem outros valores.
+    """
+    os.makedirs(os.path.join(diretorio, 'censos'), exist_ok=True)
+    with open(os.path.join(diretorio, 'censos', f'censo_{ano}.csv'), 'w', encoding='latin1') as arquivo:
+        arquivo.write(';'.join(COLUNAS_ESCOLA_CSV + COLUNAS_CENSO_CSV) + '\n')
+        for numero, (codigo, nome, sigla, uf, regiao, municipio, dependencia, categoria) in enumerate(escolas):
+            linha = [
+                str(ano), regiao, sigla, uf, municipio, codigo, nome, dependencia, categoria, '1', 'RUA X', str(numero),
+                '', 'CENTRO', '01001000', '11', '12345678', f'01FEB{ano % 100}:00:00:00', f'15DEC{ano % 100}:00:00:00', '1',
+            ]
+            linha += [str(valor_censo(numero, coluna, codigo in alteradas)) for coluna in COLUNAS_CENSO_CSV]
+            arquivo.write(';'.join(linha) + '\n')
+
+def importar_censos(diretorio, **opcoes):
+    """
+    Roda `import_censos` sobre a pasta `censos/` de `diretorio`.
+
+    Retorna:
+    - str: A saída do comando.
+    """
+    saida = io.StringIO()
+    with override_settings(BASE_DIR=diretorio):
+        call_command('import_censos', stdout=saida, stderr=io.StringIO(), **opcoes)
+    return saida.getvalue()
+
+def criar_escola(cidade, nome, **campos):
+    campos.setdefault('bairro', 'Centro')
+    if 'latitude' in campos:
+        campos['celula_geo'] = celula_geo(campos['latitude'], campos['longitude'])
+    return Escola.objects.create(
+        nome=nome, codigo_ibge=str(Escola.objects.count() + 1), tipo_dependencia=Escola.TipoDependencia.MUNICIPAL,
+        localizacao=Escola.Localizacao.URBANA, cidade=cidade, endereco='Rua X', cep='01000000', **campos
+    )
+
+def consultas_aplicacao(contexto):
+    """
+    Retorna as consultas capturadas por `CaptureQueriesContext` que tocam as tabelas da aplicação
+    (as do cache no banco ficam de fora).
+    """
+    return [consulta['sql'] for consulta in contexto.captured_queries if 'api_rest_' in consulta['sql']]
+
+class DadosEscolasTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.sp = Estado.objects.create(nome='São Paulo', sigla='SP', regiao='Sudeste')
+        cls.ba = Estado.objects.create(nome='Bahia', sigla='BA', regiao='Nordeste')
+        cls.campinas = Cidade.objects.create(nome='Campinas', estado=cls.sp)
+        cls.salvador = Cidade.objects.create(nome='Salvador', estado=cls.ba)
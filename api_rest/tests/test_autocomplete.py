@@ -0,0 +1,47 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from .. import autocomplete
+from ..cache import invalidar_escolas
+from .dados import DadosEscolasTestCase, consultas_aplicacao, criar_escola
+
+class AutocompleteTests(DadosEscolasTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.joao_batista = criar_escola(cls.campinas, 'ESCOLA SÃO JOÃO BATISTA')
+        cls.joao = criar_escola(cls.salvador, 'ESCOLA SÃO JOÃO')
+        cls.sao_joao = criar_escola(cls.salvador, 'SÃO JOÃO DEL REI')
+        cls.maria = criar_escola(cls.campinas, 'ESCOLA MARIA JOANA')
+
+    def setUp(self):
+        # O índice é do processo: sem isso, um índice de outro teste com a mesma versão seria reaproveitado
+        autocomplete._indice = None
+
+    def sugerir(self, **parametros):
+        resposta = self.client.get('/api/escolas/autocomplete', parametros)
+        self.assertEqual(resposta.status_code, 200)
+        return [escola['id'] for escola in resposta.json()]
+
+    def test_prefixo_do_nome_antes_de_prefixo_de_palavra(self):
+        self.assertEqual(self.sugerir(q='escola sao'), [self.joao.id, self.joao_batista.id])
+        # "sao jo": primeiro o nome que começa assim, depois os que têm palavras com esses prefixos, em ordem alfabética
+        self.assertEqual(self.sugerir(q='São Jo'), [self.sao_joao.id, self.joao.id, self.joao_batista.id])
+        self.assertEqual(self.sugerir(q='jo'), [self.maria.id, self.joao.id, self.joao_batista.id, self.sao_joao.id])
+        self.assertEqual(self.sugerir(q='jo', limite=2), [self.maria.id, self.joao.id])
+        self.assertEqual(self.sugerir(q='?!'), [])
+
+    def test_filtro_por_estado_e_cidade(self):
+        self.assertEqual(self.sugerir(q='joao', estado='ba'), [self.joao.id, self.sao_joao.id])
+        self.assertEqual(self.sugerir(q='joao', cidade=self.campinas.id), [self.joao_batista.id])
+        self.assertEqual(self.client.get('/api/escolas/autocomplete', {'q': 'jo', 'limite': 'x'}).status_code, 400)
+
+    def test_indice_reconstruido_quando_a_versao_muda(self):
+        self.assertEqual(self.sugerir(q='pedro'), [])
+        nova = criar_escola(self.salvador, 'ESCOLA PEDRO II')
+        with CaptureQueriesContext(connection) as contexto:
+            self.assertEqual(autocomplete.obter_indice().sugerir('pedro'), [])
+        self.assertEqual(consultas_aplicacao(contexto), [])
+
+        invalidar_escolas()
+        self.assertEqual(self.sugerir(q='pedro'), [nova.id])
@@ -0,0 +1,64 @@
+from datetime import timedelta
+
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import TestCase, TransactionTestCase
+from django.utils import timezone
+
+from ..models import VALIDADE_AUTORIZACAO, Autorizacao
+from ..services import criar_ou_atualizar_autorizacao, limpar_autorizacoes, verificar_autorizacao
+
+class AutorizacaoTests(TestCase):
+    def test_novo_codigo_sobrescreve_o_anterior(self):
+        primeiro = criar_ou_atualizar_autorizacao('usuario@example.com')
+        Autorizacao.objects.update(valido=False, data_criacao=timezone.now() - timedelta(days=1))
+        segundo = criar_ou_atualizar_autorizacao('usuario@example.com')
+
+        autorizacao = Autorizacao.objects.get()
+        self.assertEqual((autorizacao.codigo, autorizacao.valido), (segundo, True))
+        self.assertFalse(autorizacao.validar_expiracao())
+        self.assertTrue(verificar_autorizacao('usuario@example.com', segundo))
+        if primeiro != segundo:
+            self.assertFalse(verificar_autorizacao('usuario@example.com', primeiro))
+
+    def test_limpar_autorizacoes(self):
+        for email in ['valida@example.com', 'expirada@example.com', 'usada@example.com', 'velha@example.com']:
+            criar_ou_atualizar_autorizacao(email)
+        Autorizacao.objects.filter(email='expirada@example.com').update(
+            data_criacao=timezone.now() - VALIDADE_AUTORIZACAO - timedelta(seconds=1)
+        )
+        Autorizacao.objects.filter(email='velha@example.com').update(data_criacao=timezone.now() - timedelta(days=30))
+        Autorizacao.objects.filter(email='usada@example.com').update(valido=False)
+
+        self.assertEqual(limpar_autorizacoes(tamanho_lote=1), 3)
+        self.assertEqual(list(Autorizacao.objects.values_list('email', flat=True)), ['valida@example.com'])
+        self.assertEqual(limpar_autorizacoes(), 0)
+
+class MigracaoAutorizacaoUnicaTests(TransactionTestCase):
+    anterior = [('api_rest', '0009_ultimo_censo_escola')]
+    migracao = [('api_rest', '0010_autorizacao_email_unico')]
+
+    def tearDown(self):
+        executor = MigrationExecutor(connection)
+        executor.loader.build_graph()
+        executor.migrate(executor.loader.graph.leaf_nodes())
+
+    def test_mantem_a_autorizacao_mais_recente_de_cada_email(self):
+        executor = MigrationExecutor(connection)
+        executor.migrate(self.anterior)
+        Antiga = executor.loader.project_state(self.anterior).apps.get_model('api_rest', 'Autorizacao')
+        agora = timezone.now()
+        for email, codigo, idade in [
+            ('a@example.com', '111111', 3), ('a@example.com', '222222', 1), ('a@example.com', '333333', 2),
+            ('b@example.com', '444444', 5), ('b@example.com', '555555', 5), ('c@example.com', '666666', 1),
+        ]:
+            autorizacao = Antiga.objects.create(email=email, codigo=codigo)
+            Antiga.objects.filter(pk=autorizacao.pk).update(data_criacao=agora - timedelta(minutes=idade))
+
+        executor = MigrationExecutor(connection)
+        executor.migrate(self.migracao)
+        # Com a mesma data, fica a de maior id
+        self.assertEqual(
+            sorted(Autorizacao.objects.values_list('email', 'codigo')),
+            [('a@example.com', '222222'), ('b@example.com', '555555'), ('c@example.com', '666666')]
+        )
@@ -0,0 +1,81 @@
+from unittest import mock
+
+from ..jwt_utils import gerar_jwt
+from ..models import Avaliacao, Escola
+from ..services import recalcular_avaliacoes, registrar_avaliacao
+from .dados import DadosEscolasTestCase, criar_escola
+
+class AgregadosAvaliacoesTests(DadosEscolasTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.escola = criar_escola(cls.campinas, 'Escola avaliada')
+        cls.outra = criar_escola(cls.salvador, 'Outra escola')
+
+    def agregados(self, escola):
+        return Escola.objects.values_list(
+            'avaliacoes_quantidade', 'avaliacoes_soma', 'avaliacoes_media'
+        ).get(pk=escola.pk)
+
+    def test_registrar_avaliacao_atualiza_agregados(self):
+        self.assertEqual(self.agregados(self.escola), (0, 0, None))
+        registrar_avaliacao(self.escola, 'a@example.com', 4, 'Boa')
+        registrar_avaliacao(self.escola, 'b@example.com', 1, '')
+        self.assertEqual(self.agregados(self.escola), (2, 5, 2.5))
+        self.assertEqual(self.agregados(self.outra), (0, 0, None))
+        self.assertEqual(Avaliacao.objects.filter(escola=self.escola).count(), 2)
+
+        dados = self.client.get(f'/api/escolas/{self.escola.id}').json()
+        self.assertEqual(dados['avaliacoes_media'], 2.5)
+        self.assertNotIn('avaliacoes_soma', dados)
+        self.assertNotIn('avaliacoes_quantidade', dados)
+
+    def test_recalcular_corrige_apenas_escolas_divergentes(self):
+        registrar_avaliacao(self.escola, 'a@example.com', 4, '')
+        registrar_avaliacao(self.escola, 'b@example.com', 5, '')
+        self.assertEqual(recalcular_avaliacoes(), 0)
+
+        Escola.objects.filter(pk=self.escola.pk).update(avaliacoes_quantidade=7, avaliacoes_media=1.0)
+        Escola.objects.filter(pk=self.outra.pk).update(avaliacoes_soma=3)
+        self.assertEqual(recalcular_avaliacoes(tamanho_lote=1), 2)
+        self.assertEqual(self.agregados(self.escola), (2, 9, 4.5))
+        self.assertEqual(self.agregados(self.outra), (0, 0, None))
+        self.assertEqual(recalcular_avaliacoes(), 0)
+
+    def test_listagem_ordenada_pela_media(self):
+        registrar_avaliacao(self.outra, 'a@example.com', 3, '')
+        sem_avaliacoes = criar_escola(self.campinas, 'Sem avaliações')
+        with self.assertNumQueries(2):
+            resposta = self.client.get('/api/escolas/listar', {'ordenar': 'avaliacao'})
+        resultados = resposta.json()['results']
+        self.assertEqual([escola['id'] for escola in resultados], [self.outra.id, self.escola.id, sem_avaliacoes.id])
+        self.assertEqual(resultados[0]['average_avaliacoes'], 3.0)
+
+@mock.patch('api_rest.views.enviar_email_confirmacao_avaliacao')
+class SubmeterAvaliacaoTests(DadosEscolasTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.escola = criar_escola(cls.campinas, 'Escola avaliada')
+
+    def submeter(self, nota, autorizado=True):
+        cabecalhos = {'HTTP_AUTHORIZATION': f'Bearer {gerar_jwt("a@example.com")}'} if autorizado else {}
+        return self.client.post(
+            f'/api/submeter-avaliacao/{self.escola.id}', {'email': 'a@example.com', 'nota': nota},
+            content_type='application/json', **cabecalhos
+        )
+
+    def test_nota_invalida(self, enviar):
+        for nota in ['abc', '4.5', 4.5, True, [4], 2 ** 70]:
+            with self.subTest(nota=nota):
+                # A nota é conferida antes do token e de qualquer consulta ao banco
+                with self.assertNumQueries(0):
+                    self.assertEqual(self.submeter(nota, autorizado=False).status_code, 400)
+        enviar.assert_not_called()
+        self.assertFalse(Avaliacao.objects.exists())
+
+    def test_nota_em_texto(self, enviar):
+        self.assertEqual(self.submeter('4').status_code, 200)
+        self.assertEqual(Avaliacao.objects.get().nota, 4)
+        self.assertEqual(Escola.objects.get(pk=self.escola.pk).avaliacoes_soma, 4)
+        enviar.assert_called_once()
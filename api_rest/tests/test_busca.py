@@ -0,0 +1,36 @@
+from unittest import mock
+
+from ..busca import buscar_escolas, reconstruir_indice_busca
+from .dados import DadosEscolasTestCase, criar_escola
+
+class BuscaEscolasTests(DadosEscolasTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.sao_joao = criar_escola(cls.campinas, 'ESCOLA MUNICIPAL SÃO JOÃO BATISTA')
+        cls.bairro = criar_escola(cls.salvador, 'ESCOLA ESTADUAL PEDRO II', bairro='São João')
+        cls.outra = criar_escola(cls.salvador, 'ESCOLA MUNICIPAL MARIA QUITÉRIA')
+        reconstruir_indice_busca()
+
+    def test_busca_sem_acentos_e_por_prefixo(self):
+        with self.assertNumQueries(3):
+            resposta = self.client.get('/api/escolas/listar', {'busca': 'sao jo'})
+        ids = [escola['id'] for escola in resposta.json()['results']]
+        # O nome pesa mais que o bairro
+        self.assertEqual(ids, [self.sao_joao.id, self.bairro.id])
+
+    def test_busca_combinada_com_filtros(self):
+        resposta = self.client.get('/api/escolas/listar', {'busca': 'São João', 'estado': 'BA'})
+        self.assertEqual([escola['id'] for escola in resposta.json()['results']], [self.bairro.id])
+        resposta = self.client.get('/api/escolas/listar', {'busca': 'quiteria salvador'})
+        self.assertEqual([escola['id'] for escola in resposta.json()['results']], [self.outra.id])
+        resposta = self.client.get('/api/escolas/listar', {'busca': 'inexistente'})
+        self.assertEqual(resposta.json()['results'], [])
+
+    def test_busca_sem_indice_procura_nome_bairro_e_cidade(self):
+        conexao = mock.MagicMock(vendor='outro')
+        self.assertEqual(buscar_escolas('pedro', conexao=conexao), [self.bairro.id])
+        self.assertEqual(buscar_escolas('centro', conexao=conexao), [self.sao_joao.id, self.outra.id])
+        self.assertEqual(buscar_escolas('salvador', conexao=conexao), [self.bairro.id, self.outra.id])
+        self.assertEqual(buscar_escolas('maria salvador', conexao=conexao), [self.outra.id])
+        self.assertEqual(buscar_escolas('maria campinas', conexao=conexao), [])
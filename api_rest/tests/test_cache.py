@@ -0,0 +1,65 @@
+import tempfile
+
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from ..cache import CHAVE_VERSAO_ESCOLAS, invalidar_escolas, obter_escola, versao_escolas
+from ..models import Escola
+from ..services import registrar_avaliacao
+from .dados import DadosEscolasTestCase, consultas_aplicacao, criar_escola, escrever_censo, importar_censos
+
+class CacheEscolaTests(DadosEscolasTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.escola = criar_escola(cls.campinas, 'Escola em cache')
+
+    def detalhes(self, escola_id=None):
+        resposta = self.client.get(f'/api/escolas/{escola_id or self.escola.id}')
+        self.assertEqual(resposta.status_code, 200)
+        return resposta.json()
+
+    def test_segunda_leitura_vem_do_cache(self):
+        self.assertIsNone(obter_escola(self.escola.id))
+        dados = self.detalhes()
+        self.assertEqual(obter_escola(self.escola.id), dados)
+        with CaptureQueriesContext(connection) as contexto:
+            self.assertEqual(self.detalhes(), dados)
+        self.assertEqual(consultas_aplicacao(contexto), [])
+
+    def test_avaliacao_invalida_apenas_a_escola_avaliada(self):
+        outra = criar_escola(self.campinas, 'Outra escola')
+        self.detalhes()
+        dados_outra = self.detalhes(outra.id)
+        with self.captureOnCommitCallbacks(execute=True):
+            registrar_avaliacao(self.escola, 'a@example.com', 5, 'Ótima')
+        self.assertIsNone(obter_escola(self.escola.id))
+        self.assertEqual(obter_escola(outra.id), dados_outra)
+
+        dados = self.detalhes()
+        self.assertEqual(dados['avaliacoes_media'], 5.0)
+        self.assertEqual([avaliacao['comentario'] for avaliacao in dados['avaliacoes']], ['Ótima'])
+
+    def test_importacao_troca_a_versao(self):
+        self.detalhes()
+        Escola.objects.filter(pk=self.escola.pk).update(nome='Nome alterado')
+        self.assertEqual(self.detalhes()['nome'], 'Escola em cache')
+
+        versao = versao_escolas()
+        with tempfile.TemporaryDirectory() as diretorio:
+            escrever_censo(diretorio, 2022)
+            importar_censos(diretorio)
+        self.assertNotEqual(versao_escolas(), versao)
+        self.assertIsNone(obter_escola(self.escola.id))
+        self.assertEqual(self.detalhes()['nome'], 'Nome alterado')
+
+    def test_versao_perdida_nao_reaproveita_entradas_antigas(self):
+        versoes = {versao_escolas()}
+        invalidar_escolas()
+        versoes.add(versao_escolas())
+        self.detalhes()
+        # Se a chave da versão sair do cache, a nova versão é diferente de todas as anteriores
+        cache.delete(CHAVE_VERSAO_ESCOLAS)
+        self.assertNotIn(versao_escolas(), versoes)
+        self.assertIsNone(obter_escola(self.escola.id))
@@ -0,0 +1,34 @@
+from ..models import Cidade
+from .dados import DadosEscolasTestCase
+
+class FiltroCidadesTests(DadosEscolasTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.campos = Cidade.objects.create(nome='Campos do Jordão', estado=cls.sp)
+        cls.aracatuba = Cidade.objects.create(nome='Araçatuba', estado=cls.sp)
+
+    def cidades(self, **filtros):
+        resposta = self.client.get('/api/cidades', filtros)
+        self.assertEqual(resposta.status_code, 200)
+        return resposta.json()
+
+    def test_filtro_por_sigla_ou_id(self):
+        esperado = [
+            {'id': cidade.id, 'nome': cidade.nome, 'estado_sigla': 'SP'}
+            for cidade in (self.aracatuba, self.campinas, self.campos)
+        ]
+        self.assertEqual(self.cidades(estado='sp'), esperado)
+        self.assertEqual(self.cidades(estado=str(self.sp.id)), esperado)
+        self.assertEqual(self.cidades(estado='XX'), [])
+
+    def test_filtro_por_prefixo_do_nome(self):
+        self.assertEqual([cidade['id'] for cidade in self.cidades(nome='camp')], [self.campinas.id, self.campos.id])
+        self.assertEqual([cidade['id'] for cidade in self.cidades(estado='BA', nome='camp')], [])
+        self.assertEqual([cidade['id'] for cidade in self.cidades(estado='BA', nome='SAL')], [self.salvador.id])
+
+    def test_estado_invalido(self):
+        # Dígitos fora do ASCII não são um id: são tratados como sigla, que não existe
+        self.assertEqual(self.cidades(estado='١٢'), [])
+        self.assertEqual(self.client.get('/api/cidades', {'estado': '1' * 10}).status_code, 400)
+        self.assertEqual(self.cidades(estado='9' * 9), [])
@@ -0,0 +1,159 @@
+import email
+import smtplib
+import socketserver
+import threading
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from ..email_service import ConexaoSMTP, enviar_em_lote, montar_mensagem
+
+class SessaoSMTP(socketserver.StreamRequestHandler):
+    """
+    Sessão do `ServidorSMTP`: responde aos comandos do SMTP sem autenticação nem STARTTLS.
+    """
+
+    def responder(self, linha):
+        self.wfile.write(linha.encode() + b'\r\n')
+
+    def handle(self):
+        servidor = self.server
+        with servidor.trava:
+            servidor.conexoes += 1
+            conexao = servidor.conexoes
+        recebidas = 0
+        remetente, destinatarios = None, []
+        self.responder('220 teste')
+        while True:
+            linha = self.rfile.readline()
+            if not linha:
+                return
+            comando = linha.decode().strip()
+            verbo = comando[:4].upper()
+            if verbo == 'EHLO':
+                self.responder('250-teste')
+                if servidor.pipelining:
+                    self.responder('250-PIPELINING')
+                self.responder('250 8BITMIME')
+            elif verbo == 'MAIL':
+                if servidor.limite_mensagens and recebidas >= servidor.limite_mensagens:
+                    self.responder('421 muitas mensagens nesta conexao')
+                    return
+                remetente, destinatarios = comando[10:].strip('<>'), []
+                self.responder('250 OK')
+            elif verbo == 'RCPT':
+                destinatario = comando[8:].strip('<>')
+                if destinatario.startswith('recusado'):
+                    self.responder('550 caixa inexistente')
+                else:
+                    destinatarios.append(destinatario)
+                    self.responder('250 OK')
+            elif verbo == 'DATA' and not destinatarios:
+                self.responder('554 nenhum destinatario valido')
+            elif verbo == 'DATA':
+                self.responder('354 pode enviar')
+                dados = b''
+                for linha in iter(self.rfile.readline, b'.\r\n'):
+                    dados += linha[1:] if linha.startswith(b'.') else linha
+                recebidas += 1
+                with servidor.trava:
+                    servidor.mensagens.append((conexao, remetente, destinatarios, dados))
+                self.responder(f'250 recebida {len(servidor.mensagens)}')
+            elif verbo == 'QUIT':
+                self.responder('221 tchau')
+                return
+            else:
+                self.responder('250 OK')
+
+class ServidorSMTP(socketserver.ThreadingTCPServer):
+    """
+    Servidor SMTP local para os testes, que guarda as mensagens recebidas e, com `limite_mensagens`,
+    responde 421 e fecha a conexão ao receber mais mensagens que o limite, como os provedores de email.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, pipelining=True, limite_mensagens=None):
+        super().__init__(('127.0.0.1', 0), SessaoSMTP)
+        self.pipelining = pipelining
+        self.limite_mensagens = limite_mensagens
+        self.trava = threading.Lock()
+        self.conexoes = 0
+        self.mensagens = []
+        threading.Thread(target=self.serve_forever, args=(0.05,), daemon=True).start()
+
+    def encerrar(self):
+        self.shutdown()
+        self.server_close()
+
+def mensagens(quantidade, **destinatarios):
+    return [
+        montar_mensagem('escolas@example.com', destinatarios.get(str(numero), f'usuario{numero}@example.com'),
+                        f'Teste {numero}', f'<p>Mensagem {numero}</p>\n.linha com ponto')
+        for numero in range(quantidade)
+    ]
+
+class EnvioEmLoteTests(SimpleTestCase):
+    def servidor(self, **opcoes):
+        servidor = ServidorSMTP(**opcoes)
+        self.addCleanup(servidor.encerrar)
+        return servidor
+
+    def enviar(self, servidor, lote, **opcoes):
+        host, porta = servidor.server_address
+        return enviar_em_lote(host, porta, None, None, lote, starttls=False, timeout=5, **opcoes)
+
+    def test_lote_em_uma_unica_sessao(self):
+        servidor = self.servidor()
+        lote = mensagens(3)
+        resultados = self.enviar(servidor, lote)
+        self.assertEqual(servidor.conexoes, 1)
+        self.assertEqual([list(resultado.values())[0][0] for resultado in resultados], [250, 250, 250])
+        for mensagem, (_, remetente, destinatarios, dados) in zip(lote, servidor.mensagens):
+            self.assertEqual((remetente, destinatarios), ('escolas@example.com', [mensagem['To']]))
+            recebida = email.message_from_bytes(dados)
+            self.assertEqual(recebida['Subject'], mensagem['Subject'])
+            self.assertEqual(
+                recebida.get_payload()[0].get_payload(decode=True).replace(b'\r\n', b'\n'),
+                mensagem.get_payload()[0].get_payload(decode=True)
+            )
+
+    def test_reconecta_quando_o_servidor_limita_mensagens_por_conexao(self):
+        for pipelining in (True, False):
+            with self.subTest(pipelining=pipelining):
+                servidor = self.servidor(pipelining=pipelining, limite_mensagens=2)
+                resultados = self.enviar(servidor, mensagens(5))
+                self.assertEqual(len(servidor.mensagens), 5)
+                self.assertEqual([conexao for conexao, *_ in servidor.mensagens], [1, 1, 2, 2, 3])
+                self.assertTrue(all(codigo == 250 for resultado in resultados for codigo, _ in resultado.values()))
+
+    def test_limite_de_mensagens_do_cliente(self):
+        servidor = self.servidor()
+        self.enviar(servidor, mensagens(5), limite_mensagens=2)
+        self.assertEqual([conexao for conexao, *_ in servidor.mensagens], [1, 1, 2, 2, 3])
+
+    def test_destinatario_recusado_nao_interrompe_o_lote(self):
+        servidor = self.servidor()
+        resultados = self.enviar(servidor, mensagens(3, **{'1': 'recusado@example.com'}))
+        self.assertEqual(resultados[1], {'recusado@example.com': (550, b'caixa inexistente')})
+        self.assertEqual([destinatarios for _, _, destinatarios, _ in servidor.mensagens],
+                         [['usuario0@example.com'], ['usuario2@example.com']])
+        self.assertEqual(servidor.conexoes, 1)
+
+    def test_pipelining_envia_os_comandos_juntos(self):
+        for pipelining in (True, False):
+            with self.subTest(pipelining=pipelining):
+                servidor = self.servidor(pipelining=pipelining)
+                host, porta = servidor.server_address
+                conexao = ConexaoSMTP(host, porta, None, None, starttls=False, timeout=5)
+                self.addCleanup(conexao.fechar)
+                with mock.patch.object(smtplib.SMTP, 'send', autospec=True, side_effect=smtplib.SMTP.send) as envios:
+                    resultado = conexao.enviar(mensagens(1)[0])
+                comandos = [envio.args[1] for envio in envios.call_args_list if isinstance(envio.args[1], str)]
+                juntos = [comando for comando in comandos if 'MAIL FROM' in comando and 'RCPT TO' in comando]
+                self.assertEqual(bool(juntos), pipelining)
+                if pipelining:
+                    self.assertTrue(juntos[0].endswith('DATA\r\n'))
+                    # A resposta final do servidor é devolvida para cada destinatário
+                    self.assertEqual(resultado, {'usuario0@example.com': (250, b'recebida 1')})
+                self.assertEqual(len(servidor.mensagens), 1)
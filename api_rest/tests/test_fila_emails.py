@@ -0,0 +1,75 @@
+import smtplib
+import threading
+from unittest import mock
+
+from django.test import SimpleTestCase, override_settings
+
+from ..email_service import montar_mensagem
+from ..fila_emails import FilaEmails, enfileirar_mensagem
+
+MENSAGEM = montar_mensagem('escolas@example.com', 'usuario@example.com', 'Teste', '<p>Teste</p>')
+
+class ConexaoFalsa:
+    """
+    Substitui a `ConexaoSMTP` nas threads da fila: `falhas` são as exceções lançadas pelos primeiros envios,
+    e `concluido` é sinalizado no envio de número `esperados`.
+    """
+
+    def __init__(self, falhas, esperados):
+        self.falhas = list(falhas)
+        self.esperados = esperados
+        self.enviadas = 0
+        self.concluido = threading.Event()
+
+    def enviar(self, mensagem):
+        self.enviadas += 1
+        if self.enviadas == self.esperados:
+            self.concluido.set()
+        if self.falhas:
+            raise self.falhas.pop(0)
+        return {'usuario@example.com': (250, b'OK')}
+
+    def fechar(self):
+        pass
+
+class FilaEmailsTests(SimpleTestCase):
+    def executar_fila(self, falhas, esperados, tentativas=3):
+        """
+        Envia uma mensagem por uma fila com `falhas` nos primeiros envios e espera o envio de número `esperados`.
+
+        Retorna:
+        - tuple: (número de envios, mensagens registradas no log).
+        """
+        conexao = ConexaoFalsa(falhas, esperados)
+        with mock.patch('api_rest.fila_emails.ConexaoSMTP', return_value=conexao), self.assertLogs('api_rest.fila_emails') as logs:
+            fila = FilaEmails(workers=1, tentativas=tentativas, espera_inicial=0.01, ocioso=60)
+            fila.enfileirar(MENSAGEM)
+            self.assertTrue(conexao.concluido.wait(5))
+            fila.fila.join()
+            fila.encerrar(espera=5)
+        return conexao.enviadas, logs.output
+
+    def test_repete_falhas_temporarias(self):
+        enviadas, logs = self.executar_fila([smtplib.SMTPServerDisconnected('caiu'), OSError('timeout')], esperados=3)
+        self.assertEqual(enviadas, 3)
+        self.assertEqual(len(logs), 2)
+        self.assertTrue(all('nova tentativa' in log for log in logs))
+
+    def test_nao_repete_recusa_definitiva(self):
+        enviadas, logs = self.executar_fila([smtplib.SMTPResponseException(550, b'Mailbox unavailable')], esperados=1)
+        self.assertEqual(enviadas, 1)
+        self.assertEqual(len(logs), 1)
+        self.assertIn('descartado', logs[0])
+
+    def test_desiste_apos_as_tentativas(self):
+        falhas = [smtplib.SMTPServerDisconnected('caiu') for _ in range(5)]
+        enviadas, logs = self.executar_fila(falhas, esperados=2, tentativas=2)
+        self.assertEqual(enviadas, 2)
+        self.assertIn('descartado', logs[-1])
+
+    @override_settings(EMAIL_ASSINCRONO=False)
+    def test_envio_sincrono_nao_propaga_falhas(self):
+        with mock.patch('api_rest.fila_emails.ConexaoSMTP') as conexao, self.assertLogs('api_rest.fila_emails', 'ERROR'):
+            conexao.return_value.enviar.side_effect = smtplib.SMTPServerDisconnected('caiu')
+            enfileirar_mensagem(MENSAGEM)
+        conexao.return_value.fechar.assert_called_once()
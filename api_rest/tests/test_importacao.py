@@ -0,0 +1,238 @@
+import os
+import tempfile
+from unittest import skipUnless
+
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test import TestCase
+
+from ..models import (
+    Acessibilidade, CensoEscolar, Cidade, Cotas, Educacao, Escola, Estado, ImportacaoCenso, Infraestrutura
+)
+from .dados import ESCOLAS_CSV, escrever_censo, importar_censos, valor_censo
+
+class ImportacaoCensosTests(TestCase):
+    """
+    Importa CSVs pequenos com `import_censos` e confere as contagens e as chaves estrangeiras gravadas.
+    """
+
+    def setUp(self):
+        self.diretorio = tempfile.TemporaryDirectory()
+        escrever_censo(self.diretorio.name, 2022)
+
+    def tearDown(self):
+        self.diretorio.cleanup()
+
+    def importar(self, **opcoes):
+        return importar_censos(self.diretorio.name, **opcoes)
+
+    def conferir_importacao(self):
+        self.assertEqual(Estado.objects.count(), 2)
+        self.assertEqual(Cidade.objects.count(), 2)
+        self.assertEqual(Escola.objects.count(), len(ESCOLAS_CSV))
+        self.assertEqual(ImportacaoCenso.objects.get().linhas, len(ESCOLAS_CSV))
+        for model in (CensoEscolar, Infraestrutura, Educacao, Cotas):
+            self.assertEqual(model.objects.count(), len(ESCOLAS_CSV), model.__name__)
+
+        for codigo, nome, sigla, _, _, municipio, dependencia, _ in ESCOLAS_CSV:
+            escola = Escola.objects.select_related('cidade__estado').get(codigo_ibge=codigo)
+            self.assertEqual(escola.nome, nome)
+            self.assertEqual((escola.cidade.nome, escola.cidade.estado.sigla), (municipio, sigla))
+            self.assertEqual(escola.tipo_dependencia, int(dependencia))
+            censo = CensoEscolar.objects.get(escola=escola)
+            self.assertEqual((censo.ano, escola.ultimo_censo_id), (2022, censo.id))
+            infraestrutura = Infraestrutura.objects.select_related(
+                'acessibilidade', 'internet_aluno', 'funcionarios'
+            ).get(censo=censo)
+            self.assertIsNotNone(infraestrutura.acessibilidade.pk)
+            self.assertIsNotNone(infraestrutura.internet_aluno.pk)
+            self.assertIsNotNone(infraestrutura.funcionarios.pk)
+            self.assertIsNotNone(Educacao.objects.select_related('cotas').get(censo=censo).cotas.pk)
+
+        # Cada registro filho aponta para um registro diferente (as chaves devolvidas pelo bulk_create não se repetem)
+        self.assertEqual(len(set(Infraestrutura.objects.values_list('acessibilidade_id', flat=True))), len(ESCOLAS_CSV))
+        self.assertEqual(len(set(Educacao.objects.values_list('cotas_id', flat=True))), len(ESCOLAS_CSV))
+
+    def conteudo_importado(self):
+        """
+        Retorna as contagens das tabelas dos censos e os valores gravados por escola e ano, sem as chaves primárias.
+        """
+        contagens = {
+            model.__name__: model.objects.count()
+            for model in (Escola, CensoEscolar, Infraestrutura, Acessibilidade, Educacao, Cotas)
+        }
+        censos = set(CensoEscolar.objects.values_list(
+            'escola__codigo_ibge', 'ano', 'infraestrutura__biblioteca', 'infraestrutura__acessibilidade__rampas',
+            'educacao__cotas__renda',
+        ))
+        return contagens, censos
+
+    def registros_censo(self):
+        """
+        Retorna, por código da escola, as chaves do censo de 2022 e dos seus registros de infraestrutura e educação.
+        """
+        return {
+            codigo: (censo_id, infraestrutura_id, educacao_id)
+            for codigo, censo_id, infraestrutura_id, educacao_id in CensoEscolar.objects.filter(ano=2022).values_list(
+                'escola__codigo_ibge', 'id', 'infraestrutura__id', 'educacao__id'
+            )
+        }
+
+    def test_importacao(self):
+        self.importar()
+        self.conferir_importacao()
+
+    def test_valores_do_censo(self):
+        self.importar()
+        for numero, (codigo, *_) in enumerate(ESCOLAS_CSV):
+            censo = CensoEscolar.objects.select_related(
+                'infraestrutura__acessibilidade', 'infraestrutura__internet_aluno', 'infraestrutura__funcionarios',
+                'educacao__cotas',
+            ).get(escola__codigo_ibge=codigo)
+            infraestrutura, educacao = censo.infraestrutura, censo.educacao
+            self.assertEqual(infraestrutura.biblioteca, bool(valor_censo(numero, 'IN_BIBLIOTECA')))
+            self.assertEqual(infraestrutura.salas_quantidade, valor_censo(numero, 'QT_SALAS_UTILIZADAS'))
+            self.assertEqual(infraestrutura.acessibilidade.rampas, bool(valor_censo(numero, 'IN_ACESSIBILIDADE_RAMPAS')))
+            self.assertEqual(infraestrutura.internet_aluno.internet_aluno, bool(valor_censo(numero, 'IN_INTERNET_ALUNOS')))
+            self.assertEqual(infraestrutura.funcionarios.saude_quantidade, valor_censo(numero, 'QT_PROF_SAUDE'))
+            self.assertEqual(educacao.ed_fund_matricula_quantidade, valor_censo(numero, 'QT_MAT_FUND'))
+            self.assertEqual(educacao.cotas.ppi, bool(valor_censo(numero, 'N_RESERVA_PPI')))
+
+    def test_registros_filhos_de_cada_censo(self):
+        escrever_censo(self.diretorio.name, 2023, alteradas=['35000001'])
+        self.importar(chunksize=2)
+        for numero, (codigo, *_) in enumerate(ESCOLAS_CSV):
+            for ano in (2022, 2023):
+                alterada = ano == 2023 and codigo == '35000001'
+                censo = CensoEscolar.objects.select_related(
+                    'infraestrutura__acessibilidade', 'infraestrutura__funcionarios', 'educacao__cotas'
+                ).get(escola__codigo_ibge=codigo, ano=ano)
+                self.assertEqual(
+                    censo.infraestrutura.acessibilidade.rampas,
+                    bool(valor_censo(numero, 'IN_ACESSIBILIDADE_RAMPAS', alterada))
+                )
+                self.assertEqual(
+                    censo.infraestrutura.funcionarios.saude_quantidade, valor_censo(numero, 'QT_PROF_SAUDE', alterada)
+                )
+                self.assertEqual(censo.educacao.cotas.renda, bool(valor_censo(numero, 'IN_RESERVA_RENDA', alterada)))
+
+    def test_reimportacao_substitui_os_censos(self):
+        self.importar()
+        self.importar()
+        self.conferir_importacao()
+
+    def test_importacao_com_workers(self):
+        escrever_censo(self.diretorio.name, 2023, alteradas=['35000001'])
+        self.importar()
+        esperado = self.conteudo_importado()
+        self.assertEqual(esperado[0]['CensoEscolar'], 2 * len(ESCOLAS_CSV))
+
+        self.importar(workers=2)
+        self.assertEqual(self.conteudo_importado(), esperado)
+
+    def test_incremental_pula_arquivo_sem_alteracoes(self):
+        self.importar(incremental=True)
+        self.conferir_importacao()
+        importacao = ImportacaoCenso.objects.get()
+        self.assertEqual((importacao.arquivo, importacao.ano), ('censo_2022.csv', 2022))
+        registros = self.registros_censo()
+
+        saida = self.importar(incremental=True)
+        self.assertIn('censo_2022.csv não mudou', saida)
+        self.assertEqual(self.registros_censo(), registros)
+        self.assertEqual(ImportacaoCenso.objects.get().data_importacao, importacao.data_importacao)
+
+    def test_incremental_substitui_apenas_censos_alterados(self):
+        self.importar(incremental=True)
+        registros = self.registros_censo()
+        checksum = ImportacaoCenso.objects.get().checksum
+
+        escrever_censo(self.diretorio.name, 2022, alteradas=['35000002'])
+        self.importar(incremental=True)
+        novos = self.registros_censo()
+        # O censo alterado mantém a linha de CensoEscolar, mas tem os registros filhos regravados
+        self.assertEqual(novos['35000002'][0], registros['35000002'][0])
+        self.assertNotEqual(novos['35000002'][1:], registros['35000002'][1:])
+        self.assertEqual({codigo: novos[codigo] for codigo in ('35000001', '29000001')},
+                         {codigo: registros[codigo] for codigo in ('35000001', '29000001')})
+        self.assertEqual(Infraestrutura.objects.count(), len(ESCOLAS_CSV))
+        self.assertEqual(Acessibilidade.objects.count(), len(ESCOLAS_CSV))
+        self.assertNotEqual(ImportacaoCenso.objects.get().checksum, checksum)
+
+    def test_incremental_remove_censos_ausentes(self):
+        self.importar(incremental=True)
+        escrever_censo(self.diretorio.name, 2022, escolas=ESCOLAS_CSV[:2])
+        self.importar(incremental=True)
+        self.assertFalse(CensoEscolar.objects.filter(escola__codigo_ibge='29000001').exists())
+        self.assertTrue(Escola.objects.filter(codigo_ibge='29000001').exists())
+        for model in (CensoEscolar, Infraestrutura, Acessibilidade, Educacao, Cotas):
+            self.assertEqual(model.objects.count(), 2, model.__name__)
+        self.assertEqual(ImportacaoCenso.objects.get().linhas, 2)
+
+    def test_incremental_atualiza_escola_pelo_censo_mais_recente(self):
+        self.importar(incremental=True)
+        codigo, nome = ESCOLAS_CSV[0][:2]
+
+        # Um censo mais antigo não sobrescreve os dados da escola
+        escrever_censo(self.diretorio.name, 2021, escolas=[(codigo, 'NOME DE 2021', *ESCOLAS_CSV[0][2:])])
+        self.importar(incremental=True)
+        escola = Escola.objects.get(codigo_ibge=codigo)
+        self.assertEqual(escola.nome, nome)
+        self.assertEqual(escola.ultimo_censo.ano, 2022)
+
+        # Uma nova versão do censo mais recente, sim
+        escrever_censo(self.diretorio.name, 2022, escolas=[(codigo, 'NOME NOVO', *ESCOLAS_CSV[0][2:]), *ESCOLAS_CSV[1:]])
+        self.importar(incremental=True)
+        self.assertEqual(Escola.objects.get(codigo_ibge=codigo).nome, 'NOME NOVO')
+        self.assertEqual(
+            dict(ImportacaoCenso.objects.values_list('arquivo', 'ano')), {'censo_2021.csv': 2021, 'censo_2022.csv': 2022}
+        )
+
+    def test_falha_de_leitura_mantem_dados_anteriores(self):
+        self.importar()
+        registros = self.registros_censo()
+        with open(os.path.join(self.diretorio.name, 'censos', 'censo_2023.csv'), 'w', encoding='latin1') as arquivo:
+            arquivo.write('NU_ANO_CENSO;CO_ENTIDADE\n2023;35000001\n')
+
+        with self.assertRaises(CommandError):
+            self.importar()
+        self.assertEqual(self.registros_censo(), registros)
+        self.assertEqual(list(ImportacaoCenso.objects.values_list('arquivo', flat=True)), ['censo_2022.csv'])
+
+        # No modo incremental, o arquivo com erro é pulado e os demais continuam importados
+        self.importar(incremental=True)
+        self.assertEqual(self.registros_censo(), registros)
+
+    def test_importacao_em_blocos(self):
+        escrever_censo(self.diretorio.name, 2023, alteradas=['35000001'])
+        self.importar()
+        esperado = self.conteudo_importado()
+
+        saida = self.importar(chunksize=2, memoria=True)
+        self.assertEqual(self.conteudo_importado(), esperado)
+        self.assertIn('Pico de memória', saida)
+
+    def test_incremental_em_blocos_nao_altera_censos(self):
+        self.importar(incremental=True)
+        registros = self.registros_censo()
+        # Sem o checksum, o arquivo é relido em blocos: os hashes das linhas não dependem do tamanho do bloco
+        ImportacaoCenso.objects.update(checksum='')
+        self.importar(incremental=True, chunksize=1)
+        self.assertEqual(self.registros_censo(), registros)
+
+    @skipUnless(connection.vendor == 'postgresql', 'COPY exige PostgreSQL')
+    def test_importacao_copy(self):
+        self.importar(loader='copy')
+        self.conferir_importacao()
+        # Novos registros depois do COPY usam a sequência já avançada, sem colidir com as chaves reservadas
+        escola = Escola.objects.get(codigo_ibge='29000001')
+        novo = CensoEscolar.objects.create(escola=escola, ano=2023)
+        self.assertGreater(novo.id, max(CensoEscolar.objects.exclude(pk=novo.pk).values_list('id', flat=True)))
+
+    @skipUnless(connection.vendor == 'postgresql', 'COPY exige PostgreSQL')
+    def test_importacao_copy_igual_ao_orm(self):
+        escrever_censo(self.diretorio.name, 2023, alteradas=['35000001'])
+        self.importar(loader='orm')
+        esperado = self.conteudo_importado()
+        self.importar(loader='copy')
+        self.assertEqual(self.conteudo_importado(), esperado)
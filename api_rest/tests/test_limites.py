@@ -0,0 +1,59 @@
+from unittest import mock
+
+from django.core.cache import caches
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from ..limites import BaldeFichas, consumir_fichas
+from ..models import Autorizacao
+from .dados import consultas_aplicacao
+
+class BaldeFichasTests(TestCase):
+    def test_nao_consome_se_algum_balde_estiver_vazio(self):
+        cheio = BaldeFichas('teste-cheio', 5, 60)
+        vazio = BaldeFichas('teste-vazio', 1, 60)
+        self.assertEqual(vazio.consumir('chave'), 0)
+        self.assertGreater(consumir_fichas([(cheio, 'chave'), (vazio, 'chave')]), 0)
+        # O balde cheio não perdeu fichas com a requisição recusada
+        for _ in range(5):
+            self.assertEqual(cheio.consumir('chave'), 0)
+        self.assertGreater(cheio.consumir('chave'), 0)
+
+@override_settings(LIMITE_AUTORIZACAO_EMAIL=(2, 60), LIMITE_AUTORIZACAO_IP=(3, 60))
+@mock.patch('api_rest.services.enfileirar_mensagem')
+class LimitesAutorizacaoTests(TestCase):
+    def setUp(self):
+        caches['limites'].clear()
+
+    def solicitar(self, email, ip='10.0.0.1'):
+        return self.client.post('/api/solicitar-autorizacao', {'email': email}, REMOTE_ADDR=ip)
+
+    def test_limite_por_email(self, enfileirar):
+        for _ in range(2):
+            self.assertEqual(self.solicitar('usuario@example.com').status_code, 200)
+        # A requisição recusada não chega às tabelas da aplicação nem à fila de emails
+        with CaptureQueriesContext(connection) as contexto:
+            resposta = self.solicitar(' Usuario@Example.com', ip='10.0.0.2')
+        self.assertEqual(consultas_aplicacao(contexto), [])
+        self.assertEqual(resposta.status_code, 429)
+        self.assertGreater(int(resposta['Retry-After']), 0)
+        self.assertEqual(enfileirar.call_count, 2)
+        self.assertEqual(Autorizacao.objects.count(), 1)
+
+    def test_limite_por_ip(self, enfileirar):
+        for numero in range(3):
+            self.assertEqual(self.solicitar(f'usuario{numero}@example.com').status_code, 200)
+        self.assertEqual(self.solicitar('outro@example.com').status_code, 429)
+        self.assertEqual(self.solicitar('outro@example.com', ip='10.0.0.2').status_code, 200)
+        self.assertEqual(enfileirar.call_count, 4)
+
+    def test_recusa_pelo_email_nao_gasta_ficha_do_ip(self, enfileirar):
+        for _ in range(2):
+            self.assertEqual(self.solicitar('usuario@example.com').status_code, 200)
+        for _ in range(3):
+            self.assertEqual(self.solicitar('usuario@example.com').status_code, 429)
+        # O IP gastou apenas as duas fichas das requisições aceitas
+        self.assertEqual(self.solicitar('outro@example.com').status_code, 200)
+        self.assertEqual(self.solicitar('mais-um@example.com').status_code, 429)
+        self.assertEqual(enfileirar.call_count, 3)
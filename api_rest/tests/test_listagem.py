@@ -0,0 +1,63 @@
+import io
+from unittest import skipUnless
+
+from django.core.management import call_command
+from django.db import connection
+
+from .dados import DadosEscolasTestCase, criar_escola
+
+class ListagemEscolasTests(DadosEscolasTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.escolas = [
+            criar_escola(cls.campinas if numero % 2 else cls.salvador, f'Escola {numero}') for numero in range(10)
+        ]
+
+    def ids(self, **filtros):
+        resposta = self.client.get('/api/escolas/listar', filtros)
+        self.assertEqual(resposta.status_code, 200)
+        return sorted(escola['id'] for escola in resposta.json()['results'])
+
+    def test_filtros(self):
+        em_campinas = sorted(escola.id for escola in self.escolas if escola.cidade == self.campinas)
+        self.assertEqual(self.ids(estado='sp'), em_campinas)
+        self.assertEqual(self.ids(estado='são paulo'), em_campinas)
+        self.assertEqual(self.ids(cidade='CAMP'), em_campinas)
+        self.assertEqual(self.ids(nome='escola 3'), [self.escolas[3].id])
+        self.assertEqual(self.ids(bairro='centro', estado='BA', nome='1'), [])
+
+    def test_consultas_listar_escolas_com_filtros(self):
+        # Uma consulta para o COUNT da paginação e outra para a página, com cidade e estado juntos
+        with self.assertNumQueries(2):
+            resposta = self.client.get('/api/escolas/listar', {'estado': 'sp', 'nome': 'escola'})
+        self.assertEqual(resposta.json()['count'], 5)
+        self.assertEqual(resposta.json()['results'][0]['cidade']['estado']['sigla'], 'SP')
+        self.assertEqual(
+            set(resposta.json()['results'][0]), {'id', 'nome', 'bairro', 'cidade', 'average_avaliacoes'}
+        )
+
+    def test_consultas_listar_todas_escolas(self):
+        with self.assertNumQueries(2):
+            resposta = self.client.get('/api/escolas/todas')
+        self.assertEqual(resposta.json()['count'], len(self.escolas))
+        self.assertEqual(resposta.json()['results'][0]['cidade']['estado']['nome'], 'Bahia')
+
+    def test_benchmark_consultas(self):
+        saida = io.StringIO()
+        call_command('benchmark_consultas', repeticoes=1, stdout=saida)
+        self.assertIn(f'{len(self.escolas)} escolas', saida.getvalue())
+        for descricao in ('estado', 'cidade (icontains)', 'nome (icontains)', 'bairro (icontains)', 'codigo_ibge'):
+            self.assertIn(descricao, saida.getvalue())
+
+    @skipUnless(connection.vendor == 'postgresql', 'Índices de trigramas só existem no PostgreSQL')
+    def test_indices_trigramas(self):
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+            if cursor.fetchone() is None:
+                self.skipTest('Extensão pg_trgm indisponível')
+            cursor.execute('SELECT indexname FROM pg_indexes WHERE indexname LIKE %s', ['%_trgm_idx'])
+            self.assertEqual(
+                {nome for nome, in cursor.fetchall()},
+                {'escola_nome_trgm_idx', 'escola_bairro_trgm_idx', 'cidade_nome_trgm_idx'}
+            )
@@ -0,0 +1,87 @@
+import email
+from email.policy import default
+from unittest import mock
+
+from django.conf import settings
+from django.template.loader import render_to_string
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from ..email_service import montar_mensagem, serializar_mensagem
+from ..modelos_email import EMAIL_CONFIRMACAO, EMAIL_CONFIRMACAO_AVALIACAO, ModeloEmail
+from ..models import Autorizacao
+
+class EscolaFalsa:
+    nome = 'E.E. <Maria> & "Filhos" {0}'
+
+TEMPLATES_TESTE = [{
+    'BACKEND': 'django.template.backends.django.DjangoTemplates',
+    'OPTIONS': {'loaders': [('django.template.loaders.locmem.Loader', {
+        'simples.html': '<p>Olá {{ nome }}, {chaves} {{ escola.nome }} {{ inexistente.campo }}</p>',
+        'com_filtro.html': '<p>{{ nome|upper }}{% if escola %} de {{ escola.nome }}{% endif %}</p>',
+    })]},
+}]
+
+class ModeloEmailTests(SimpleTestCase):
+    def conferir(self, modelo, contexto):
+        self.assertEqual(modelo.renderizar(contexto), render_to_string(modelo.nome_template, contexto))
+
+    def test_templates_dos_emails(self):
+        for modelo, contexto in [
+            (EMAIL_CONFIRMACAO, {'codigo': '012345'}),
+            (EMAIL_CONFIRMACAO_AVALIACAO, {'escola': EscolaFalsa()}),
+            (EMAIL_CONFIRMACAO_AVALIACAO, {}),
+        ]:
+            with self.subTest(template=modelo.nome_template, contexto=contexto):
+                self.conferir(modelo, contexto)
+        self.assertIsNotNone(EMAIL_CONFIRMACAO.obter_compilado()[1])
+
+    @override_settings(TEMPLATES=TEMPLATES_TESTE)
+    def test_formatacao_direta_e_render_do_django(self):
+        simples = ModeloEmail('simples.html', 'Assunto')
+        com_filtro = ModeloEmail('com_filtro.html', 'Assunto')
+        for contexto in [{'nome': '<b>Ana</b>', 'escola': EscolaFalsa()}, {'nome': 'Ana'}, {}]:
+            with self.subTest(contexto=contexto):
+                self.conferir(simples, contexto)
+                self.conferir(com_filtro, contexto)
+        # Só texto e variáveis: formatação direta; com filtros ou tags, o render do template
+        self.assertIsNotNone(simples.obter_compilado()[1])
+        self.assertIsNone(com_filtro.obter_compilado()[1])
+
+    def test_mensagem_igual_a_montar_mensagem(self):
+        contexto = {'escola': EscolaFalsa()}
+        fronteira = EMAIL_CONFIRMACAO_AVALIACAO.obter_compilado()[-1].fronteira
+        for destinatario in ['usuario@example.com', 'Usuário <usuário@example.com>']:
+            with self.subTest(destinatario=destinatario):
+                pronta = EMAIL_CONFIRMACAO_AVALIACAO.mensagem(destinatario, contexto)
+                esperada = montar_mensagem(
+                    settings.EMAIL_FROM, destinatario, EMAIL_CONFIRMACAO_AVALIACAO.assunto,
+                    render_to_string('email_confirmacao_avaliacao.html', contexto)
+                )
+                esperada.set_boundary(fronteira)
+                # Mesmos cabeçalhos, byte a byte; o corpo é sempre utf-8 em base64, então compara-se o conteúdo
+                self.assertEqual(
+                    pronta.dados.split(b'\r\n\r\n', 1)[0], serializar_mensagem(esperada).split(b'\r\n\r\n', 1)[0]
+                )
+                corpo = email.message_from_bytes(pronta.dados, policy=default).get_payload()[0]
+                self.assertEqual(corpo.get_content_type(), 'text/html')
+                self.assertEqual(corpo.get_content(), esperada.get_payload()[0].get_payload(decode=True).decode())
+                self.assertEqual((pronta.remetente, pronta.destinatarios), (settings.EMAIL_FROM, [destinatario]))
+
+@mock.patch('api_rest.services.enfileirar_mensagem')
+class SolicitarAutorizacaoTests(TestCase):
+    def test_email_valido_enfileira_codigo(self, enfileirar):
+        resposta = self.client.post('/api/solicitar-autorizacao', {'email': 'usuario@example.com'})
+        self.assertEqual(resposta.status_code, 200)
+        mensagem = enfileirar.call_args.args[0]
+        self.assertEqual(mensagem.destinatarios, ['usuario@example.com'])
+        corpo = email.message_from_bytes(mensagem.dados, policy=default).get_payload()[0].get_content()
+        self.assertIn(Autorizacao.objects.get().codigo, corpo)
+
+    def test_email_invalido_nao_enfileira(self, enfileirar):
+        for email_invalido in ['', 'sem-arroba', 'a@b@c.com', 'a@example.com\r\nBcc: b@example.com']:
+            with self.subTest(email=email_invalido):
+                self.assertEqual(
+                    self.client.post('/api/solicitar-autorizacao', {'email': email_invalido}).status_code, 400
+                )
+        enfileirar.assert_not_called()
+        self.assertFalse(Autorizacao.objects.exists())
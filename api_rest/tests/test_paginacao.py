@@ -0,0 +1,70 @@
+import base64
+import json
+
+from .dados import DadosEscolasTestCase, criar_escola
+
+def codificar_cursor(valores):
+    return base64.urlsafe_b64encode(json.dumps(valores).encode()).decode()
+
+class PaginacaoCursorTests(DadosEscolasTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        medias = [4.5, None, 3.0, 4.5, None, 3.0, 5.0, 4.5, None, 1.0]
+        cls.escolas = [
+            criar_escola(cls.campinas if numero % 2 else cls.salvador, f'Escola {numero}', avaliacoes_media=media)
+            for numero, media in enumerate(medias)
+        ]
+
+    def percorrer_cursor(self, url):
+        ids = []
+        while url:
+            resposta = self.client.get(url)
+            self.assertEqual(resposta.status_code, 200)
+            ids += [escola['id'] for escola in resposta.json()['results']]
+            url = resposta.json()['next']
+        return ids
+
+    def test_consultas_paginacao_cursor(self):
+        # Sem COUNT: apenas a consulta da página
+        with self.assertNumQueries(1):
+            resposta = self.client.get('/api/escolas/listar', {'paginacao': 'cursor', 'estado': 'SP'})
+        self.assertNotIn('count', resposta.json())
+        self.assertEqual(len(resposta.json()['results']), 5)
+        with self.assertNumQueries(1):
+            self.client.get('/api/escolas/todas', {'paginacao': 'cursor'})
+
+    def test_cursor_percorre_todas_as_escolas_na_ordem(self):
+        ids = self.percorrer_cursor('/api/escolas/listar?paginacao=cursor&ordenar=avaliacao&page_size=3')
+        esperado = [
+            escola.id for escola in sorted(
+                self.escolas, key=lambda escola: (escola.avaliacoes_media is None, -(escola.avaliacoes_media or 0), escola.id)
+            )
+        ]
+        self.assertEqual(ids, esperado)
+
+        ids = self.percorrer_cursor('/api/escolas/todas?paginacao=cursor&page_size=4')
+        self.assertEqual(ids, [escola.id for escola in sorted(self.escolas, key=lambda escola: (escola.cidade.estado.nome, escola.id))])
+
+    def test_cursor_estavel_com_insercoes(self):
+        resposta = self.client.get('/api/escolas/listar', {'paginacao': 'cursor', 'ordenar': 'avaliacao', 'page_size': 4})
+        primeira = [escola['id'] for escola in resposta.json()['results']]
+        # Uma escola que entra antes do cursor não desloca as páginas seguintes
+        criar_escola(self.campinas, 'Escola nova', avaliacoes_media=5.0)
+        restantes = self.percorrer_cursor(resposta.json()['next'])
+        self.assertFalse(set(primeira) & set(restantes))
+        self.assertEqual(len(primeira) + len(restantes), len(self.escolas))
+
+    def test_cursor_invalido(self):
+        cursores = [
+            'nao-e-base64!', codificar_cursor({'id': 1}), codificar_cursor([1, 2]), codificar_cursor(['abc']),
+            codificar_cursor([[1]]), codificar_cursor([1e309]), codificar_cursor([2 ** 70]),
+        ]
+        for cursor in cursores:
+            with self.subTest(cursor=cursor):
+                resposta = self.client.get('/api/escolas/listar', {'paginacao': 'cursor', 'cursor': cursor})
+                self.assertEqual(resposta.status_code, 404)
+        resposta = self.client.get(
+            '/api/escolas/listar', {'paginacao': 'cursor', 'ordenar': 'avaliacao', 'cursor': codificar_cursor(['x', 1])}
+        )
+        self.assertEqual(resposta.status_code, 404)
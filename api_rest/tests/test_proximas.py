@@ -0,0 +1,34 @@
+from .dados import DadosEscolasTestCase, criar_escola
+
+class EscolasProximasTests(DadosEscolasTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        # Cerca de 1,1 km, 3,3 km e 22 km ao norte do ponto de referência
+        cls.perto = criar_escola(cls.campinas, 'Perto', latitude=-22.89, longitude=-47.06)
+        cls.media = criar_escola(cls.campinas, 'Média', latitude=-22.87, longitude=-47.06)
+        cls.longe = criar_escola(cls.campinas, 'Longe', latitude=-22.70, longitude=-47.06)
+        cls.sem_coordenadas = criar_escola(cls.campinas, 'Sem coordenadas')
+
+    def test_escolas_no_raio_ordenadas_pela_distancia(self):
+        resposta = self.client.get('/api/escolas/proximas', {'lat': -22.9, 'lon': -47.06, 'raio': 5})
+        self.assertEqual(resposta.status_code, 200)
+        self.assertEqual([escola['id'] for escola in resposta.json()], [self.perto.id, self.media.id])
+        self.assertTrue(all(escola['distancia_km'] <= 5 for escola in resposta.json()))
+
+        resposta = self.client.get('/api/escolas/proximas', {'lat': -22.9, 'lon': -47.06, 'raio': 50, 'limite': 1})
+        self.assertEqual([escola['id'] for escola in resposta.json()], [self.perto.id])
+
+    def test_parametros_invalidos(self):
+        parametros = [
+            {}, {'lat': 'abc', 'lon': 1}, {'lat': 'nan', 'lon': 1}, {'lat': 1, 'lon': 'inf'},
+            {'lat': 1, 'lon': 1, 'raio': 'nan'}, {'lat': 91, 'lon': 1}, {'lat': 1, 'lon': 1, 'raio': 0},
+        ]
+        for consulta in parametros:
+            with self.subTest(consulta=consulta):
+                self.assertEqual(self.client.get('/api/escolas/proximas', consulta).status_code, 400)
+
+    def test_detalhes_trazem_as_coordenadas_sem_a_celula(self):
+        dados = self.client.get(f'/api/escolas/{self.perto.id}').json()
+        self.assertEqual((dados['latitude'], dados['longitude']), (-22.89, -47.06))
+        self.assertNotIn('celula_geo', dados)
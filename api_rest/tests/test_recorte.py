@@ -0,0 +1,82 @@
+import tempfile
+
+from django.test import SimpleTestCase, TestCase
+
+from ..models import CensoEscolar, Escola, Infraestrutura
+from ..recorte import interpretar_anos, interpretar_campos
+from ..services import registrar_avaliacao
+from .dados import escrever_censo, importar_censos
+
+class InterpretarParametrosTests(SimpleTestCase):
+    def test_anos(self):
+        self.assertEqual(interpretar_anos('2021, 2023'), ([(2021, 2021), (2023, 2023)], False))
+        self.assertEqual(interpretar_anos('2019-2023,ultimo'), ([(2019, 2023)], True))
+        self.assertEqual(interpretar_anos('ultimo,'), ([], True))
+        for texto in ['', ',', 'abc', '2023-2019', '21', '2021-', '2021-2022-2023', 'último']:
+            with self.subTest(texto=texto), self.assertRaises(ValueError):
+                interpretar_anos(texto)
+
+    def test_campos(self):
+        self.assertEqual(
+            interpretar_campos('nome, censos.ano,censos.infraestrutura.biblioteca,,cidade'),
+            {'nome': None, 'censos': {'ano': None, 'infraestrutura': {'biblioteca': None}}, 'cidade': None}
+        )
+        # O campo inteiro prevalece sobre os subcampos, em qualquer ordem
+        self.assertEqual(interpretar_campos('censos,censos.ano'), {'censos': None})
+        self.assertEqual(interpretar_campos('censos.ano,censos'), {'censos': None})
+
+class RecorteEscolaTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        with tempfile.TemporaryDirectory() as diretorio:
+            for ano in (2021, 2022, 2023):
+                escrever_censo(diretorio, ano)
+            importar_censos(diretorio)
+        cls.escola = Escola.objects.get(codigo_ibge='35000001')
+        for numero in range(3):
+            registrar_avaliacao(cls.escola, f'{numero}@example.com', numero + 1, f'Comentário {numero}')
+
+    def detalhes(self, **parametros):
+        resposta = self.client.get(f'/api/escolas/{self.escola.id}', parametros)
+        self.assertEqual(resposta.status_code, 200)
+        return resposta.json()
+
+    def conferir_com_e_sem_cache(self, **parametros):
+        """
+        Retorna o recorte montado a partir do banco, conferindo que é igual ao aplicado aos detalhes já em cache.
+        """
+        do_banco = self.detalhes(**parametros)
+        self.detalhes()
+        self.assertEqual(self.detalhes(**parametros), do_banco)
+        return do_banco
+
+    def test_anos(self):
+        dados = self.conferir_com_e_sem_cache(anos='2021,2023')
+        self.assertEqual([censo['ano'] for censo in dados['censos']], [2021, 2023])
+        self.assertEqual([censo['ano'] for censo in self.detalhes(anos='2022-2030')['censos']], [2022, 2023])
+
+    def test_ultimo_censo(self):
+        # O mais recente é o do ponteiro `ultimo_censo`, não o último censo criado
+        CensoEscolar.objects.filter(escola=self.escola, ano=2021).update(ano=2020)
+        dados = self.conferir_com_e_sem_cache(anos='ultimo')
+        self.assertEqual([censo['ano'] for censo in dados['censos']], [2023])
+        self.assertEqual([censo['ano'] for censo in self.detalhes(anos='2020,ultimo')['censos']], [2020, 2023])
+
+    def test_campos(self):
+        dados = self.conferir_com_e_sem_cache(campos='nome,censos.ano,censos.infraestrutura.biblioteca,inexistente')
+        biblioteca = dict(Infraestrutura.objects.filter(censo__escola=self.escola).values_list('censo__ano', 'biblioteca'))
+        self.assertEqual(dados, {
+            'nome': self.escola.nome,
+            'censos': [{'ano': ano, 'infraestrutura': {'biblioteca': biblioteca[ano]}} for ano in (2021, 2022, 2023)],
+        })
+
+    def test_limite_de_avaliacoes(self):
+        dados = self.conferir_com_e_sem_cache(avaliacoes_limit=2, campos='avaliacoes.nota')
+        self.assertEqual(dados, {'avaliacoes': [{'nota': 3}, {'nota': 2}]})
+        self.assertEqual(self.detalhes(avaliacoes_limit=0, campos='avaliacoes')['avaliacoes'], [])
+
+    def test_parametros_invalidos(self):
+        for parametros in [{'anos': '2023-2021'}, {'anos': 'x'}, {'avaliacoes_limit': '-1'}, {'avaliacoes_limit': 'dois'}]:
+            with self.subTest(parametros=parametros):
+                resposta = self.client.get(f'/api/escolas/{self.escola.id}', parametros)
+                self.assertEqual(resposta.status_code, 400)
@@ -0,0 +1,45 @@
+import tempfile
+
+from ..models import Escola, Infraestrutura
+from ..recursos import RECURSOS, mascara_recursos
+from .dados import DadosEscolasTestCase, criar_escola, escrever_censo, importar_censos
+
+class FiltroRecursosTests(DadosEscolasTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.completa = criar_escola(cls.campinas, 'Completa', recursos=mascara_recursos(['biblioteca', 'rampas', 'internet_aluno']))
+        cls.biblioteca = criar_escola(cls.campinas, 'Biblioteca', recursos=mascara_recursos(['biblioteca']))
+        cls.nenhum = criar_escola(cls.salvador, 'Nenhum recurso')
+
+    def ids(self, **parametros):
+        resposta = self.client.get('/api/escolas/listar', parametros)
+        self.assertEqual(resposta.status_code, 200)
+        return sorted(escola['id'] for escola in resposta.json()['results'])
+
+    def test_escolas_com_todos_os_recursos_pedidos(self):
+        self.assertEqual(self.ids(recursos='biblioteca'), [self.completa.id, self.biblioteca.id])
+        self.assertEqual(self.ids(recursos='biblioteca, rampas'), [self.completa.id])
+        self.assertEqual(self.ids(recursos='piscina'), [])
+        with self.assertNumQueries(1):
+            self.assertEqual(self.ids(recursos='rampas,internet_aluno', paginacao='cursor'), [self.completa.id])
+
+    def test_recurso_desconhecido(self):
+        resposta = self.client.get('/api/escolas/listar', {'recursos': 'biblioteca,heliponto'})
+        self.assertEqual(resposta.status_code, 400)
+        self.assertIn('heliponto', resposta.json()['error'])
+        self.assertIn('biblioteca', resposta.json()['recursos'])
+
+    def test_importacao_grava_recursos_do_censo_mais_recente(self):
+        with tempfile.TemporaryDirectory() as diretorio:
+            escrever_censo(diretorio, 2021)
+            escrever_censo(diretorio, 2022, alteradas=['35000001'])
+            importar_censos(diretorio)
+        escolas = Escola.objects.filter(codigo_ibge__in=['35000001', '35000002', '29000001'])
+        self.assertGreater(len({escola.recursos for escola in escolas}), 1)
+        for escola in escolas:
+            valores = Infraestrutura.objects.values_list(*[caminho for _, caminho in RECURSOS]).get(
+                censo__escola=escola, censo__ano=2022
+            )
+            esperado = mascara_recursos([nome for (nome, _), valor in zip(RECURSOS, valores) if valor])
+            self.assertEqual(escola.recursos, esperado, escola.codigo_ibge)
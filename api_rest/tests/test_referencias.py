@@ -0,0 +1,39 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from ..cache import invalidar_escolas
+from ..models import Estado
+from .dados import DadosEscolasTestCase, consultas_aplicacao
+
+class ReferenciasTests(DadosEscolasTestCase):
+    def test_etag_e_304(self):
+        for url in ('/api/estados', '/api/cidades'):
+            with self.subTest(url=url):
+                resposta = self.client.get(url)
+                self.assertEqual(resposta.status_code, 200)
+                self.assertEqual(len(resposta.json()), 2)
+                self.assertIn('max-age=', resposta['Cache-Control'])
+                etag = resposta['ETag']
+
+                with CaptureQueriesContext(connection) as contexto:
+                    repetida = self.client.get(url)
+                    nao_modificada = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(consultas_aplicacao(contexto), [])
+                self.assertEqual((repetida.content, repetida['ETag']), (resposta.content, etag))
+                self.assertEqual(nao_modificada.status_code, 304)
+                self.assertEqual(nao_modificada.content, b'')
+                self.assertEqual(nao_modificada['ETag'], etag)
+
+                self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH='"outro"').status_code, 200)
+
+    def test_nova_versao_dos_dados_troca_o_etag(self):
+        resposta = self.client.get('/api/estados')
+        Estado.objects.create(nome='Pernambuco', sigla='PE', regiao='Nordeste')
+        # Até a próxima importação, o corpo pré-calculado continua valendo
+        self.assertEqual(self.client.get('/api/estados').content, resposta.content)
+
+        invalidar_escolas()
+        nova = self.client.get('/api/estados', HTTP_IF_NONE_MATCH=resposta['ETag'])
+        self.assertEqual(nova.status_code, 200)
+        self.assertNotEqual(nova['ETag'], resposta['ETag'])
+        self.assertIn('PE', [estado['sigla'] for estado in nova.json()])
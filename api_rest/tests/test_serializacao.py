@@ -0,0 +1,58 @@
+import tempfile
+
+from django.db.models import Prefetch
+from django.test import TestCase
+
+from ..models import Avaliacao, CensoEscolar, Educacao, Escola, Infraestrutura
+from ..recorte import relacoes_escola, serializar_escola
+from ..serializacao import plano_escola
+from ..serializers import EscolaSerializer
+from ..services import registrar_avaliacao
+from .dados import escrever_censo, importar_censos
+
+class PlanoSerializacaoTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        with tempfile.TemporaryDirectory() as diretorio:
+            # O censo de 2021 é gravado depois do de 2022: a ordem por ano não coincide com a das chaves
+            escrever_censo(diretorio, 2022)
+            importar_censos(diretorio)
+            escrever_censo(diretorio, 2021, alteradas=['35000001'])
+            importar_censos(diretorio, incremental=True)
+        cls.escola = Escola.objects.get(codigo_ibge='35000001')
+        cls.privada = Escola.objects.get(codigo_ibge='35000002')
+        # Um censo sem infraestrutura e outro sem educação: as relações ausentes viram None
+        Infraestrutura.objects.filter(censo__escola=cls.escola, censo__ano=2021).delete()
+        Educacao.objects.filter(censo__escola=cls.privada, censo__ano=2022).delete()
+        for numero in range(3):
+            registrar_avaliacao(cls.escola, f'{numero}@example.com', numero + 2, f'Comentário {numero}')
+        # Avaliações com a mesma data são desempatadas pelo id, da mais nova para a mais antiga
+        Avaliacao.objects.filter(escola=cls.escola).update(data_criacao=Avaliacao.objects.earliest('id').data_criacao)
+
+    def esperado(self, escolas):
+        escolas = Escola.objects.filter(pk__in=[escola.pk for escola in escolas]).order_by('pk').prefetch_related(
+            Prefetch('censos', CensoEscolar.objects.order_by('ano').select_related(
+                'infraestrutura__acessibilidade', 'infraestrutura__internet_aluno', 'infraestrutura__funcionarios',
+                'educacao__cotas',
+            )),
+            Prefetch('avaliacoes', Avaliacao.objects.order_by('-data_criacao', '-id')),
+        )
+        return EscolaSerializer(escolas, many=True).data
+
+    def test_igual_ao_escola_serializer(self):
+        escolas = [self.escola, self.privada, Escola.objects.get(codigo_ibge='29000001')]
+        dados = plano_escola().serializar(Escola.objects.filter(pk__in=[e.pk for e in escolas]).order_by('pk'), relacoes_escola())
+        self.assertEqual(dados, self.esperado(escolas))
+
+        self.assertEqual([censo['ano'] for censo in dados[0]['censos']], [2021, 2022])
+        self.assertIsNone(dados[0]['censos'][0]['infraestrutura'])
+        self.assertIsNotNone(dados[0]['censos'][0]['educacao'])
+        self.assertIsNone(dados[1]['censos'][1]['educacao'])
+        self.assertEqual([avaliacao['nota'] for avaliacao in dados[0]['avaliacoes']], [4, 3, 2])
+        self.assertEqual(dados[1]['avaliacoes'], [])
+
+    def test_detalhes_da_api(self):
+        dados = self.client.get(f'/api/escolas/{self.escola.id}').json()
+        self.assertEqual(dados, self.esperado([self.escola])[0])
+        self.assertEqual(serializar_escola(self.escola.id), dados)
+        self.assertIsNone(serializar_escola(0))
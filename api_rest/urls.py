@@ -3,6 +3,8 @@ from .views import (
     get_escola,
     listar_escolas_com_filtros,
     listar_todas_escolas,
+    autocomplete_escolas,
+    escolas_proximas,
     listar_estados,
     listar_cidades,
     solicitar_autorizacao,
@@ -14,6 +16,8 @@ urlpatterns = [
     path('escolas/<int:id>', get_escola, name='escola_detalhes'),
     path('escolas/listar', listar_escolas_com_filtros, name='listar_escolas_com_filtros'),
     path('escolas/todas', listar_todas_escolas, name='listar_todas_escolas'),
+    path('escolas/autocomplete', autocomplete_escolas, name='autocomplete_escolas'),
+    path('escolas/proximas', escolas_proximas, name='escolas_proximas'),
     path('estados', listar_estados, name='listar_estados'),
     path('cidades', listar_cidades, name='listar_cidades'),
     path('solicitar-autorizacao', solicitar_autorizacao, name='solicitar_autorizacao'),
@@ -1,68 +1,115 @@
-from rest_framework.decorators import api_view
+import math
+
+from rest_framework.decorators import api_view, throttle_classes
 from rest_framework.response import Response
 from rest_framework import status
+from rest_framework.renderers import JSONRenderer
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.cache import patch_cache_control
+from django.utils.http import parse_etags
 from django.utils import timezone
 from datetime import timedelta
 from django.shortcuts import get_object_or_404
-from django.db.models import Q, Avg
+from django.db.models import BigIntegerField, ExpressionWrapper, Q, F
 
 from .models import Escola, Estado, Cidade, Avaliacao, Autorizacao
 from .serializers import (
-    EscolaSerializer, EscolaListSerializer, EstadoSerializer, CidadeSerializer
+    EscolaListSerializer, EstadoSerializer, CidadeSerializer
 )
 from .services import (
     enviar_email_confirmacao,
     criar_ou_atualizar_autorizacao,
     verificar_autorizacao,
     enviar_email_confirmacao_avaliacao,
-    gerar_token_para_email
+    gerar_token_para_email,
+    registrar_avaliacao
 )
 from .jwt_utils import verificar_jwt
-from .pagination import StandardResultsSetPagination
+from .cache import obter_escola, guardar_escola, obter_referencia
+from .busca import buscar_escolas
+from .autocomplete import obter_indice, LIMITE_AUTOCOMPLETE, LIMITE_MAXIMO_AUTOCOMPLETE
+from .geo import celulas_no_raio, distancia_km
+from .limites import LimiteAutorizacao
+from .recursos import BITS_RECURSOS, mascara_recursos
+from .recorte import interpretar_anos, interpretar_campos, recortar_escola, serializar_escola
+from .pagination import StandardResultsSetPagination, CursorResultsSetPagination
+
+# Colunas lidas pelas listagens: apenas o que `EscolaListSerializer` devolve (escola, cidade e estado).
+CAMPOS_LISTAGEM_ESCOLAS = [
+    'id', 'nome', 'bairro',
+    'cidade__id', 'cidade__nome',
+    'cidade__estado__id', 'cidade__estado__nome', 'cidade__estado__sigla', 'cidade__estado__regiao',
+    'avaliacoes_media',
+]
 
 @api_view(['GET'])
-def get_escola(_, id):
+def get_escola(request, id):
     """
     Endpoint para obter os detalhes de uma escola específica, incluindo todas as avaliações.
     
     Parâmetros:
     - `id` (int): Identificador único da escola.
+
+    Parâmetros de recorte (opcionais), para clientes que exibem só um resumo da escola:
+    - `anos` (str): Anos dos censos, separados por vírgula, com intervalos (`2019-2023`) ou `ultimo` para o censo mais recente.
+    - `campos` (str): Campos retornados, separados por vírgula, com os níveis aninhados separados por ponto
+      (ex.: `nome,cidade,censos.ano,censos.infraestrutura.biblioteca`). Campos desconhecidos são ignorados.
+    - `avaliacoes_limit` (int): Número máximo de avaliações, da mais recente para a mais antiga.
+    Os censos vêm em ordem de ano e as avaliações, da mais recente para a mais antiga.
     
     Processo:
-    1. Tenta recuperar a instância da escola com o `id` fornecido, incluindo relacionamentos pré-carregados para otimizar consultas.
-    2. Se a escola não for encontrada, retorna uma resposta com erro 404.
-    3. Serializa os dados da escola utilizando `EscolaSerializer`.
-    4. Retorna os dados serializados com status 200 OK.
+    1. Procura os dados serializados da escola no cache (`cache.obter_escola`); se estiverem lá, retorna-os sem consultar o banco,
+       aplicando o recorte pedido (`recorte.recortar_escola`).
+    2. Caso contrário, serializa a escola com `recorte.serializar_escola`, que monta o JSON de `EscolaSerializer`
+       diretamente das linhas do banco, consultando apenas os anos, relacionamentos e avaliações pedidos.
+    3. Se a escola não for encontrada, retorna uma resposta com erro 404.
+    4. Sem recorte, guarda os dados no cache; respostas recortadas não são guardadas.
+    5. Retorna os dados serializados com status 200 OK.
+
+    O cache é invalidado por escola quando uma avaliação é registrada e por completo ao final de `import_censos`.
     
     Retorno:
     - `Response`: Dados da escola em formato JSON ou mensagem de erro.
     """
     try:
+        anos = interpretar_anos(request.GET['anos']) if request.GET.get('anos') else None
+        campos = interpretar_campos(request.GET['campos']) if request.GET.get('campos') else None
+        limite_avaliacoes = int(request.GET['avaliacoes_limit']) if request.GET.get('avaliacoes_limit') else None
+        if limite_avaliacoes is not None and limite_avaliacoes < 0:
+            raise ValueError(limite_avaliacoes)
+    except ValueError:
+        return Response(
+            {'error': 'Use `anos` com anos ou intervalos (ex.: 2019-2023) ou `ultimo`, e `avaliacoes_limit` com um inteiro não negativo.'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    recorte = anos is not None or campos is not None or limite_avaliacoes is not None
 
-        escola = Escola.objects.prefetch_related(
-            'censos__infraestrutura__acessibilidade',
-            'censos__infraestrutura__internet_aluno',
-            'censos__infraestrutura__funcionarios',
-            'censos__educacao__cotas',
-            'cidade__estado',
-            'avaliacoes'
-        ).get(pk=id)
-
+    dados = obter_escola(id)
+    if dados is not None:
+        return Response(recortar_escola(dados, anos, campos, limite_avaliacoes) if recorte else dados)
 
-    except Escola.DoesNotExist:
+    dados = serializar_escola(id, anos, campos, limite_avaliacoes)
+    if dados is None:
         return Response({'error': 'Escola não encontrada!'}, status=status.HTTP_404_NOT_FOUND)
 
-    escola_serializer = EscolaSerializer(escola)
-    return Response(escola_serializer.data)
+    if not recorte:
+        guardar_escola(id, dados)
+    return Response(dados)
 
 @api_view(['POST'])
+@throttle_classes([LimiteAutorizacao])
 def solicitar_autorizacao(request):
     """
     Endpoint para solicitar um código de confirmação via email.
+    Limitado por email e por IP (`limites.py`): acima do limite, responde 429 com `Retry-After`
+    antes de qualquer acesso às tabelas da aplicação ou envio de email.
     
     Processo:
     1. Obtém o email do usuário a partir dos dados da requisição.
-    2. Verifica se o email foi fornecido; caso contrário, retorna erro 400.
+    2. Verifica se o email foi fornecido e é um endereço válido (`validate_email`); caso contrário, retorna erro 400.
     3. Cria ou atualiza a autorização no banco de dados com um novo código de confirmação.
     4. Envia o código de confirmação para o email fornecido.
     5. Retorna uma mensagem de sucesso com status 200 OK.
@@ -76,6 +123,10 @@ def solicitar_autorizacao(request):
     email = request.data.get('email')
     if not email:
         return Response({'error': 'Email é obrigatório.'}, status=status.HTTP_400_BAD_REQUEST)
+    try:
+        validate_email(email if isinstance(email, str) else '')
+    except ValidationError:
+        return Response({'error': 'Email inválido.'}, status=status.HTTP_400_BAD_REQUEST)
     
     codigo = criar_ou_atualizar_autorizacao(email)
     enviar_email_confirmacao(email, codigo)
@@ -126,12 +177,12 @@ def submeter_avaliacao(request, escola_id):
     
     Processo:
     1. Obtém email, nota e comentário dos dados da requisição.
-    2. Verifica se email e nota foram fornecidos; caso contrário, retorna erro 400.
+    2. Verifica se email e nota foram fornecidos e se a nota é um número inteiro; caso contrário, retorna erro 400.
     3. Obtém o token JWT do header 'Authorization' e verifica sua validade.
     4. Verifica se o email no token corresponde ao email fornecido na requisição.
     5. Verifica se o usuário já avaliou a mesma escola nos últimos seis meses.
     6. Se todas as verificações forem bem-sucedidas:
-        a. Cria uma nova avaliação no banco de dados.
+        a. Cria uma nova avaliação no banco de dados e atualiza os agregados de avaliações da escola.
         b. Envia um email de confirmação da avaliação para o usuário.
         c. Retorna uma mensagem de sucesso com status 200 OK.
     7. Caso contrário, retorna a mensagem de erro apropriada.
@@ -152,6 +203,14 @@ def submeter_avaliacao(request, escola_id):
 
     if not all([email, nota]):
         return Response({'error': 'Email e nota são obrigatórios.'}, status=status.HTTP_400_BAD_REQUEST)
+    campo_nota = Avaliacao._meta.get_field('nota')
+    try:
+        if isinstance(nota, (bool, float)):
+            raise ValidationError('A nota deve ser um número inteiro.')
+        nota = campo_nota.to_python(nota)
+        campo_nota.run_validators(nota)
+    except ValidationError:
+        return Response({'error': 'A nota deve ser um número inteiro.'}, status=status.HTTP_400_BAD_REQUEST)
 
     auth_header = request.headers.get('Authorization')
     if not auth_header or not auth_header.startswith('Bearer '):
@@ -177,12 +236,7 @@ def submeter_avaliacao(request, escola_id):
 
     escola = get_object_or_404(Escola, id=escola_id)
 
-    Avaliacao.objects.create(
-        escola=escola,
-        email=email,
-        nota=nota,
-        comentario=comentario
-    )
+    registrar_avaliacao(escola, email, nota, comentario)
 
     enviar_email_confirmacao_avaliacao(email, escola)
     return Response({'message': 'Avaliação adicionada com sucesso.'}, status=status.HTTP_200_OK)
@@ -190,14 +244,17 @@ def submeter_avaliacao(request, escola_id):
 @api_view(['GET'])
 def listar_escolas_com_filtros(request):
     """
-    Lista as escolas com filtros opcionais por Estado, Cidade, Nome e Bairro.
+    Lista as escolas com filtros opcionais por Estado, Cidade, Nome, Bairro e recursos da escola.
     Implementa paginação.
     Retorna apenas nome da escola, endereço, cidade e estado, e a média das avaliações.
     
     Processo:
     1. Obtém os parâmetros de filtro da query string.
+       Cidade e estado vêm na mesma consulta (`select_related`); os censos não são carregados, pois a listagem não os exibe.
     2. Filtra as escolas com base nos parâmetros fornecidos.
-    3. Anota cada escola com a média das suas avaliações.
+       Os recursos são comparados com a máscara de bits `recursos` gravada na escola na importação, com um único
+       `AND` bit a bit, sem juntar as tabelas de censo, infraestrutura, acessibilidade e internet.
+    3. Usa a média das avaliações gravada na própria escola (`avaliacoes_media`), sem agrupar a tabela de avaliações.
     4. Aplica paginação nos resultados.
     5. Serializa os dados filtrados e paginados utilizando `EscolaListSerializer`.
     6. Retorna os dados serializados com informações de paginação.
@@ -207,6 +264,13 @@ def listar_escolas_com_filtros(request):
     - `cidade` (str): Nome da cidade.
     - `nome` (str): Nome da escola.
     - `bairro` (str): Bairro onde a escola está localizada.
+    - `recursos` (str): Recursos que a escola precisa ter no censo mais recente, separados por vírgula
+      (ex.: `biblioteca,lab_ciencias,rampas`; nomes em `recursos.RECURSOS`). Nomes desconhecidos retornam erro 400.
+    - `ordenar` (str): Use `avaliacao` para ordenar pela média das avaliações, da maior para a menor.
+    - `paginacao` (str): Use `cursor` para paginar por cursor (links `next`, sem `count`), com custo constante em páginas profundas.
+    - `busca` (str): Busca textual por nome, bairro e cidade, sem diferenciar acentos, usando o índice de busca
+      (`busca.buscar_escolas`). Os resultados vêm ordenados por relevância (até `LIMITE_BUSCA`), combinados com os demais
+      filtros e paginados por número de página.
     
     Retorno:
     - `Response`: Lista paginada de escolas filtradas.
@@ -215,14 +279,18 @@ def listar_escolas_com_filtros(request):
     cidade = request.GET.get('cidade')
     nome = request.GET.get('nome')
     bairro = request.GET.get('bairro')
+    busca = request.GET.get('busca')
+    ordenar = request.GET.get('ordenar')
+    recursos = [recurso.strip() for recurso in request.GET.get('recursos', '').split(',') if recurso.strip()]
+
+    desconhecidos = [recurso for recurso in recursos if recurso not in BITS_RECURSOS]
+    if desconhecidos:
+        return Response(
+            {'error': f"Recursos desconhecidos: {', '.join(desconhecidos)}.", 'recursos': list(BITS_RECURSOS)},
+            status=status.HTTP_400_BAD_REQUEST
+        )
 
-    escolas = Escola.objects.all().prefetch_related(
-        'censos__infraestrutura__acessibilidade',
-        'censos__infraestrutura__internet_aluno',
-        'censos__infraestrutura__funcionarios',
-        'censos__educacao__cotas',
-        'cidade__estado'
-    ).annotate(average_avaliacoes=Avg('avaliacoes__nota'))
+    escolas = Escola.objects.select_related('cidade__estado').only(*CAMPOS_LISTAGEM_ESCOLAS)
     
     if estado:
         escolas = escolas.filter(
@@ -238,8 +306,30 @@ def listar_escolas_com_filtros(request):
     
     if bairro:
         escolas = escolas.filter(bairro__icontains=bairro)
-    
-    paginator = StandardResultsSetPagination()
+
+    if recursos:
+        mascara = mascara_recursos(recursos)
+        # `bitand` resolve para IntegerField, e o PostgreSQL descartaria máscaras acima de 2**31 como fora do intervalo
+        recursos_pedidos = ExpressionWrapper(F('recursos').bitand(mascara), output_field=BigIntegerField())
+        escolas = escolas.alias(recursos_pedidos=recursos_pedidos).filter(recursos_pedidos=mascara)
+
+    if busca:
+        ids = buscar_escolas(busca)
+        filtrados = set(escolas.filter(pk__in=ids).values_list('id', flat=True))
+        paginator = StandardResultsSetPagination()
+        ids_pagina = paginator.paginate_queryset([i for i in ids if i in filtrados], request)
+        escolas_pagina = escolas.in_bulk(ids_pagina)
+        serializer = EscolaListSerializer([escolas_pagina[i] for i in ids_pagina], many=True)
+        return paginator.get_paginated_response(serializer.data)
+
+    if request.GET.get('paginacao') == 'cursor':
+        ordenacao = [('avaliacoes_media', True), ('id', False)] if ordenar == 'avaliacao' else [('id', False)]
+        paginator = CursorResultsSetPagination(ordenacao)
+    else:
+        if ordenar == 'avaliacao':
+            escolas = escolas.order_by(F('avaliacoes_media').desc(nulls_last=True), 'id')
+        paginator = StandardResultsSetPagination()
+
     resultado_paginado = paginator.paginate_queryset(escolas, request)
     
     serializer = EscolaListSerializer(resultado_paginado, many=True)
@@ -254,32 +344,149 @@ def listar_todas_escolas(request):
     Retorna apenas nome da escola, endereço, cidade e estado, e a média das avaliações.
     
     Processo:
-    1. Recupera todas as escolas com relacionamentos pré-carregados e anota a média das avaliações.
+    1. Recupera todas as escolas com cidade e estado na mesma consulta (`select_related`); a média das avaliações já está gravada na escola.
     2. Ordena as escolas alfabeticamente pelo nome do estado.
-    3. Aplica paginação nos resultados.
+    3. Aplica paginação nos resultados: por número de página ou, com `?paginacao=cursor`, por cursor
+       (ordem estado + id, sem `COUNT(*)` nem `OFFSET`).
     4. Serializa os dados paginados utilizando `EscolaListSerializer`.
     5. Retorna os dados serializados com informações de paginação.
     
     Retorno:
     - `Response`: Lista paginada de todas as escolas ordenadas.
     """
-    escolas = Escola.objects.all().prefetch_related(
-        'censos__infraestrutura__acessibilidade',
-        'censos__infraestrutura__internet_aluno',
-        'censos__infraestrutura__funcionarios',
-        'censos__educacao__cotas',
-        'cidade__estado'
-    ).annotate(average_avaliacoes=Avg('avaliacoes__nota')) \
-     .order_by('cidade__estado__nome')
-    
-    paginator = StandardResultsSetPagination()
+    escolas = Escola.objects.select_related('cidade__estado').only(
+        *CAMPOS_LISTAGEM_ESCOLAS
+    )
+
+    if request.GET.get('paginacao') == 'cursor':
+        paginator = CursorResultsSetPagination([('cidade__estado__nome', False), ('id', False)])
+    else:
+        escolas = escolas.order_by('cidade__estado__nome')
+        paginator = StandardResultsSetPagination()
+    
     resultado_paginado = paginator.paginate_queryset(escolas, request)
     
     serializer = EscolaListSerializer(resultado_paginado, many=True)
     return paginator.get_paginated_response(serializer.data)
 
 @api_view(['GET'])
-def listar_estados(_):
+def autocomplete_escolas(request):
+    """
+    Sugere escolas pelo início do nome enquanto o usuário digita, sem consultar o banco a cada tecla.
+    
+    Processo:
+    1. Obtém o índice de nomes em memória do processo (`autocomplete.obter_indice`), construído no primeiro uso
+       e reconstruído quando uma importação de censos termina.
+    2. Busca as escolas cujo nome começa com o texto digitado ou que têm palavras começando com cada termo digitado,
+       opcionalmente restritas a um estado e/ou cidade.
+    3. Retorna as sugestões com status 200 OK.
+    
+    Parâmetros:
+    - `q` (str): Texto digitado (obrigatório).
+    - `estado` (str): Sigla do estado (opcional).
+    - `cidade` (int): Id da cidade (opcional).
+    - `limite` (int): Número máximo de sugestões (padrão 10, máximo 50).
+    
+    Retorno:
+    - `Response`: Lista de escolas com `id`, `nome`, `cidade` e `estado`, ou mensagem de erro.
+    """
+    texto = request.GET.get('q', '')
+    estado = request.GET.get('estado') or None
+    try:
+        cidade = int(request.GET['cidade']) if request.GET.get('cidade') else None
+        limite = min(int(request.GET.get('limite', LIMITE_AUTOCOMPLETE)), LIMITE_MAXIMO_AUTOCOMPLETE)
+    except ValueError:
+        return Response({'error': 'Parâmetros `cidade` e `limite` devem ser números inteiros.'}, status=status.HTTP_400_BAD_REQUEST)
+
+    sugestoes = obter_indice().sugerir(texto, max(limite, 1), estado, cidade)
+    return Response(sugestoes, status=status.HTTP_200_OK)
+
+@api_view(['GET'])
+def escolas_proximas(request):
+    """
+    Lista as escolas mais próximas de um ponto, dentro de um raio, da mais próxima para a mais distante.
+    
+    Processo:
+    1. Valida `lat`, `lon`, `raio` e `limite`; retorna erro 400 se forem inválidos.
+    2. Calcula as células da grade espacial (`geo.celulas_no_raio`) que cobrem o raio e busca apenas id e coordenadas
+       das escolas dessas células, usando o índice de `celula_geo` (um intervalo por linha da grade) em vez de percorrer a tabela.
+    3. Calcula a distância de cada candidata, descarta as que estão fora do raio e ordena pela distância.
+    4. Carrega nome, bairro, cidade e estado apenas das `limite` mais próximas e as retorna com status 200 OK.
+    
+    Parâmetros:
+    - `lat` (float): Latitude do ponto (obrigatório).
+    - `lon` (float): Longitude do ponto (obrigatório).
+    - `raio` (float): Raio da busca em km (padrão 5, máximo 50).
+    - `limite` (int): Número máximo de escolas (padrão 10, máximo 50).
+    
+    Retorno:
+    - `Response`: Lista de escolas com `distancia_km`, ou mensagem de erro.
+    """
+    try:
+        latitude = float(request.GET['lat'])
+        longitude = float(request.GET['lon'])
+        raio = float(request.GET.get('raio', 5))
+        limite = int(request.GET.get('limite', 10))
+    except (KeyError, ValueError):
+        return Response({'error': 'Informe `lat` e `lon` numéricos; `raio` e `limite` são opcionais.'}, status=status.HTTP_400_BAD_REQUEST)
+    if not all(math.isfinite(valor) for valor in (latitude, longitude, raio)):
+        return Response({'error': '`lat`, `lon` e `raio` precisam ser números finitos.'}, status=status.HTTP_400_BAD_REQUEST)
+    if not (-90 <= latitude <= 90 and -180 <= longitude <= 180) or raio <= 0 or limite <= 0:
+        return Response({'error': 'Coordenadas, raio ou limite fora do intervalo permitido.'}, status=status.HTTP_400_BAD_REQUEST)
+    raio = min(raio, 50)
+    limite = min(limite, 50)
+
+    intervalos, (lat_min, lat_max, lon_min, lon_max) = celulas_no_raio(latitude, longitude, raio)
+    na_grade = Q()
+    for primeira, ultima in intervalos:
+        na_grade |= Q(celula_geo__range=(primeira, ultima))
+    candidatas = Escola.objects.filter(
+        na_grade,
+        latitude__range=(lat_min, lat_max),
+    ).values_list('id', 'latitude', 'longitude')
+
+    distancias = []
+    for escola_id, lat, lon in candidatas:
+        distancia = distancia_km(latitude, longitude, lat, lon)
+        if distancia <= raio:
+            distancias.append((distancia, escola_id))
+    distancias = sorted(distancias)[:limite]
+
+    escolas = Escola.objects.select_related('cidade__estado').in_bulk([escola_id for _, escola_id in distancias])
+    proximas = []
+    for distancia, escola_id in distancias:
+        escola = escolas[escola_id]
+        proximas.append({
+            'id': escola.id, 'nome': escola.nome, 'bairro': escola.bairro,
+            'cidade': escola.cidade.nome, 'estado': escola.cidade.estado.sigla,
+            'latitude': escola.latitude, 'longitude': escola.longitude, 'distancia_km': round(distancia, 3),
+        })
+    return Response(proximas, status=status.HTTP_200_OK)
+
+def resposta_referencia(request, nome, gerar):
+    """
+    Monta a resposta de um endpoint de referência a partir do corpo pré-calculado em `cache.obter_referencia`.
+
+    Processo:
+    1. Obtém o corpo JSON e o ETag da versão atual dos dados (calculados uma vez por importação).
+    2. Se o cliente já tiver essa versão (`If-None-Match`), retorna 304 sem corpo.
+    3. Caso contrário, retorna o corpo com status 200 OK.
+    Em ambos os casos envia o ETag e um `Cache-Control` longo (`CACHE_MAX_AGE_REFERENCIAS`).
+
+    Retorno:
+    - `HttpResponse`: Corpo JSON ou resposta 304.
+    """
+    corpo, etag = obter_referencia(nome, gerar)
+    if etag in parse_etags(request.headers.get('If-None-Match', '')):
+        resposta = HttpResponseNotModified()
+    else:
+        resposta = HttpResponse(corpo, content_type='application/json')
+    resposta['ETag'] = etag
+    patch_cache_control(resposta, public=True, max_age=settings.CACHE_MAX_AGE_REFERENCIAS)
+    return resposta
+
+@api_view(['GET'])
+def listar_estados(request):
     """
     Retorna a lista de todos os estados cadastrados no sistema.
     
@@ -287,27 +494,57 @@ def listar_estados(_):
     1. Recupera todas as instâncias de `Estado`.
     2. Serializa os dados utilizando `EstadoSerializer`.
     3. Retorna os dados serializados com status 200 OK.
+    Os passos 1 e 2 são feitos uma vez por versão dos dados; as demais chamadas usam o corpo pré-calculado
+    e respondem 304 a clientes que enviam o ETag atual (ver `resposta_referencia`).
     
     Retorno:
-    - `Response`: Lista de estados em formato JSON.
+    - `HttpResponse`: Lista de estados em formato JSON, ou 304 se o cliente já tiver a versão atual.
     """
-    estados = Estado.objects.all()
-    serializer = EstadoSerializer(estados, many=True)
-    return Response(serializer.data, status=status.HTTP_200_OK)
+    def gerar():
+        estados = Estado.objects.all()
+        return JSONRenderer().render(EstadoSerializer(estados, many=True).data)
+
+    return resposta_referencia(request, 'estados', gerar)
 
 @api_view(['GET'])
-def listar_cidades(_):
+def listar_cidades(request):
     """
-    Retorna a lista de todas as cidades cadastradas no sistema.
+    Retorna a lista de cidades cadastradas no sistema, opcionalmente filtradas por estado e prefixo do nome.
     
     Processo:
-    1. Recupera todas as instâncias de `Cidade`.
-    2. Serializa os dados utilizando `CidadeSerializer`.
-    3. Retorna os dados serializados com status 200 OK.
+    1. Sem filtros, recupera todas as instâncias de `Cidade`, com o estado na mesma consulta (`select_related`),
+       serializa os dados utilizando `CidadeSerializer` e retorna o corpo pré-calculado da versão atual dos dados,
+       respondendo 304 a clientes que enviam o ETag atual (ver `resposta_referencia`).
+    2. Com `estado` e/ou `nome`, filtra as cidades usando o índice (estado, nome) e retorna uma lista compacta,
+       ordenada pelo nome, apenas com `id`, `nome` e a sigla do estado.
+    
+    Parâmetros de Filtro (opcionais):
+    - `estado` (str): Sigla ou id do estado.
+    - `nome` (str): Prefixo do nome da cidade (sem diferenciar maiúsculas e minúsculas).
     
     Retorno:
-    - `Response`: Lista de cidades em formato JSON.
+    - `HttpResponse`: Lista de cidades em formato JSON, ou 304 se o cliente já tiver a versão atual.
     """
+    estado = request.GET.get('estado')
+    nome = request.GET.get('nome')
+
+    if not estado and not nome:
+        def gerar():
+            cidades = Cidade.objects.select_related('estado')
+            return JSONRenderer().render(CidadeSerializer(cidades, many=True).data)
+
+        return resposta_referencia(request, 'cidades', gerar)
+
     cidades = Cidade.objects.all()
-    serializer = CidadeSerializer(cidades, many=True)
-    return Response(serializer.data, status=status.HTTP_200_OK)
\ No newline at end of file
+    if estado:
+        if estado.isascii() and estado.isdigit():
+            if len(estado) > 9:
+                return Response({'error': 'Estado inválido.'}, status=status.HTTP_400_BAD_REQUEST)
+            cidades = cidades.filter(estado_id=int(estado))
+        else:
+            cidades = cidades.filter(estado__sigla=estado.upper())
+    if nome:
+        cidades = cidades.filter(nome__istartswith=nome)
+
+    cidades = cidades.order_by('estado_id', 'nome').values('id', 'nome', estado_sigla=F('estado__sigla'))
+    return Response(list(cidades), status=status.HTTP_200_OK)
@@ -135,7 +135,52 @@ SMTP_PORT = int(os.getenv('SMTP_PORT', 587))
 SMTP_USER = os.getenv('SMTP_USER', 'MS_fOb1NT@trial-351ndgw06dn4zqx8.mlsender.net')
 SMTP_PASSWORD = os.getenv('SMTP_PASSWORD', 'QmSXuBCmKoHy09qJ')
 EMAIL_FROM = os.getenv('EMAIL_FROM', 'escolas.org@trial-351ndgw06dn4zqx8.mlsender.net')
+# Envio de emails em segundo plano (api_rest/fila_emails.py): threads de envio por processo, cada uma com a sua
+# conexão SMTP reutilizada; falhas são repetidas com espera exponencial a partir de EMAIL_ESPERA_INICIAL segundos.
+EMAIL_ASSINCRONO = os.getenv('EMAIL_ASSINCRONO', 'True') == 'True'
+EMAIL_WORKERS = int(os.getenv('EMAIL_WORKERS', 2))
+EMAIL_TENTATIVAS = int(os.getenv('EMAIL_TENTATIVAS', 5))
+EMAIL_ESPERA_INICIAL = float(os.getenv('EMAIL_ESPERA_INICIAL', 2))
+EMAIL_CONEXAO_OCIOSA = float(os.getenv('EMAIL_CONEXAO_OCIOSA', 60))
 
 # Authorization Bearer
 SECRET_KEY = os.getenv('SECRET_KEY', 'Z-0x0qzsGdZvNgRz6DhwJn-yBIHQfbgQV8kzQqk2pEpiLN3QprnAZ4RjD2SUHhOLvL8')
-JWT_EXPIRATION_MINUTES = 30
\ No newline at end of file
+JWT_EXPIRATION_MINUTES = 30
+# Caches da API. O padrão são tabelas no próprio banco, compartilhadas por todos os processos, para que as
+# invalidações feitas por `import_censos` e os limites de requisições valham em todos eles; crie as tabelas com
+# `python manage.py createcachetable` após o `migrate`. Para usar outro backend compartilhado, ex.:
+# CACHE_BACKEND=django.core.cache.backends.redis.RedisCache CACHE_LOCATION=redis://127.0.0.1:6379
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv('CACHE_BACKEND', 'django.core.cache.backends.db.DatabaseCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION', 'cache_escolas'),
+        # O padrão do Django (300 entradas) não comporta os detalhes das escolas mais acessadas (~7 KB cada)
+        'OPTIONS': {'MAX_ENTRIES': int(os.getenv('CACHE_MAX_ENTRIES', 20000))},
+    },
+    # Contadores dos limites de requisições (api_rest/limites.py).
+    # Alias separado para que as respostas da API não expulsem os baldes, e com espaço para muitos emails e IPs
+    # (poucas centenas de bytes por entrada): com o padrão de 300 entradas, bastaria variar o email para zerar os limites
+    'limites': {
+        'BACKEND': os.getenv('LIMITES_CACHE_BACKEND', 'django.core.cache.backends.db.DatabaseCache'),
+        'LOCATION': os.getenv('LIMITES_CACHE_LOCATION', 'cache_limites'),
+        'OPTIONS': {'MAX_ENTRIES': int(os.getenv('LIMITES_CACHE_MAX_ENTRIES', 200000))},
+    },
+}
+CACHE_TIMEOUT_ESCOLA = int(os.getenv('CACHE_TIMEOUT_ESCOLA', 60 * 60))
+CACHE_MAX_AGE_REFERENCIAS = int(os.getenv('CACHE_MAX_AGE_REFERENCIAS', 60 * 60 * 24))
+
+# Limites de pedidos de código de confirmação (api_rest/limites.py): (capacidade do balde, segundos para repor uma ficha)
+LIMITE_AUTORIZACAO_EMAIL = (
+    int(os.getenv('LIMITE_AUTORIZACAO_EMAIL_CAPACIDADE', 3)),
+    float(os.getenv('LIMITE_AUTORIZACAO_EMAIL_INTERVALO', 60)),
+)
+LIMITE_AUTORIZACAO_IP = (
+    int(os.getenv('LIMITE_AUTORIZACAO_IP_CAPACIDADE', 20)),
+    float(os.getenv('LIMITE_AUTORIZACAO_IP_INTERVALO', 30)),
+)
+
+# Número de proxies reversos à frente da aplicação, usado pelo DRF para achar o IP do cliente no X-Forwarded-For.
+# Com 0, vale o endereço da conexão; atrás de um proxy (ex.: balanceador da hospedagem), ajuste para 1.
+REST_FRAMEWORK = {
+    'NUM_PROXIES': int(os.getenv('NUM_PROXIES', 0)),
+}